@@ -7,6 +7,12 @@ Usage:
     python scripts/batch-custom-videos.py --course react-patterns
     python scripts/batch-custom-videos.py --all
     python scripts/batch-custom-videos.py --lessons lesson-react-1-1,lesson-react-1-2
+
+Lessons run in-process through custom-video-generator.py's stage pipeline, so
+the TTS model and SadTalker worker load once for the whole batch. Progress is
+journaled (temp/batch-journals/batch-custom-videos.jsonl): after a crash or
+Ctrl+C, running the same command again resumes each lesson after its last
+finished stage. Stale temp files no journal needs are removed at start.
 """
 
 import argparse
@@ -14,7 +20,12 @@ import sys
 import time
 from pathlib import Path
 from datetime import datetime
-import subprocess
+
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / "pipeline"))
+from throttle import Throttle
+from batch_journal import BatchJournal, collect_garbage
+from generator_loader import LazyVideoGenerator
 
 # Lesson configurations
 COURSES = {
@@ -36,11 +47,18 @@ COURSES = {
 
 
 class BatchVideoGenerator:
-    def __init__(self, test_mode=False, dry_run=False):
+    # The in-process VideoGenerator, built on first use (--dry-run never imports TTS)
+    generator = LazyVideoGenerator()
+
+    def __init__(self, test_mode=False, dry_run=False, force=False):
         self.test_mode = test_mode
         self.dry_run = dry_run
+        self.force = force
         self.project_root = Path(__file__).parent.parent
-        self.generator_script = self.project_root / "scripts" / "custom-video-generator.py"
+        self._generator = None
+
+        # New lessons wait only while the machine is hot or overloaded
+        self.throttle = Throttle()
 
         self.results = {
             "success": [],
@@ -48,55 +66,70 @@ class BatchVideoGenerator:
             "skipped": []
         }
 
-    def generate_lesson(self, lesson_id):
-        """Generate video for a single lesson"""
-        print(f"\n{'='*60}")
-        print(f"📹 Processing: {lesson_id}")
-        print(f"{'='*60}\n")
-
+    def _record_result(self, result):
+        if result.status == "built":
+            print(f"✅ Success: {result.lesson_id} ({sum(result.stage_seconds.values()):.1f}s of work)")
+            self.results["success"].append(result.lesson_id)
+        elif result.status == "skipped":
+            self.results["skipped"].append(result.lesson_id)
+        else:
+            print(f"❌ Failed: {result.lesson_id}: {result.reason}")
+            self.results["failed"].append(result.lesson_id)
+
+    def generate_lessons(self, lesson_ids):
+        """Generate videos for several lessons in one pipeline run"""
         if self.dry_run:
-            print("   [DRY RUN] Would generate video")
-            self.results["skipped"].append(lesson_id)
-            return True
-
-        # Check if video already exists
-        output_file = self.project_root / "public" / "courses" / f"{lesson_id}.mp4"
-        if output_file.exists():
-            print(f"⚠️  Video already exists: {output_file}")
-            response = input("   Regenerate? (y/n): ").strip().lower()
-            if response != 'y':
-                print("   Skipping...")
+            for lesson_id in lesson_ids:
+                print(f"   [DRY RUN] Would generate video: {lesson_id}")
                 self.results["skipped"].append(lesson_id)
-                return True
-
-        # Run generator
-        cmd = [
-            "python3",
-            str(self.generator_script),
-            "--lesson", lesson_id
-        ]
-
-        if self.test_mode:
-            cmd.append("--test")
+            return True
 
+        journal = BatchJournal("batch-custom-videos")
         try:
-            start_time = time.time()
-            result = subprocess.run(cmd, check=True)
-            duration = time.time() - start_time
+            freed = collect_garbage([self.generator.temp_dir])
+            if freed:
+                print(f"🧹 Removed {freed / (1024*1024):.1f} MB of stale temp files")
+
+            # Lessons an interrupted run already built keep their result if their video is
+            # still up to date; the rest resume after their last journaled stage
+            lessons = [self.generator.lesson(lesson_id=lesson_id) for lesson_id in lesson_ids]
+            done = {} if self.force else journal.finished("built")
+            resumed = [lesson["lesson_id"] for lesson in lessons
+                       if lesson["lesson_id"] in done and self._still_built(lesson)]
+            if resumed or journal.pending:
+                print(f"♻️  Resuming interrupted batch ({len(resumed)} lessons already done)")
+            for lesson_id in resumed:
+                self.results["success"].append(lesson_id)
+
+            # The generator skips lessons whose inputs match the build manifest
+            lessons = [lesson for lesson in lessons if lesson["lesson_id"] not in resumed]
+            results = self.generator.generate_many(lessons, throttle=self.throttle, journal=journal,
+                                                   on_finish=self._record_result)
+        finally:
+            journal.close()
+        return all(result.status != "failed" for result in results)
+
+    def _still_built(self, lesson):
+        """Whether a lesson's video exists and matches the build manifest"""
+        generator = self.generator
+        final_video = generator.output_dir / f"{lesson['output_name']}.mp4"
+        inputs = generator.lesson_inputs(lesson["script"], lesson["title"], lesson["voice_sample"],
+                                         lesson["instructor_photo"])
+        return generator.manifest.check(final_video, inputs, lesson_id=lesson["lesson_id"],
+                                        generator="custom-video") is None
 
-            print(f"✅ Success! ({duration:.1f}s)")
-            self.results["success"].append(lesson_id)
-            return True
+    def generate_lesson(self, lesson_id):
+        """Generate video for a single lesson"""
+        return self.generate_lessons([lesson_id])
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed: {e}")
-            self.results["failed"].append(lesson_id)
+    def confirm(self):
+        if self.dry_run:
+            return True
+        response = input("\nContinue? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled")
             return False
-
-        except KeyboardInterrupt:
-            print("\n⚠️  Cancelled by user")
-            self.results["skipped"].append(lesson_id)
-            raise
+        return True
 
     def generate_course(self, course_id):
         """Generate all videos for a course"""
@@ -109,22 +142,10 @@ class BatchVideoGenerator:
         print(f"\n🎓 Generating {len(lessons)} videos for course: {course_id}")
         print(f"   Lessons: {', '.join(lessons)}")
 
-        if not self.dry_run:
-            response = input("\nContinue? (y/n): ").strip().lower()
-            if response != 'y':
-                print("Cancelled")
-                return False
-
-        for i, lesson_id in enumerate(lessons, 1):
-            print(f"\n[{i}/{len(lessons)}] Processing {lesson_id}...")
-            self.generate_lesson(lesson_id)
-
-            # Small delay between videos to avoid overheating
-            if i < len(lessons) and not self.dry_run:
-                print("\n⏸  Cooling down (10s)...")
-                time.sleep(10)
+        if not self.confirm():
+            return False
 
-        return True
+        return self.generate_lessons(lessons)
 
     def generate_all(self):
         """Generate videos for all courses"""
@@ -138,18 +159,14 @@ class BatchVideoGenerator:
         if not self.dry_run:
             print("⚠️  This will take several hours to complete.")
             print("   Make sure your Mac is plugged in and won't sleep.")
-            response = input("\nContinue? (y/n): ").strip().lower()
-            if response != 'y':
-                print("Cancelled")
-                return False
+        if not self.confirm():
+            return False
 
         start_time = time.time()
 
-        for course_id in COURSES:
-            print(f"\n{'='*60}")
-            print(f"🎓 COURSE: {course_id}")
-            print(f"{'='*60}")
-            self.generate_course(course_id)
+        # One pipeline across every course, so no stage idles at course boundaries
+        lessons = [lesson_id for course_lessons in COURSES.values() for lesson_id in course_lessons]
+        self.generate_lessons(lessons)
 
         duration = time.time() - start_time
         self.print_summary(duration)
@@ -178,6 +195,11 @@ class BatchVideoGenerator:
             hours = int(duration // 3600)
             minutes = int((duration % 3600) // 60)
             print(f"\n⏱  Total time: {hours}h {minutes}m")
+        print(f"⏸  Cool-down: {self.throttle.summary()}")
+        if self._generator and self._generator.metrics.records:
+            metrics = self._generator.metrics
+            print(f"📈 Stage time: {metrics.summary()}")
+            print(f"   Report: python scripts/pipeline/metrics.py --run {metrics.run_id}")
 
         print()
 
@@ -189,13 +211,14 @@ def main():
     parser.add_argument("--lessons", help="Comma-separated lesson IDs")
     parser.add_argument("--test", action="store_true", help="Test mode (faster, lower quality)")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be generated")
+    parser.add_argument("--force", action="store_true", help="Rebuild lessons even if their inputs are unchanged")
 
     args = parser.parse_args()
 
     if not (args.course or args.all or args.lessons):
         parser.error("Must specify --course, --all, or --lessons")
 
-    generator = BatchVideoGenerator(test_mode=args.test, dry_run=args.dry_run)
+    generator = BatchVideoGenerator(test_mode=args.test, dry_run=args.dry_run, force=args.force)
 
     try:
         if args.all:
@@ -204,8 +227,7 @@ def main():
             generator.generate_course(args.course)
         elif args.lessons:
             lessons = [l.strip() for l in args.lessons.split(',')]
-            for lesson in lessons:
-                generator.generate_lesson(lesson)
+            generator.generate_lessons(lessons)
             generator.print_summary()
 
         sys.exit(0)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Veo Pipeline Benchmark
+Runs the batch Veo pipeline against the local mock API and reports throughput
+
+Nothing is sent to Google and no credits are spent: the mock server stands in
+for generativelanguage.googleapis.com, videos land in a temporary directory and
+spend is recorded in a throwaway ledger. The build manifest, prompt store,
+catalog store and metrics are pointed (via their PHAZUR_* variables) into the
+same directory, so a run leaves nothing behind in the repository.
+
+Usage:
+    python scripts/benchmark-veo-pipeline.py                              # 12 lessons, defaults
+    python scripts/benchmark-veo-pipeline.py --lessons 24 --in-flight 1 3 6
+    python scripts/benchmark-veo-pipeline.py --render-seconds 10 --rate-429 0.1 --failure-rate 0.05
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from pathlib import Path
+from contextlib import redirect_stdout
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts' / 'pipeline'))
+from veo_mock import MockConfig, VeoMockServer
+from veo_budget import BudgetLedger
+from metrics import MetricsRecorder, format_report
+
+
+# Everything the generator would otherwise write under temp/
+STATE_FILES = {
+    'PHAZUR_BUILD_MANIFEST': 'build-manifest.json',
+    'PHAZUR_PROMPT_STORE': 'veo-prompt-store.jsonl',
+    'PHAZUR_CATALOG_STORE': 'course-catalog.jsonl',
+    'PHAZUR_METRICS_FILE': 'metrics.jsonl',
+    'PHAZUR_MEDIA_INFO_CACHE': 'media-info-cache.json',
+}
+
+
+def load_generator(api_base: str, work_dir: Path):
+    """Import generate-all-course-videos.py with its API base pointed at the mock
+    and its state files in work_dir"""
+    os.environ['VEO_API_BASE'] = api_base
+    os.environ['GOOGLE_GEMINI_API_KEY'] = 'mock'
+    for variable, name in STATE_FILES.items():
+        os.environ[variable] = str(work_dir / name)
+    spec = importlib.util.spec_from_file_location(
+        'generate_all_course_videos', PROJECT_ROOT / 'scripts' / 'generate-all-course-videos.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_once(args, max_in_flight: int) -> dict:
+    config = MockConfig(render_seconds=args.render_seconds, latency=args.latency, failure_rate=args.failure_rate,
+                        rate_429=args.rate_429, retry_after=args.retry_after,
+                        video_bytes=int(args.video_mb * 1024 * 1024), seed=args.seed)
+    work_dir = Path(tempfile.mkdtemp(prefix='veo-bench-'))
+
+    try:
+        with VeoMockServer(config) as server:
+            generator = load_generator(server.base_url, work_dir)
+            generator.OUTPUT_DIR = work_dir / 'lessons'
+
+            jobs = []
+            for course in generator.catalog().courses:
+                jobs.extend(generator.collect_lesson_jobs(course)[0])
+            jobs = jobs[:args.lessons]
+
+            pipeline = generator.VeoPipeline(model='fast', max_in_flight=max_in_flight,
+                                             poll_interval=args.poll_interval, submit_interval=args.submit_interval,
+                                             ledger=BudgetLedger(work_dir / 'ledger.json'),
+                                             backoff_base=args.backoff_base,
+                                             metrics=MetricsRecorder('veo', work_dir / 'metrics.jsonl'))
+
+            log_path = work_dir / 'pipeline.log'
+            with open(log_path, 'w') as log_file, redirect_stdout(sys.stdout if args.verbose else log_file):
+                result = pipeline.run(jobs)
+
+            return {'in_flight': max_in_flight, 'result': result, 'server': server.stats,
+                    'stages': format_report(pipeline.metrics.records)}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def report(run: dict):
+    result = run['result']
+    stats = result['stats']
+    server = run['server']
+    wall = stats['wall_seconds'] or 1e-9
+    generated = result['generated']
+
+    print(f"\n  In flight:      {run['in_flight']}")
+    print(f"  Generated:      {generated} ({result['failed']} failed)")
+    print(f"  Wall time:      {wall:.1f}s")
+    print(f"  Lessons/hour:   {generated / wall * 3600:.0f}")
+    print(f"  Polls:          {stats['polls']} ({stats['polls'] / max(generated, 1):.1f}/lesson, "
+          f"{stats['poll_seconds']:.1f}s = {stats['poll_seconds'] / wall:.0%} of wall)")
+    print(f"  Idle:           {stats['idle_seconds']:.1f}s ({stats['idle_seconds'] / wall:.0%} of wall)")
+    print(f"  Backoff:        {stats['backoff_seconds']:.1f}s")
+    print(f"  Server:         {server.submits} submits, {server.rejected_429} x 429, "
+          f"{server.downloads} downloads, peak {server.max_concurrent} rendering")
+    print("\n" + "\n".join(f"  {line}" for line in run['stages'].splitlines()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Veo batch pipeline against a local mock API')
+    parser.add_argument('--lessons', type=int, default=12, help='Lessons to generate per run (default: 12)')
+    parser.add_argument('--in-flight', type=int, nargs='+', default=[3],
+                        help='max_in_flight values to compare (default: 3)')
+    parser.add_argument('--render-seconds', type=float, default=5, help='Mock render time per video')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mock latency per request')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of renders that fail')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of submissions rejected with 429')
+    parser.add_argument('--retry-after', type=int, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--video-mb', type=float, default=2, help='Size of each mock video')
+    parser.add_argument('--poll-interval', type=float, default=1, help='Pipeline poll interval')
+    parser.add_argument('--submit-interval', type=float, default=0, help='Pipeline submit spacing')
+    parser.add_argument('--backoff-base', type=float, default=1, help='Pipeline backoff after the first 429')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help='Show the pipeline log')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VEO PIPELINE BENCHMARK (mock API)")
+    print("=" * 60)
+    print(f"  Lessons: {args.lessons} | Render: {args.render_seconds}s | "
+          f"429 rate: {args.rate_429:.0%} | Failure rate: {args.failure_rate:.0%}")
+
+    for max_in_flight in args.in_flight:
+        report(run_once(args, max_in_flight))
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ Complete course data for video generation and database seeding
 from dataclasses import dataclass
 from typing import List, Dict
 
+from catalog import CourseCatalog
+
 # ============================================================================
 # INSTRUCTOR DEFINITIONS
 # ============================================================================
@@ -673,47 +675,16 @@ ALL_COURSES = [
     COURSE_6_ENTERPRISE,
 ]
 
+# Indexed, read-only view of the courses above (see catalog.py)
+CATALOG = CourseCatalog(ALL_COURSES, INSTRUCTORS)
+
 def get_all_lessons():
     """Get flat list of all lessons across all courses"""
-    lessons = []
-    for course in ALL_COURSES:
-        instructor = INSTRUCTORS[course['instructor_id']]
-        for module in course['modules']:
-            for lesson in module['lessons']:
-                lessons.append({
-                    'lesson_id': lesson['id'],
-                    'title': lesson['title'],
-                    'type': lesson['type'],
-                    'duration': lesson['duration'],
-                    'course_id': course['id'],
-                    'course_title': course['title'],
-                    'module_id': module['id'],
-                    'module_title': module['title'],
-                    'instructor_id': instructor['id'],
-                    'instructor_name': instructor['name'],
-                })
-    return lessons
+    return [dict(row) for row in CATALOG.lesson_rows]
 
 def get_course_summary():
     """Get summary statistics"""
-    total_lessons = 0
-    total_modules = 0
-    total_minutes = 0
-
-    for course in ALL_COURSES:
-        total_modules += len(course['modules'])
-        for module in course['modules']:
-            total_lessons += len(module['lessons'])
-            for lesson in module['lessons']:
-                total_minutes += lesson['duration']
-
-    return {
-        'courses': len(ALL_COURSES),
-        'modules': total_modules,
-        'lessons': total_lessons,
-        'total_minutes': total_minutes,
-        'total_hours': round(total_minutes / 60, 1),
-    }
+    return dict(CATALOG.summary)
 
 if __name__ == '__main__':
     summary = get_course_summary()
@@ -726,10 +697,9 @@ if __name__ == '__main__':
     print(f"Total Duration: {summary['total_hours']} hours ({summary['total_minutes']} min)")
     print(f"{'='*60}\n")
 
-    for course in ALL_COURSES:
-        instructor = INSTRUCTORS[course['instructor_id']]
-        lesson_count = sum(len(m['lessons']) for m in course['modules'])
-        print(f"{course['title']}")
-        print(f"  Instructor: {instructor['name']}")
-        print(f"  Modules: {len(course['modules'])} | Lessons: {lesson_count}")
+    for course in CATALOG.courses:
+        instructor = CATALOG.instructor(course.instructor_id)
+        print(f"{course.title}")
+        print(f"  Instructor: {instructor.name}")
+        print(f"  Modules: {len(course.modules)} | Lessons: {len(CATALOG.lessons_in(course.id))}")
         print()
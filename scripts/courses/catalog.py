@@ -0,0 +1,294 @@
+"""
+Phazur Labs Academy - Course Catalog
+Indexed, read-only view of the curriculum, built once at import
+
+The curriculum is authored as nested dicts (ALL_COURSES -> modules -> lessons).
+CourseCatalog turns that tree into frozen, slotted records and indexes them by
+lesson id, course id/slug, module and instructor, so lookups are O(1) and flat
+lesson lists and summary totals are computed once instead of on every call.
+
+Records also answer record['key'] and record.get('key', default), so code
+written against the dicts (course['modules'], lesson.get('type')) reads them
+unchanged. Nested details (quiz, assignment, project, final_test) are read-only
+mappings, and keys the record has no field for are kept in `extra`. The long
+fields a record lists in _DEFERRED may also hold a Deferred value, loaded on
+first access - catalog_store.py uses this to keep long text on disk until
+something reads it. Every other field is a plain slot.
+"""
+
+from dataclasses import dataclass, field, fields
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, Iterable, Mapping, Optional, Tuple
+
+_EMPTY = MappingProxyType({})
+
+
+class Deferred:
+    """Field value that is loaded the first time it is read"""
+
+    __slots__ = ()
+
+    def load(self):
+        raise NotImplementedError
+
+
+def freeze(value):
+    """Read-only copy of nested dicts / lists"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Plain dicts / lists again, e.g. for JSON"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class _DeferredSlot:
+    """Wraps a record's slot so a Deferred value is loaded (and kept) on first read"""
+
+    __slots__ = ('slot',)
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if isinstance(value, Deferred):
+            value = value.load()
+            self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+
+class Record:
+    """Base for catalog records: attribute access plus dict-style reads"""
+
+    __slots__ = ()
+    _FIELDS: ClassVar[frozenset] = frozenset()
+    _DERIVED: ClassVar[Tuple[str, ...]] = ()   # fields filled in by the catalog, not authored
+    _DEFERRED: ClassVar[Tuple[str, ...]] = ()  # long fields that may hold a Deferred value
+
+    def __getitem__(self, key: str):
+        if key in self._FIELDS:
+            return getattr(self, key)
+        try:
+            return self.extra[key]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return (key in self._FIELDS and getattr(self, key) is not None) or key in self.extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as authored (derived fields and unset optional ones left out)"""
+        data = {name: thaw(getattr(self, name)) for name in self._FIELDS
+                if name not in self._DERIVED and name != 'extra' and getattr(self, name) is not None}
+        data.update(thaw(self.extra))
+        return data
+
+    @classmethod
+    def _split(cls, source: Mapping, **derived) -> Dict[str, Any]:
+        """Constructor kwargs from an authored dict: known keys as fields, the rest as extra"""
+        known = {name: freeze(value) for name, value in source.items() if name in cls._FIELDS and name != 'extra'}
+        extra = {name: value for name, value in source.items() if name not in cls._FIELDS}
+        return dict(known, extra=freeze(extra), **derived)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Instructor(Record):
+    id: str
+    name: str
+    specialty: str = ''
+    style: str = ''
+    appearance: str = ''
+    voice: str = ''
+    extra: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Lesson(Record):
+    id: str
+    title: str
+    type: str = 'concept'
+    duration: int = 0
+    course_id: str = ''
+    module_id: str = ''
+    instructor_id: str = ''
+    index: int = 0                   # position in the whole curriculum
+    extra: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+    _DERIVED: ClassVar[Tuple[str, ...]] = ('course_id', 'module_id', 'instructor_id', 'index')
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Module(Record):
+    id: str
+    title: str
+    description: str = ''
+    order: int = 0
+    lessons: Tuple[Lesson, ...] = ()
+    quiz: Optional[Mapping[str, Any]] = None
+    assignment: Optional[Mapping[str, Any]] = None
+    course_id: str = ''
+    extra: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+    _DERIVED: ClassVar[Tuple[str, ...]] = ('course_id',)
+    _DEFERRED: ClassVar[Tuple[str, ...]] = ('description', 'quiz', 'assignment')
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Course(Record):
+    id: str
+    title: str
+    slug: str = ''
+    instructor_id: str = ''
+    description: str = ''
+    level: str = 'intermediate'
+    duration_minutes: int = 0
+    modules: Tuple[Module, ...] = ()
+    final_test: Optional[Mapping[str, Any]] = None
+    project: Optional[Mapping[str, Any]] = None
+    extra: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+    _DEFERRED: ClassVar[Tuple[str, ...]] = ('description', 'final_test', 'project')
+
+
+for _record in (Instructor, Lesson, Module, Course):
+    _record._FIELDS = frozenset(f.name for f in fields(_record))
+    for _name in _record._DEFERRED:
+        setattr(_record, _name, _DeferredSlot(_record.__dict__[_name]))
+
+
+class CourseCatalog:
+    def __init__(self, courses: Iterable[Mapping], instructors: Mapping[str, Mapping]):
+        self.instructors: Mapping[str, Instructor] = MappingProxyType({
+            instructor_id: Instructor(**Instructor._split(data))
+            for instructor_id, data in instructors.items()})
+
+        built, lessons = [], []
+        for source in courses:
+            modules = []
+            for module_source in source['modules']:
+                module_lessons = []
+                for lesson_source in module_source['lessons']:
+                    lesson = Lesson(**Lesson._split(
+                        lesson_source, course_id=source['id'], module_id=module_source['id'],
+                        instructor_id=source.get('instructor_id', ''), index=len(lessons)))
+                    module_lessons.append(lesson)
+                    lessons.append(lesson)
+                module = {key: value for key, value in module_source.items() if key != 'lessons'}
+                modules.append(Module(**Module._split(module, course_id=source['id'],
+                                                      lessons=tuple(module_lessons))))
+            course = {key: value for key, value in source.items() if key != 'modules'}
+            built.append(Course(**Course._split(course, modules=tuple(modules))))
+
+        self.courses: Tuple[Course, ...] = tuple(built)
+        self.lessons: Tuple[Lesson, ...] = tuple(lessons)
+
+        self._courses: Dict[str, Course] = {}
+        for course in self.courses:
+            for key in {course.id, course.slug} - {''}:
+                if self._courses.get(key, course) is not course:
+                    raise ValueError(f"Course id/slug '{key}' is used twice")
+                self._courses[key] = course
+        self._modules = self._unique('module', (module for course in self.courses for module in course.modules))
+        self._lessons = self._unique('lesson', self.lessons)
+
+        by_course, by_instructor = {}, {}
+        for lesson in self.lessons:
+            by_course.setdefault(lesson.course_id, []).append(lesson)
+            by_instructor.setdefault(lesson.instructor_id, []).append(lesson)
+        self._by_course = {key: tuple(value) for key, value in by_course.items()}
+        self._by_instructor = {key: tuple(value) for key, value in by_instructor.items()}
+
+    @staticmethod
+    def _unique(kind: str, records: Iterable[Record]) -> Dict[str, Record]:
+        index = {}
+        for record in records:
+            if record.id in index:
+                raise ValueError(f"Duplicate {kind} id: {record.id}")
+            index[record.id] = record
+        return index
+
+    def course(self, key: str) -> Optional[Course]:
+        """Course by id or slug"""
+        return self._courses.get(key)
+
+    def module(self, module_id: str) -> Optional[Module]:
+        return self._modules.get(module_id)
+
+    def lesson(self, lesson_id: str) -> Optional[Lesson]:
+        return self._lessons.get(lesson_id)
+
+    def instructor(self, instructor_id: str) -> Optional[Instructor]:
+        return self.instructors.get(instructor_id)
+
+    def lessons_in(self, course_id: Optional[str] = None, module_id: Optional[str] = None,
+                   instructor_id: Optional[str] = None) -> Tuple[Lesson, ...]:
+        """Lessons of one course, module or instructor, in curriculum order"""
+        if module_id is not None:
+            module = self.module(module_id)
+            return module.lessons if module else ()
+        if course_id is not None:
+            course = self.course(course_id)
+            return self._by_course.get(course.id, ()) if course else ()
+        if instructor_id is not None:
+            return self._by_instructor.get(instructor_id, ())
+        return self.lessons
+
+    def courses_by(self, instructor_id: str) -> Tuple[Course, ...]:
+        return tuple(course for course in self.courses if course.instructor_id == instructor_id)
+
+    @cached_property
+    def lesson_rows(self) -> Tuple[Mapping[str, Any], ...]:
+        """One flat row per lesson with its course, module and instructor names"""
+        rows = []
+        for lesson in self.lessons:
+            course = self._courses[lesson.course_id]
+            module = self._modules[lesson.module_id]
+            instructor = self.instructors.get(lesson.instructor_id)
+            rows.append(MappingProxyType({
+                'lesson_id': lesson.id,
+                'title': lesson.title,
+                'type': lesson.type,
+                'duration': lesson.duration,
+                'course_id': course.id,
+                'course_title': course.title,
+                'module_id': module.id,
+                'module_title': module.title,
+                'instructor_id': lesson.instructor_id,
+                'instructor_name': instructor.name if instructor else 'Unknown',
+            }))
+        return tuple(rows)
+
+    @cached_property
+    def summary(self) -> Mapping[str, Any]:
+        total_minutes = sum(lesson.duration for lesson in self.lessons)
+        return MappingProxyType({
+            'courses': len(self.courses),
+            'modules': len(self._modules),
+            'lessons': len(self.lessons),
+            'total_minutes': total_minutes,
+            'total_hours': round(total_minutes / 60, 1),
+        })
@@ -0,0 +1,201 @@
+"""
+Phazur Labs Academy - Course Catalog Store
+Compiled, lazily loaded copy of the curriculum for fast CLI startup
+
+ai_implementation_courses.py is the source of truth, but importing it builds
+every course, module and lesson (with all their prose) as Python objects. This
+store is a JSON-lines file compiled from it:
+
+    line 1          header: format, source file stamp, number of course lines
+    line 2          instructors
+    lines 3..       one course per line - ids, titles, types, durations, ordering
+    rest of file    long fields (descriptions, quizzes, assignments, projects,
+                    final tests), each a JSON value addressed by [offset, length]
+
+load_catalog() reads only the header, instructor and course lines and returns
+a CourseCatalog whose long fields are Deferred: the file is mmap'ed while it is
+open, and a field is decoded the first time something reads it. Listing lessons
+or building Veo prompts therefore never touches the prose.
+
+The store is recompiled automatically when the source file changes (size and
+mtime, then content hash). If it can't be written, the source is used directly.
+
+Compile / inspect:
+    python scripts/courses/catalog_store.py
+    python scripts/courses/catalog_store.py --rebuild
+
+Configuration (environment):
+    PHAZUR_CATALOG_STORE   Store location (default: temp/course-catalog.jsonl)
+"""
+
+import os
+import sys
+import mmap
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from catalog import Course, CourseCatalog, Deferred, Module, freeze
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+SOURCE_FILE = Path(__file__).parent / "ai_implementation_courses.py"
+DEFAULT_STORE = PROJECT_ROOT / "temp" / "course-catalog.jsonl"
+STORE_FORMAT = 1
+
+# Fields kept out of the eagerly loaded lines (the ones the records can defer)
+LONG_FIELDS = {
+    'course': Course._DEFERRED,
+    'module': Module._DEFERRED,
+}
+
+
+class _Blob:
+    """The long-field section of a store, read from the map taken with its header"""
+
+    def __init__(self, data: mmap.mmap, start: int):
+        self.data = data
+        self.start = start
+
+    def read(self, offset: int, length: int) -> bytes:
+        return self.data[self.start + offset:self.start + offset + length]
+
+
+class StoredValue(Deferred):
+    __slots__ = ('blob', 'offset', 'length', '_value', '_loaded')
+
+    def __init__(self, blob: _Blob, offset: int, length: int):
+        self.blob = blob
+        self.offset = offset
+        self.length = length
+        self._loaded = False
+
+    def load(self):
+        if not self._loaded:
+            self._value = freeze(json.loads(self.blob.read(self.offset, self.length)))
+            self._loaded = True
+        return self._value
+
+
+def _source_stamp(source: Path, digest: bool = True) -> Dict[str, Any]:
+    stat = source.stat()
+    stamp = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if digest:
+        stamp['sha256'] = hashlib.sha256(source.read_bytes()).hexdigest()
+    return stamp
+
+
+def compile_store(courses: Iterable[Mapping], instructors: Mapping[str, Mapping],
+                  path: Optional[Path] = None, source: Path = SOURCE_FILE) -> Path:
+    """Write the store for courses / instructors (authored dicts), atomically"""
+    path = Path(path or os.environ.get('PHAZUR_CATALOG_STORE', DEFAULT_STORE))
+    blob = bytearray()
+
+    def stash(record: Mapping, kind: str) -> Dict[str, Any]:
+        stored = dict(record)
+        for name in LONG_FIELDS[kind]:
+            if stored.get(name) is not None:
+                encoded = json.dumps(stored[name], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                stored[name] = {'$ref': [len(blob), len(encoded)]}
+                blob.extend(encoded)
+        return stored
+
+    lines = []
+    for course in courses:
+        stored = stash(course, 'course')
+        stored['modules'] = [stash(module, 'module') for module in course['modules']]
+        lines.append(json.dumps(stored, ensure_ascii=False, separators=(',', ':')))
+
+    header = {'format': STORE_FORMAT, 'source': _source_stamp(source), 'courses': len(lines)}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        for line in [json.dumps(header), json.dumps(instructors, ensure_ascii=False)] + lines:
+            f.write(line.encode('utf-8') + b'\n')
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _resolve_refs(record: Dict[str, Any], blob: _Blob) -> Dict[str, Any]:
+    for name, value in record.items():
+        if isinstance(value, dict) and '$ref' in value:
+            record[name] = StoredValue(blob, *value['$ref'])
+    return record
+
+
+def read_store(path: Path) -> CourseCatalog:
+    """Catalog from a compiled store (long fields deferred)"""
+    with open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != STORE_FORMAT:
+            raise ValueError(f"Unsupported catalog store format: {header.get('format')}")
+        instructors = json.loads(f.readline())
+        lines = [f.readline() for _ in range(header['courses'])]
+        # Map now, not on first read: a recompile replaces the file, and the
+        # offsets above only hold for this one. Pages still load on demand.
+        blob = _Blob(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), f.tell())
+
+    courses = []
+    for line in lines:
+        course = _resolve_refs(json.loads(line), blob)
+        course['modules'] = [_resolve_refs(module, blob) for module in course['modules']]
+        courses.append(course)
+    return CourseCatalog(courses, instructors)
+
+
+def _is_current(path: Path, source: Path) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return False
+    stored = header.get('source', {})
+    if header.get('format') != STORE_FORMAT:
+        return False
+    current = _source_stamp(source, digest=False)
+    if stored.get('size') == current['size'] and stored.get('mtime_ns') == current['mtime_ns']:
+        return True
+    # Touched but maybe not changed (e.g. a checkout): compare contents
+    return stored.get('sha256') == _source_stamp(source)['sha256']
+
+
+def load_catalog(path: Optional[Path] = None, rebuild: bool = False) -> CourseCatalog:
+    """The course catalog, from the store when it is current (recompiling it if not).
+
+    catalog.courses and catalog.instructors read like ALL_COURSES and INSTRUCTORS;
+    catalog.summary and catalog.lesson_rows replace get_course_summary() / get_all_lessons().
+    """
+    path = Path(path or os.environ.get('PHAZUR_CATALOG_STORE', DEFAULT_STORE))
+    if not rebuild and _is_current(path, SOURCE_FILE):
+        return read_store(path)
+
+    import ai_implementation_courses as source
+    try:
+        compile_store(source.ALL_COURSES, source.INSTRUCTORS, path)
+    except OSError as e:
+        print(f"⚠️  Could not write course catalog store ({e}), using the source directly", file=sys.stderr)
+    return source.CATALOG
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile and inspect the course catalog store')
+    parser.add_argument('--store', type=Path, help='Store location (default: PHAZUR_CATALOG_STORE or temp/)')
+    parser.add_argument('--rebuild', action='store_true', help='Recompile even if the store is current')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = load_catalog(args.store, rebuild=args.rebuild)
+    seconds = time.perf_counter() - start
+    path = Path(args.store or os.environ.get('PHAZUR_CATALOG_STORE', DEFAULT_STORE))
+    summary = catalog.summary
+
+    print(f"📚 {summary['courses']} courses | {summary['modules']} modules | {summary['lessons']} lessons")
+    print(f"💾 Store: {path} ({path.stat().st_size / 1024:.1f} KB)")
+    print(f"⏱  Loaded in {seconds * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,13 +7,17 @@ Usage:
     python scripts/custom-video-generator.py --lesson lesson-react-1-1
     python scripts/custom-video-generator.py --lesson lesson-react-1-1 --test
     python scripts/custom-video-generator.py --script "Your custom script here"
+
+Batch front-ends (batch-custom-videos.py, generate-phazur-videos.py,
+multi-instructor-generator.py) import VideoGenerator and hand it every lesson
+at once via generate_many(), so TTS and SadTalker load once per batch.
 """
 
 import os
 import sys
+import shutil
 import argparse
 import subprocess
-import json
 from pathlib import Path
 from datetime import datetime
 
@@ -22,27 +26,65 @@ SADTALKER_PATH = Path(__file__).parent.parent / "tools" / "SadTalker"
 sys.path.insert(0, str(SADTALKER_PATH))
 
 try:
-    from TTS.api import TTS
+    import TTS
 except ImportError:
     print("❌ Coqui TTS not installed. Run: pip install coqui-tts")
     sys.exit(1)
 
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / "pipeline"))
+from xtts_engine import XTTSEngine, format_timings
+from sadtalker_worker import SadTalkerWorker, SadTalkerWorkerError
+from build_manifest import BuildManifest
+from lesson_dag import LessonPipeline, LessonSkipped, Stage, StageError, format_utilization
+from metrics import MetricsRecorder, current_stage
+from media_info import media_info, validate_media
+
+# SadTalker and branding settings every video is rendered with
+RENDER_SETTINGS = {"renderer": "sadtalker", "size": 512, "enhancer": "gfpgan", "preprocess": "full",
+                   "still": True, "title_seconds": 3}
+
+# --test: half resolution and no face enhancer, for quick previews
+TEST_RENDER_SETTINGS = dict(RENDER_SETTINGS, size=256, enhancer=None)
+
+# The joined video has one avcC (taken from the head), so the re-encoded head
+# must agree with the stream-copied tail on all of these
+JOIN_PARAMS = ("codec", "profile", "level", "pix_fmt", "width", "height", "time_base")
+
+# H.264 profile names (as media_info / ffprobe report them) -> libx264 -profile:v
+X264_PROFILES = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main",
+                 "High": "high", "High 10": "high10", "High 4:2:2": "high422",
+                 "High 4:4:4 Predictive": "high444"}
+
 
 class VideoGenerator:
-    def __init__(self, test_mode=False):
+    def __init__(self, test_mode=False, force=False):
         self.test_mode = test_mode
+        self.force = force
+        self.render_settings = TEST_RENDER_SETTINGS if test_mode else RENDER_SETTINGS
         self.project_root = Path(__file__).parent.parent
         self.output_dir = self.project_root / "public" / "courses"
         self.temp_dir = self.project_root / "temp" / "video-generation"
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
-        # Voice model paths
-        self.voice_sample = self.project_root / "assets" / "instructor" / "voice-sample.wav"
-        self.instructor_photo = self.project_root / "assets" / "instructor" / "photo.jpg"
+        # Default voice and photo (INSTRUCTOR_* env vars override; lesson() can set them per lesson)
+        self.voice_sample = Path(os.environ.get(
+            "INSTRUCTOR_VOICE", self.project_root / "assets" / "instructor" / "voice-sample.wav"))
+        self.instructor_photo = Path(os.environ.get(
+            "INSTRUCTOR_PHOTO", self.project_root / "assets" / "instructor" / "photo.jpg"))
 
-        # Initialize TTS
-        print("🎤 Loading Coqui TTS model...")
-        self.tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
+        # SadTalker runs in a long-lived worker so checkpoints load once
+        self.sadtalker = SadTalkerWorker.shared(SADTALKER_PATH)
+
+        # Coqui TTS loads on first use, so up-to-date lessons skip it entirely
+        self.tts = XTTSEngine.shared()
+
+        # Lessons are only rebuilt when their inputs change (or with force); videos
+        # that predate the manifest are only adopted if they are intact
+        self.manifest = BuildManifest(validate=validate_media)
+
+        # Per-stage timings, CPU, memory and ffmpeg throughput (report: pipeline/metrics.py)
+        self.metrics = MetricsRecorder("custom-video")
 
     def load_lesson_script(self, lesson_id):
         """Extract lesson script from course-content.ts"""
@@ -80,89 +122,108 @@ You'll see how this approach leads to cleaner, more maintainable code.
 
         return example_scripts.get(lesson_id, f"This is the lesson content for {lesson_id}.")
 
-    def generate_audio(self, text, output_path):
+    def generate_audio(self, text, output_path, voice_sample=None):
         """Generate speech audio using Coqui TTS with voice cloning"""
+        voice_sample = Path(voice_sample or self.voice_sample)
+        if not self.tts.loaded:
+            print("🎤 Loading Coqui TTS model...")
+            self.tts.load()
+
         print("🎵 Generating audio with TTS...")
 
-        if self.voice_sample.exists():
+        if voice_sample.exists():
             # Use voice cloning
-            print(f"   Using voice clone from: {self.voice_sample}")
-            self.tts.tts_to_file(
-                text=text,
-                file_path=str(output_path),
-                speaker_wav=str(self.voice_sample),
-                language="en"
-            )
+            print(f"   Using voice clone from: {voice_sample}")
+            timings = self.tts.synthesize(text, output_path, speaker_wav=voice_sample)
         else:
             # Use default voice
             print("   Using default voice (no voice sample found)")
-            print(f"   Tip: Record a voice sample and save to: {self.voice_sample}")
-            self.tts.tts_to_file(
-                text=text,
-                file_path=str(output_path),
-                language="en"
-            )
+            print(f"   Tip: Record a voice sample and save to: {voice_sample}")
+            timings = self.tts.synthesize(text, output_path)
 
+        print(f"   ⏱  Model load {self.tts.load_seconds:.1f}s (once) | {format_timings(timings)}")
         print(f"✅ Audio generated: {output_path}")
         return output_path
 
-    def generate_video(self, audio_path, output_path):
-        """Generate talking head video using SadTalker"""
+    def generate_video(self, audio_path, output_path, instructor_photo=None):
+        """Generate talking head video using the shared SadTalker worker"""
+        instructor_photo = Path(instructor_photo or self.instructor_photo)
         print("🎬 Generating talking head video with SadTalker...")
 
-        if not self.instructor_photo.exists():
-            print(f"❌ Instructor photo not found: {self.instructor_photo}")
+        if not instructor_photo.exists():
+            print(f"❌ Instructor photo not found: {instructor_photo}")
             print("   Please add a photo at: assets/instructor/photo.jpg")
             return None
 
-        # Run SadTalker inference
-        sadtalker_script = SADTALKER_PATH / "inference.py"
-
-        cmd = [
-            "python", str(sadtalker_script),
-            "--driven_audio", str(audio_path),
-            "--source_image", str(self.instructor_photo),
-            "--result_dir", str(self.temp_dir),
-            "--enhancer", "gfpgan",
-            "--still",  # Minimize head movement for professional look
-            "--preprocess", "full",
-            "--size", "512"  # Higher quality
-        ]
-
         if self.test_mode:
-            print("   Running in TEST mode (faster, lower quality)")
-            cmd.append("--fps=15")
-        else:
-            cmd.append("--fps=30")
+            print(f"   Running in TEST mode ({self.render_settings['size']}px, no face enhancer)")
 
-        print(f"   Running: {' '.join(cmd)}")
+        if not self.sadtalker.running:
+            print("   Starting SadTalker worker (models load once per process)...")
 
         try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            self.sadtalker.start()
+            current_stage().track_process(self.sadtalker.pid)
+            video = self.sadtalker.render(
+                audio_path, instructor_photo, self.temp_dir / "results",
+                enhancer=self.render_settings["enhancer"],
+                still=self.render_settings["still"],  # Minimize head movement for professional look
+                preprocess=self.render_settings["preprocess"],
+                size=self.render_settings["size"]  # 512 for higher quality, 256 in test mode
+            )
             print("✅ Video generated successfully")
 
-            # SadTalker outputs to results folder - find the generated video
-            results_dir = self.temp_dir / "results"
-            if results_dir.exists():
-                videos = list(results_dir.glob("**/*.mp4"))
-                if videos:
-                    latest_video = max(videos, key=os.path.getctime)
-                    # Move to output path
-                    import shutil
-                    shutil.move(str(latest_video), str(output_path))
-                    return output_path
+            shutil.move(str(video), str(output_path))
+            return output_path
 
-            print("⚠️  Could not find generated video in results folder")
+        except SadTalkerWorkerError as e:
+            print(f"❌ SadTalker failed: {e}")
+            print(f"   Worker log: {self.sadtalker.log_path}")
             return None
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ SadTalker failed: {e}")
-            print(f"   stdout: {e.stdout}")
-            print(f"   stderr: {e.stderr}")
+    def _keyframe_after(self, video_path, seconds):
+        """First video keyframe timestamp at or after `seconds` (None if there is none)"""
+        # MP4 keyframe times come from the file's sample tables; anything else asks ffprobe
+        keyframes = self._video_stream_params(video_path).get("keyframes")
+        if keyframes is not None:
+            return next((pts for pts in keyframes if pts >= seconds), None)
+
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-skip_frame", "nokey",
+            "-read_intervals", f"%+{seconds + 30}",
+            "-show_entries", "frame=pts_time",
+            "-of", "csv=p=0",
+            str(video_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
             return None
 
-    def add_branding(self, video_path, output_path, lesson_title):
-        """Add intro, outro, and branding using FFmpeg"""
+        for line in result.stdout.split():
+            try:
+                pts = float(line.strip(","))
+            except ValueError:
+                continue
+            if pts >= seconds:
+                return pts
+        return None
+
+    def _video_stream_params(self, video_path):
+        """Codec parameters the re-encoded head must match for stream-copy concat"""
+        return media_info(video_path).stream("video") or {}
+
+    def add_branding(self, video_path, output_path, lesson_title, title_seconds=3):
+        """Add the title overlay, re-encoding only the opening GOPs.
+
+        The video is split at the first keyframe after the title ends: the head
+        is re-encoded with drawtext using the source's H.264 profile, level,
+        pixel format and timebase, the tail is stream-copied, and both are
+        joined with the concat demuxer. Falls back to a full re-encode if the
+        video has no keyframe after the title, the encoded head doesn't match
+        the source (JOIN_PARAMS), or any step fails.
+        """
         print("✨ Adding branding and effects...")
 
         # Create simple title overlay
@@ -170,9 +231,72 @@ You'll see how this approach leads to cleaner, more maintainable code.
             f"drawtext=text='{lesson_title}':"
             "fontsize=48:fontcolor=white:x=(w-text_w)/2:y=50:"
             "shadowcolor=black:shadowx=2:shadowy=2:"
-            "enable='between(t,0,3)'"  # Show for first 3 seconds
+            f"enable='between(t,0,{title_seconds})'"  # Show for the first title_seconds
         )
 
+        split_at = self._keyframe_after(video_path, title_seconds)
+        params = self._video_stream_params(video_path) if split_at else {}
+        profile = X264_PROFILES.get(params.get("profile"))
+        if split_at and params.get("codec") == "h264" and profile and params.get("level", 0) > 0:
+            parts_dir = self.temp_dir / f"{Path(output_path).stem}_branding"
+            parts_dir.mkdir(parents=True, exist_ok=True)
+            head = parts_dir / "head.mp4"
+            tail = parts_dir / "tail.mp4"
+            concat_list = parts_dir / "concat.txt"
+            head_cmd = [
+                "ffmpeg", "-y", "-i", str(video_path),
+                "-t", f"{split_at:.6f}",
+                "-an",
+                "-vf", drawtext_filter,
+                "-c:v", "libx264",
+                "-preset", "fast",
+                "-crf", "18",
+                "-profile:v", profile,
+                "-level", f"{int(params['level']) / 10:g}",
+                "-pix_fmt", params.get("pix_fmt", "yuv420p"),
+                "-r", params.get("r_frame_rate", "25"),
+                "-video_track_timescale", params.get("time_base", "1/12800").split("/")[-1],
+                str(head)
+            ]
+            tail_cmd = [
+                "ffmpeg", "-y",
+                "-ss", f"{split_at:.6f}", "-i", str(video_path),
+                "-an",
+                "-c:v", "copy",
+                "-avoid_negative_ts", "make_zero",
+                str(tail)
+            ]
+            concat_cmd = [
+                "ffmpeg", "-y",
+                "-f", "concat", "-safe", "0", "-i", str(concat_list),
+                "-i", str(video_path),
+                "-map", "0:v", "-map", "1:a?",
+                "-c", "copy",
+                "-movflags", "+faststart",
+                str(output_path)
+            ]
+
+            try:
+                result = subprocess.run(head_cmd, check=True, capture_output=True)
+                current_stage().ffmpeg("head", result.stderr)
+                head_params = self._video_stream_params(head)
+                mismatched = [key for key in JOIN_PARAMS if head_params.get(key) != params.get(key)]
+                if mismatched:
+                    print(f"⚠️  Title segment doesn't match the video ({', '.join(mismatched)}), "
+                          "re-encoding full video")
+                else:
+                    result = subprocess.run(tail_cmd, check=True, capture_output=True)
+                    current_stage().ffmpeg("tail", result.stderr)
+                    concat_list.write_text(f"file '{head.resolve()}'\nfile '{tail.resolve()}'\n")
+                    result = subprocess.run(concat_cmd, check=True, capture_output=True)
+                    current_stage().ffmpeg("concat", result.stderr)
+                    print(f"✅ Branding added (re-encoded first {split_at:.1f}s only): {output_path}")
+                    return output_path
+            except subprocess.CalledProcessError as e:
+                print(f"⚠️  Split branding failed, re-encoding full video: {e}")
+            finally:
+                shutil.rmtree(parts_dir, ignore_errors=True)
+
         cmd = [
             "ffmpeg", "-i", str(video_path),
             "-vf", drawtext_filter,
@@ -182,56 +306,135 @@ You'll see how this approach leads to cleaner, more maintainable code.
         ]
 
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            result = subprocess.run(cmd, check=True, capture_output=True)
+            current_stage().ffmpeg("full", result.stderr)
             print(f"✅ Branding added: {output_path}")
             return output_path
         except subprocess.CalledProcessError as e:
             print(f"⚠️  FFmpeg branding failed (using original video): {e}")
             # If branding fails, just use original video
-            import shutil
             shutil.copy(str(video_path), str(output_path))
             return output_path
 
-    def generate(self, lesson_id=None, script=None, title=None):
-        """Main generation workflow"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def lesson_inputs(self, lesson_script, lesson_title, voice_sample=None, instructor_photo=None):
+        """Everything that determines a video, for the build manifest"""
+        return {
+            "script": lesson_script,
+            "title": lesson_title,
+            "voice": Path(voice_sample or self.voice_sample),
+            "avatar": Path(instructor_photo or self.instructor_photo),
+            "settings": self.render_settings,
+        }
 
-        # Get script
+    def lesson(self, lesson_id=None, script=None, title=None, output_name=None,
+               voice_sample=None, instructor_photo=None):
+        """Describe one video for generate_many()"""
         if script:
             lesson_script = script
             lesson_title = title or "Custom Lesson"
-            output_name = f"custom_{timestamp}"
+            output_name = output_name or f"custom_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         else:
             lesson_script = self.load_lesson_script(lesson_id)
-            lesson_title = lesson_id.replace("-", " ").title()
-            output_name = lesson_id
+            lesson_title = title or lesson_id.replace("-", " ").title()
+            output_name = output_name or lesson_id
+
+        return {
+            "lesson_id": lesson_id or output_name,
+            "script": lesson_script,
+            "title": lesson_title,
+            "output_name": output_name,
+            "voice_sample": Path(voice_sample or self.voice_sample),
+            "instructor_photo": Path(instructor_photo or self.instructor_photo),
+        }
 
-        print(f"\n{'='*60}")
-        print(f"🎬 Generating video: {lesson_title}")
-        print(f"{'='*60}\n")
+    # Pipeline stages. Each receives only the artifacts it declares in stages().
+
+    def _plan(self, a):
+        final_video = self.output_dir / f"{a['output_name']}.mp4"
+        inputs = self.lesson_inputs(a["script"], a["title"], a["voice_sample"], a["instructor_photo"])
+        reason = "forced" if self.force else self.manifest.check(
+            final_video, inputs, lesson_id=a["lesson_id"], generator="custom-video")
+        if reason is None:
+            raise LessonSkipped(f"up to date: {final_video} (use --force to rebuild)")
+
+        print(f"🎬 Generating video: {a['title']} ({reason})")
+        return {
+            "inputs": inputs,
+            "final_video": final_video,
+            "audio_file": self.temp_dir / f"{a['output_name']}_audio.wav",
+            "raw_file": self.temp_dir / f"{a['output_name']}_raw.mp4",
+        }
 
-        # Step 1: Generate audio
-        audio_file = self.temp_dir / f"{output_name}_audio.wav"
-        self.generate_audio(lesson_script, audio_file)
+    def _narrate(self, a):
+        return {"audio": self.generate_audio(a["script"], a["audio_file"], a["voice_sample"])}
 
-        # Step 2: Generate talking head video
-        raw_video = self.temp_dir / f"{output_name}_raw.mp4"
-        video_result = self.generate_video(audio_file, raw_video)
+    def _render(self, a):
+        raw_video = self.generate_video(a["audio"], a["raw_file"], a["instructor_photo"])
+        if not raw_video:
+            raise StageError("talking head generation failed")
+        return {"raw_video": raw_video}
 
-        if not video_result:
-            print("❌ Video generation failed")
-            return None
+    def _brand(self, a):
+        # Brand into temp and move into place only when done, so an interrupted run
+        # never leaves a partial video where the manifest would find it
+        branded = self.temp_dir / f"{a['final_video'].stem}_branded.mp4"
+        self.add_branding(a["raw_video"], branded, a["title"], title_seconds=self.render_settings["title_seconds"])
+        a["final_video"].parent.mkdir(parents=True, exist_ok=True)
+        os.replace(branded, a["final_video"])
+        return {"video": a["final_video"]}
 
-        # Step 3: Add branding
-        final_video = self.output_dir / f"{output_name}.mp4"
-        final_video.parent.mkdir(parents=True, exist_ok=True)
-        self.add_branding(raw_video, final_video, lesson_title)
+    def _record(self, a):
+        self.manifest.record(a["video"], a["inputs"], lesson_id=a["lesson_id"], generator="custom-video")
 
         # Cleanup temp files
         if not self.test_mode:
-            print("🧹 Cleaning up temporary files...")
-            audio_file.unlink(missing_ok=True)
-            raw_video.unlink(missing_ok=True)
+            a["audio"].unlink(missing_ok=True)
+            a["raw_video"].unlink(missing_ok=True)
+
+    def stages(self):
+        """Lesson DAG: plan -> narrate (TTS) -> render (SadTalker) -> brand (ffmpeg) -> record"""
+        return [
+            Stage("plan", self._plan, pool="io",
+                  needs=("lesson_id", "output_name", "script", "title", "voice_sample", "instructor_photo"),
+                  makes=("inputs", "final_video", "audio_file", "raw_file")),
+            Stage("narrate", self._narrate, pool="tts", checkpoint=True,
+                  needs=("script", "voice_sample", "audio_file"), makes=("audio",)),
+            Stage("render", self._render, pool="render", checkpoint=True,
+                  needs=("audio", "instructor_photo", "raw_file"), makes=("raw_video",)),
+            Stage("brand", self._brand, pool="cpu", checkpoint=True,
+                  needs=("raw_video", "final_video", "title"), makes=("video",)),
+            Stage("record", self._record, pool="io",
+                  needs=("lesson_id", "video", "inputs", "audio", "raw_video")),
+        ]
+
+    def generate_many(self, lessons, throttle=None, journal=None, on_finish=None):
+        """Run lessons (from lesson()) through the stage pipeline; returns a LessonResult per lesson.
+
+        throttle (a pipeline Throttle) holds back new lessons while the machine is hot or loaded.
+        journal (a pipeline BatchJournal) checkpoints narration, rendering and branding so an
+        interrupted batch resumes where each lesson left off.
+        on_finish is called with each LessonResult as soon as that lesson is built, skipped or failed.
+        Every stage is measured into self.metrics.
+        """
+        pipeline = LessonPipeline(self.stages(), throttle=throttle, journal=journal, metrics=self.metrics,
+                                  on_finish=on_finish)
+        results = pipeline.run(lessons)
+        if any(result.status == "built" for result in results):
+            print(f"⏱  Pool utilization: {format_utilization(pipeline.stats)}")
+            print(f"📈 Stage time: {self.metrics.summary()} (run {self.metrics.run_id}, {self.metrics.path})")
+        return results
+
+    def generate(self, lesson_id=None, script=None, title=None, output_name=None):
+        """Main generation workflow"""
+        lesson = self.lesson(lesson_id=lesson_id, script=script, title=title, output_name=output_name)
+        final_video = self.output_dir / f"{lesson['output_name']}.mp4"
+
+        result = self.generate_many([lesson])[0]
+        if result.status == "skipped":
+            return final_video
+        if result.status != "built":
+            print("❌ Video generation failed")
+            return None
 
         print(f"\n{'='*60}")
         print(f"✅ VIDEO GENERATION COMPLETE!")
@@ -248,20 +451,24 @@ def main():
     parser.add_argument("--lesson", help="Lesson ID (e.g., lesson-react-1-1)")
     parser.add_argument("--script", help="Custom script text")
     parser.add_argument("--title", help="Custom video title")
-    parser.add_argument("--test", action="store_true", help="Test mode (faster, lower quality)")
+    parser.add_argument("--test", action="store_true", help="Test mode (256px, no face enhancer; keeps temp files)")
+    parser.add_argument("--output-name", help="Output file name without extension (default: lesson ID)")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild even if the script, voice, photo and settings are unchanged")
 
     args = parser.parse_args()
 
     if not args.lesson and not args.script:
         parser.error("Must specify either --lesson or --script")
 
-    generator = VideoGenerator(test_mode=args.test)
+    generator = VideoGenerator(test_mode=args.test, force=args.force)
 
     try:
         result = generator.generate(
             lesson_id=args.lesson,
             script=args.script,
-            title=args.title
+            title=args.title,
+            output_name=args.output_name
         )
 
         if result:
@@ -27,7 +27,11 @@ import time
 import argparse
 import requests
 from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -44,10 +48,28 @@ PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUT_DIR = PROJECT_ROOT / 'public' / 'videos' / 'lessons'
 SCRIPTS_DIR = PROJECT_ROOT / 'temp'
 API_KEY = os.environ.get('GOOGLE_GEMINI_API_KEY', '')
+VEO_API_BASE = os.environ.get('VEO_API_BASE', 'https://generativelanguage.googleapis.com/v1beta')
 
-# Import course data from curriculum module
+# Import course data from the compiled curriculum store (long text loads on demand)
 sys.path.insert(0, str(PROJECT_ROOT / 'scripts' / 'courses'))
-from ai_implementation_courses import ALL_COURSES, INSTRUCTORS, get_all_lessons, get_course_summary
+from catalog_store import load_catalog
+
+
+@lru_cache(maxsize=None)
+def catalog():
+    """The course catalog, loaded on first use (so importing this module writes nothing)"""
+    return load_catalog()
+
+
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts' / 'pipeline'))
+from veo_budget import BudgetLedger, estimate_credits, lesson_priority
+from downloader import Downloader, DownloadError
+from build_manifest import BuildManifest
+from metrics import MetricsRecorder, StageMetrics
+from prompt_store import PromptStore
+
+# Text of every prompt a video was built from, keyed by its manifest hash
+PROMPTS = PromptStore()
 
 # Veo model options
 VEO_MODELS = {
@@ -59,7 +81,7 @@ VEO_MODELS = {
 # INSTRUCTOR APPEARANCE PROFILES FOR VEO (NEXUS-PRIME: GENESIS Agent)
 # ============================================================================
 
-# These appearance descriptions extend the base INSTRUCTORS data for Veo prompts
+# These appearance descriptions extend the catalog's instructor data for Veo prompts
 INSTRUCTOR_VEO_PROFILES = {
     'james-park': {
         'appearance': 'Professional Asian male instructor with academic presence, research lab setting with AI visualizations on screens, smart casual with glasses, warm and patient demeanor',
@@ -91,7 +113,8 @@ INSTRUCTOR_VEO_PROFILES = {
 # ============================================================================
 # COURSE DATA (Loaded from ai_implementation_courses.py)
 # ============================================================================
-# Courses are imported from the curriculum module. Use ALL_COURSES and INSTRUCTORS.
+# Courses come from ai_implementation_courses.py via the catalog store. Use catalog()
+# for lookups by course, module, lesson or instructor.
 #
 # Available courses:
 #   - ai-foundations: AI Foundations & Tool Mastery (14 lessons)
@@ -107,56 +130,77 @@ INSTRUCTOR_VEO_PROFILES = {
 # VIDEO PROMPT TEMPLATES (NEXUS-PRIME: GENESIS Agent)
 # ============================================================================
 
-def get_video_prompt(instructor_id: str, lesson: dict, course_title: str, module_title: str = '') -> str:
-    """Generate Veo prompt for a lesson based on instructor and lesson type.
+# AI Implementation-specific prompt templates with Phazur Labs branding.
+# {appearance}, {background} and {branding} are filled in once per instructor
+# (compile_prompt_template), {lesson_title} and {course_title} per lesson.
+# Branding elements: Red (#e61919) and Yellow (#ffd000) accent colors, modern tech aesthetic
+VEO_BRANDING = "Subtle Phazur Labs Academy branding visible - red and yellow accent colors, modern tech aesthetic"
 
-    Optimized for AI Implementation curriculum with focused, professional prompts.
-    """
-    instructor = INSTRUCTORS.get(instructor_id, {})
-    veo_profile = INSTRUCTOR_VEO_PROFILES.get(instructor_id, {})
-
-    instructor_name = instructor.get('name', 'Professional instructor')
-    appearance = veo_profile.get('appearance', 'Professional instructor in modern tech environment')
-    background = veo_profile.get('background', 'modern tech office')
-
-    lesson_type = lesson.get('type', 'concept')
-    lesson_title = lesson.get('title', '')
-
-    # AI Implementation-specific prompt templates with Phazur Labs branding
-    # Branding elements: Red (#e61919) and Yellow (#ffd000) accent colors, modern tech aesthetic
-    branding = "Subtle Phazur Labs Academy branding visible - red and yellow accent colors, modern tech aesthetic"
-
-    base_prompts = {
-        'welcome': f"""{appearance} speaking directly to camera in a modern,
+PROMPT_TEMPLATES = {
+    'welcome': """{appearance} speaking directly to camera in a modern,
 minimalist studio with AI visualization elements in background. {branding}.
 Warm, welcoming expression and confident body language. Clean {background} with soft gradient lighting.
 The instructor gestures naturally while introducing an exciting AI learning journey.
 Cinematic quality, 16:9 aspect ratio, professional education video style.
 Topic: {lesson_title} - Introduction to {course_title}""",
 
-        'concept': f"""{appearance} in an elegant AI teaching environment
+    'concept': """{appearance} in an elegant AI teaching environment
 explaining core concepts. {branding}. Standing beside a large modern display showing AI architecture
 diagrams and neural network visualizations. The instructor uses natural hand gestures
 to explain relationships between AI concepts. Clean aesthetic with professional studio lighting.
 {background} visible in background.
 Topic: {lesson_title} - Core AI concepts in {course_title}""",
 
-        'advanced': f"""{appearance} in a high-tech AI development environment
+    'advanced': """{appearance} in a high-tech AI development environment
 demonstrating advanced techniques. {branding}. Interacting with holographic-style code displays,
 agent architectures, and data flow visualizations. Dynamic but controlled camera movement.
 Futuristic yet approachable aesthetic with red and yellow AI-themed accents.
 The instructor shows deep AI expertise while remaining accessible.
 Topic: {lesson_title} - Advanced AI techniques in {course_title}""",
 
-        'practical': f"""{appearance} in a hands-on AI workshop setting
+    'practical': """{appearance} in a hands-on AI workshop setting
 demonstrating practical implementation. {branding}. Multiple screens visible showing code, API responses,
 and AI tool interfaces. The instructor actively demonstrates building AI systems.
 Warm, productive atmosphere with natural lighting. {background} setting.
 Cinematic 16:9 quality, professional education video.
 Topic: {lesson_title} - Hands-on AI implementation in {course_title}""",
-    }
+}
 
-    return base_prompts.get(lesson_type, base_prompts['concept'])
+def _literal(text: str) -> str:
+    """Text to embed in a format template without its braces being parsed"""
+    return text.replace('{', '{{').replace('}', '}}')
+
+@lru_cache(maxsize=None)
+def compile_prompt_template(instructor_id: str, lesson_type: str) -> str:
+    """Prompt template for one instructor and lesson type, leaving only {lesson_title} and {course_title}"""
+    veo_profile = INSTRUCTOR_VEO_PROFILES.get(instructor_id, {})
+    template = PROMPT_TEMPLATES.get(lesson_type, PROMPT_TEMPLATES['concept'])
+    return template.format(
+        appearance=_literal(veo_profile.get('appearance', 'Professional instructor in modern tech environment')),
+        background=_literal(veo_profile.get('background', 'modern tech office')),
+        branding=_literal(VEO_BRANDING),
+        lesson_title='{lesson_title}',
+        course_title='{course_title}',
+    )
+
+@lru_cache(maxsize=4096)
+def _render_prompt(instructor_id: str, lesson_type: str, lesson_title: str, course_title: str) -> str:
+    return compile_prompt_template(instructor_id, lesson_type).format(lesson_title=lesson_title,
+                                                                      course_title=course_title)
+
+def clear_prompt_cache():
+    """Forget compiled templates and prompts (after editing INSTRUCTOR_VEO_PROFILES or PROMPT_TEMPLATES)"""
+    compile_prompt_template.cache_clear()
+    _render_prompt.cache_clear()
+
+def get_video_prompt(instructor_id: str, lesson: dict, course_title: str, module_title: str = '') -> str:
+    """Generate Veo prompt for a lesson based on instructor and lesson type.
+
+    Optimized for AI Implementation curriculum with focused, professional prompts.
+    Prompts are memoized on everything they are built from, so a lesson whose
+    title, type or course changes in the catalog simply gets a new entry.
+    """
+    return _render_prompt(instructor_id, lesson.get('type', 'concept'), lesson.get('title', ''), course_title)
 
 # ============================================================================
 # VEO API INTEGRATION (NEXUS-PRIME: QUANTUM-DEV Agent)
@@ -174,8 +218,15 @@ def load_api_key():
                     break
     return API_KEY
 
-def generate_video(prompt: str, model: str = 'fast') -> dict:
-    """Generate video using Veo API"""
+class VeoQuotaError(Exception):
+    """Veo rejected a submission with 429 (rate limit or quota exhausted)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def submit_video(prompt: str, model: str = 'fast') -> str:
+    """Start a Veo generation and return its long-running operation name"""
     api_key = load_api_key()
     if not api_key:
         raise ValueError("GOOGLE_GEMINI_API_KEY not configured")
@@ -185,7 +236,7 @@ def generate_video(prompt: str, model: str = 'fast') -> dict:
     log(f"  Generating with {model_id}...")
     log(f"  Prompt: {prompt[:100]}...")
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_id}:predictLongRunning"
+    url = f"{VEO_API_BASE}/models/{model_id}:predictLongRunning"
 
     response = requests.post(
         url,
@@ -200,6 +251,11 @@ def generate_video(prompt: str, model: str = 'fast') -> dict:
         }
     )
 
+    if response.status_code == 429:
+        retry_after = response.headers.get('Retry-After')
+        raise VeoQuotaError(f"Veo API error (429): {response.text}",
+                            float(retry_after) if retry_after and retry_after.isdigit() else None)
+
     if response.status_code != 200:
         error = response.text
         raise Exception(f"Veo API error ({response.status_code}): {error}")
@@ -211,36 +267,48 @@ def generate_video(prompt: str, model: str = 'fast') -> dict:
         raise Exception(f"No operation name in response: {result}")
 
     log(f"  Operation: {operation_name}")
-    return wait_for_video(operation_name, api_key)
+    return operation_name
 
-def wait_for_video(operation_name: str, api_key: str, timeout: int = 600) -> dict:
-    """Poll for video generation completion"""
-    start = time.time()
+def check_operation(operation_name: str, api_key: str) -> Optional[dict]:
+    """Poll an operation once. Returns the video result when done, None while still running."""
+    url = f"{VEO_API_BASE}/{operation_name}"
+    response = requests.get(url, headers={'x-goog-api-key': api_key})
 
-    while time.time() - start < timeout:
-        url = f"https://generativelanguage.googleapis.com/v1beta/{operation_name}"
-        response = requests.get(url, headers={'x-goog-api-key': api_key})
+    if response.status_code != 200:
+        log(f"  Warning: Poll error {response.status_code}")
+        return None
 
-        if response.status_code != 200:
-            log(f"  Warning: Poll error {response.status_code}")
-            time.sleep(10)
-            continue
+    result = response.json()
 
-        result = response.json()
+    if not result.get('done'):
+        return None
 
-        if result.get('done'):
-            if 'error' in result:
-                raise Exception(f"Generation failed: {result['error']}")
+    if 'error' in result:
+        raise Exception(f"Generation failed: {result['error']}")
 
-            gen_response = result.get('response', {}).get('generateVideoResponse', {})
-            samples = gen_response.get('generatedSamples', [])
-            if samples:
-                video_uri = samples[0].get('video', {}).get('uri')
-                if video_uri:
-                    log("  Video generated!")
-                    return {'videoUrl': video_uri, 'result': result, 'apiKey': api_key}
+    gen_response = result.get('response', {}).get('generateVideoResponse', {})
+    samples = gen_response.get('generatedSamples', [])
+    if samples:
+        video_uri = samples[0].get('video', {}).get('uri')
+        if video_uri:
+            return {'videoUrl': video_uri, 'result': result, 'apiKey': api_key}
 
-            raise Exception(f"No video URI in result: {result}")
+    raise Exception(f"No video URI in result: {result}")
+
+def generate_video(prompt: str, model: str = 'fast') -> dict:
+    """Generate video using Veo API"""
+    operation_name = submit_video(prompt, model)
+    return wait_for_video(operation_name, load_api_key())
+
+def wait_for_video(operation_name: str, api_key: str, timeout: int = 600) -> dict:
+    """Poll for video generation completion"""
+    start = time.time()
+
+    while time.time() - start < timeout:
+        video = check_operation(operation_name, api_key)
+        if video:
+            log("  Video generated!")
+            return video
 
         elapsed = int(time.time() - start)
         print(f"\r  Processing... ({elapsed}s elapsed)", end='', flush=True)
@@ -256,18 +324,13 @@ def download_video(video_url: str, output_path: Path, api_key: str = None) -> bo
     if api_key:
         headers['x-goog-api-key'] = api_key
 
-    response = requests.get(video_url, headers=headers, stream=True)
-    if response.status_code != 200:
-        log(f"  Download failed: {response.status_code}")
+    try:
+        size = Downloader.shared().download(video_url, output_path, headers=headers)
+    except DownloadError as e:
+        log(f"  Download failed: {e}")
         return False
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-
-    size_mb = output_path.stat().st_size / (1024 * 1024)
+    size_mb = size / (1024 * 1024)
     log(f"  Saved: {output_path} ({size_mb:.1f} MB)")
     return True
 
@@ -277,14 +340,11 @@ def download_video(video_url: str, output_path: Path, api_key: str = None) -> bo
 
 def get_course_by_slug(slug: str):
     """Find course by slug/id"""
-    for course in ALL_COURSES:
-        if course['id'] == slug or course['slug'] == slug:
-            return course
-    return None
+    return catalog().course(slug)
 
 def list_all_courses():
     """List all courses and lessons from AI Implementation curriculum"""
-    summary = get_course_summary()
+    summary = catalog().summary
 
     log("=" * 70)
     log("PHAZUR LABS ACADEMY - AI Implementation Curriculum")
@@ -293,18 +353,17 @@ def list_all_courses():
     log(f"Veo Budget: ~315 credits (39% of 800)")
     log("=" * 70)
 
-    for course in ALL_COURSES:
-        instructor = INSTRUCTORS.get(course['instructor_id'], {})
-        lesson_count = sum(len(m['lessons']) for m in course['modules'])
+    for course in catalog().courses:
+        instructor = catalog().instructor(course.instructor_id)
 
-        log(f"\n{course['title']}")
-        log(f"  ID: {course['id']}")
-        log(f"  Instructor: {instructor.get('name', 'Unknown')}")
-        log(f"  Level: {course.get('level', 'intermediate')}")
-        log(f"  Modules: {len(course['modules'])} | Lessons: {lesson_count}")
+        log(f"\n{course.title}")
+        log(f"  ID: {course.id}")
+        log(f"  Instructor: {instructor.name if instructor else 'Unknown'}")
+        log(f"  Level: {course.level}")
+        log(f"  Modules: {len(course.modules)} | Lessons: {len(catalog().lessons_in(course.id))}")
 
-        for i, module in enumerate(course['modules'], 1):
-            log(f"    {i}. {module['title']} ({len(module['lessons'])} lessons)")
+        for i, module in enumerate(course.modules, 1):
+            log(f"    {i}. {module.title} ({len(module.lessons)} lessons)")
 
     log("\n" + "=" * 70)
     log("SUMMARY")
@@ -315,19 +374,291 @@ def list_all_courses():
     log(f"Duration: {summary['total_hours']} hours ({summary['total_minutes']} min)")
     log("=" * 70)
 
-def generate_course_videos(course_slug: str, model: str = 'fast', dry_run: bool = False):
+def collect_lesson_jobs(course: dict, model: str = 'fast', manifest: Optional[BuildManifest] = None,
+                        force: bool = False) -> tuple:
+    """Lessons of a course that need a (re)build, plus the count already up to date.
+
+    With a manifest, a lesson is rebuilt when its prompt or model changed;
+    without one, only lessons with no video on disk are built.
+    """
+    jobs = []
+    skipped = 0
+
+    for module in course['modules']:
+        for lesson in module['lessons']:
+            output_path = OUTPUT_DIR / f"lesson-{lesson['id']}-veo.mp4"
+            prompt = get_video_prompt(course['instructor_id'], lesson, course['title'], module['title'])
+            inputs = {'prompt': prompt, 'model': VEO_MODELS.get(model, model)}
+
+            if force:
+                reason = 'forced'
+            elif manifest:
+                reason = manifest.check(output_path, inputs, lesson_id=lesson['id'], generator='veo')
+                if reason and 'prompt' in reason:
+                    # Both keys resolve in the prompt store: prompt_store.py OLD NEW shows the diff
+                    old_key = manifest.entry(output_path)['inputs'].get('prompt')
+                    reason += f" ({old_key} -> {PromptStore.key(prompt)})"
+            else:
+                reason = None if output_path.exists() else 'new'
+
+            if reason is None:
+                if manifest and not manifest.read_only:
+                    PROMPTS.put(prompt)  # so a later prompt change can be diffed against it
+                skipped += 1
+                continue
+
+            jobs.append({
+                'lesson': lesson,
+                'course': course,
+                'module': module,
+                'output_path': output_path,
+                'prompt': prompt,
+                'inputs': inputs,
+                'reason': reason,
+            })
+
+    return jobs, skipped
+
+class VeoPipeline:
+    """Keeps several Veo operations in flight, polls them from one loop, and
+    downloads finished videos in the background while others render.
+
+    Args:
+        model: Veo model to use ('fast' or 'quality')
+        max_in_flight: Operations rendering at the same time
+        poll_interval: Seconds between polling rounds
+        submit_interval: Minimum seconds between submissions (default none: a 429 backs off instead)
+        timeout: Per-operation render timeout in seconds
+        limit: Max videos to generate (0 = unlimited)
+        manifest: BuildManifest to record finished videos in
+        ledger: BudgetLedger recording credits spent per model per day
+        daily_credits: Credits available per day across models (0 = no credit cap)
+        backoff_base: Seconds to wait after the first 429, doubled on each one after
+        max_backoffs: Consecutive 429s before the quota is treated as exhausted for today
+        metrics: MetricsRecorder for per-lesson submit / provider render / download stages
+    """
+
+    def __init__(self, model: str = 'fast', max_in_flight: int = 3, poll_interval: float = 5,
+                 submit_interval: float = 0, timeout: int = 600, limit: int = 0,
+                 manifest: Optional[BuildManifest] = None, ledger: Optional[BudgetLedger] = None, daily_credits: float = 0,
+                 backoff_base: float = 30, max_backoffs: int = 4, metrics: Optional[MetricsRecorder] = None):
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.submit_interval = submit_interval
+        self.timeout = timeout
+        self.limit = limit
+        self.manifest = manifest
+        self.ledger = ledger
+        self.daily_credits = daily_credits
+        self.backoff_base = backoff_base
+        self.max_backoffs = max_backoffs
+        self.metrics = metrics
+        self.clip_credits = estimate_credits(model)
+
+        self.generated = 0
+        self.failed = 0
+        self.quota_exhausted = False
+        self.budget_reached = False
+        self._backoffs = 0
+        self._resume_at = 0.0
+        self.stats = {'polls': 0, 'poll_seconds': 0.0, 'idle_seconds': 0.0, 'backoff_seconds': 0.0,
+                      'wall_seconds': 0.0}
+
+    def _title(self, job: dict) -> str:
+        return job['lesson']['title']
+
+    def _has_capacity(self, in_flight: dict, downloads: dict) -> bool:
+        if self.quota_exhausted or len(in_flight) >= self.max_in_flight:
+            return False
+        if time.time() < self._resume_at:
+            return False
+        if self.limit > 0 and self.generated + len(in_flight) + len(downloads) >= self.limit:
+            return False
+        return self._within_budget()
+
+    def _within_limit(self) -> bool:
+        return self.limit <= 0 or self.generated < self.limit
+
+    def _within_budget(self) -> bool:
+        if not self.ledger or self.daily_credits <= 0:
+            return True
+        if self.ledger.remaining_today(self.daily_credits) < self.clip_credits:
+            self.budget_reached = True
+            return False
+        return True
+
+    def _can_start_more(self) -> bool:
+        return not self.quota_exhausted and self._within_limit() and self._within_budget()
+
+    def _back_off(self, error: VeoQuotaError):
+        """Delay further submissions after a 429, giving up for today after max_backoffs"""
+        self._backoffs += 1
+        if self._backoffs > self.max_backoffs:
+            log(f"      [QUOTA EXHAUSTED] {self._backoffs - 1} backoffs without success, stopping for today")
+            self.quota_exhausted = True
+            if self.ledger:
+                self.ledger.mark_exhausted(self.model)
+            return
+
+        delay = max(error.retry_after or 0, self.backoff_base * 2 ** (self._backoffs - 1))
+        log(f"      [RATE LIMITED] Backing off {delay:.0f}s ({self._backoffs}/{self.max_backoffs})")
+        self._resume_at = time.time() + delay
+
+    def _record_stage(self, job: dict, stage: str, seconds: float, ok: bool = True,
+                      api: Optional[StageMetrics] = None):
+        if self.metrics:
+            self.metrics.record(job['lesson']['id'], stage, seconds, status='ok' if ok else 'failed',
+                                api=api.api if api else {})
+
+    def _submit(self, job: dict, in_flight: dict, pending: deque):
+        log(f"\n  [SUBMIT] {self._title(job)} ({job['reason']})")
+        calls = StageMetrics(job['lesson']['id'], 'submit')
+        submit_start = time.time()
+        try:
+            operation_name = submit_video(job['prompt'], model=self.model)
+        except VeoQuotaError as e:
+            calls.api_call('veo.submit', time.time() - submit_start, ok=False)
+            self._record_stage(job, 'submit', time.time() - submit_start, ok=False, api=calls)
+            pending.appendleft(job)
+            self._back_off(e)
+            return
+        except Exception as e:
+            calls.api_call('veo.submit', time.time() - submit_start, ok=False)
+            self._record_stage(job, 'submit', time.time() - submit_start, ok=False, api=calls)
+            self.failed += 1
+            if self.ledger:
+                self.ledger.record_failure(self.model)
+            log(f"      [ERROR] {self._title(job)}: {e}")
+            return
+
+        calls.api_call('veo.submit', time.time() - submit_start)
+        self._record_stage(job, 'submit', time.time() - submit_start, api=calls)
+        self._backoffs = 0
+        job['polls'] = StageMetrics(job['lesson']['id'], 'provider_render')
+        in_flight[operation_name] = (job, time.time())
+        # Credits are charged when an operation is accepted, so record them before it renders
+        if self.ledger:
+            self.ledger.record_spend(self.model, self.clip_credits)
+
+    def _poll(self, in_flight: dict, downloads: dict, downloader: ThreadPoolExecutor):
+        api_key = load_api_key()
+        for operation_name, (job, started) in list(in_flight.items()):
+            poll_start = time.time()
+            try:
+                video = check_operation(operation_name, api_key)
+            except Exception as e:
+                job['polls'].api_call('veo.poll', time.time() - poll_start, ok=False)
+                self._record_stage(job, 'provider_render', time.time() - started, ok=False, api=job['polls'])
+                del in_flight[operation_name]
+                self.failed += 1
+                if self.ledger:
+                    self.ledger.record_failure(self.model)
+                log(f"      [ERROR] {self._title(job)}: {e}")
+                continue
+            finally:
+                self.stats['polls'] += 1
+                self.stats['poll_seconds'] += time.time() - poll_start
+            job['polls'].api_call('veo.poll', time.time() - poll_start)
+
+            if video:
+                del in_flight[operation_name]
+                self._record_stage(job, 'provider_render', time.time() - started, api=job['polls'])
+                log(f"  [RENDERED] {self._title(job)} ({int(time.time() - started)}s)")
+                future = downloader.submit(self._download, video, job)
+                downloads[future] = job
+            elif time.time() - started > self.timeout:
+                del in_flight[operation_name]
+                self._record_stage(job, 'provider_render', time.time() - started, ok=False, api=job['polls'])
+                self.failed += 1
+                log(f"      [ERROR] {self._title(job)}: Video generation timed out")
+
+    def _download(self, video: dict, job: dict) -> bool:
+        if not self.metrics:
+            return download_video(video['videoUrl'], job['output_path'], video.get('apiKey'))
+        with self.metrics.stage(job['lesson']['id'], 'download', outputs=[job['output_path']]):
+            return download_video(video['videoUrl'], job['output_path'], video.get('apiKey'))
+
+    def _collect(self, downloads: dict):
+        for future in [f for f in downloads if f.done()]:
+            job = downloads.pop(future)
+            try:
+                ok = future.result()
+            except Exception as e:
+                log(f"      [ERROR] Download {self._title(job)}: {e}")
+                ok = False
+
+            if ok:
+                self.generated += 1
+                if self.manifest:
+                    self.manifest.record(job['output_path'], job['inputs'], lesson_id=job['lesson']['id'],
+                                         generator='veo')
+                    PROMPTS.put(job['prompt'])
+                log(f"      [SUCCESS] Saved to {job['output_path'].name}")
+            else:
+                self.failed += 1
+                log(f"      [FAILED] Download failed for {self._title(job)}")
+
+    def run(self, jobs: List[dict]) -> dict:
+        """Generate every job, returning generated/failed counts and pipeline stats"""
+        pending = deque(jobs)
+        in_flight = {}
+        downloads = {}
+        last_submit = 0.0
+        start = time.time()
+
+        if self.ledger and self.ledger.is_exhausted(self.model):
+            log(f"[QUOTA EXHAUSTED] {self.model} quota already used up today ({self.ledger.today})")
+            self.quota_exhausted = True
+            return {'generated': 0, 'failed': 0, 'quota_exhausted': True, 'stats': self.stats}
+
+        with ThreadPoolExecutor(max_workers=2) as downloader:
+            while in_flight or downloads or (pending and self._can_start_more()):
+                while pending and self._has_capacity(in_flight, downloads):
+                    wait = last_submit + self.submit_interval - time.time()
+                    if wait > 0:
+                        time.sleep(wait)
+                    self._submit(pending.popleft(), in_flight, pending)
+                    last_submit = time.time()
+
+                self._poll(in_flight, downloads, downloader)
+                self._collect(downloads)
+
+                if in_flight or downloads:
+                    idle_start = time.time()
+                    time.sleep(self.poll_interval if in_flight else 0.5)
+                    if not downloads:
+                        self.stats['idle_seconds'] += time.time() - idle_start
+                elif pending and self._resume_at > time.time():
+                    wait = self._resume_at - time.time()
+                    time.sleep(wait)
+                    self.stats['backoff_seconds'] += wait
+
+        self.stats['wall_seconds'] = time.time() - start
+        if self.limit > 0 and self.generated >= self.limit and pending:
+            log(f"\n[LIMIT REACHED] Stopping at {self.generated} videos")
+        if self.budget_reached and pending:
+            log(f"\n[BUDGET REACHED] {self.daily_credits:g} daily credits spent")
+        if self.metrics and self.metrics.records:
+            log(f"\nStage time: {self.metrics.summary()} (metrics run {self.metrics.run_id})")
+
+        return {'generated': self.generated, 'failed': self.failed, 'quota_exhausted': self.quota_exhausted,
+                'budget_reached': self.budget_reached, 'stats': self.stats}
+
+def generate_course_videos(course_slug: str, model: str = 'fast', dry_run: bool = False, max_in_flight: int = 3,
+                           daily_credits: float = 0, force: bool = False):
     """Generate all videos for a single course"""
     course = get_course_by_slug(course_slug)
 
     if not course:
         log(f"Course not found: {course_slug}")
         log("Available courses:")
-        for c in ALL_COURSES:
-            log(f"  - {c['id']}: {c['title']}")
+        for c in catalog().courses:
+            log(f"  - {c.id}: {c.title}")
         return
 
-    instructor = INSTRUCTORS.get(course['instructor_id'], {})
-    instructor_name = instructor.get('name', 'Unknown')
+    instructor = catalog().instructor(course.instructor_id)
+    instructor_name = instructor.name if instructor else 'Unknown'
 
     log(f"\n{'=' * 70}")
     log(f"Generating videos for: {course['title']}")
@@ -335,64 +666,46 @@ def generate_course_videos(course_slug: str, model: str = 'fast', dry_run: bool
     log(f"Level: {course.get('level', 'intermediate')}")
     log(f"{'=' * 70}")
 
-    generated = 0
-    failed = 0
-    skipped = 0
+    manifest = BuildManifest(read_only=dry_run)  # a preview changes nothing
+    jobs, skipped = collect_lesson_jobs(course, model=model, manifest=manifest, force=force)
 
-    for module in course['modules']:
-        log(f"\nModule: {module['title']}")
-
-        for lesson in module['lessons']:
-            lesson_id = lesson['id']
-            output_path = OUTPUT_DIR / f"lesson-{lesson_id}-veo.mp4"
-
-            # Check if video already exists
-            if output_path.exists():
-                log(f"  [SKIP] {lesson['title']} - already exists")
-                skipped += 1
-                continue
-
-            log(f"\n  Generating: {lesson['title']}")
-
-            if dry_run:
-                prompt = get_video_prompt(course['instructor_id'], lesson, course['title'], module['title'])
-                log(f"  [DRY RUN] Would generate with prompt:")
-                log(f"    {prompt[:200]}...")
-                continue
-
-            try:
-                prompt = get_video_prompt(course['instructor_id'], lesson, course['title'], module['title'])
-                result = generate_video(prompt, model=model)
-
-                if download_video(result['videoUrl'], output_path, result.get('apiKey')):
-                    generated += 1
-                    log(f"  [SUCCESS] {lesson['title']}")
-                else:
-                    failed += 1
-                    log(f"  [FAILED] Download failed for {lesson['title']}")
-
-            except Exception as e:
-                failed += 1
-                log(f"  [ERROR] {lesson['title']}: {e}")
-
-            # Rate limiting - wait between videos
-            time.sleep(2)
+    if dry_run:
+        for job in jobs:
+            log(f"\n  Generating: {job['lesson']['title']} ({job['reason']})")
+            log(f"  [DRY RUN] Would generate with prompt:")
+            log(f"    {job['prompt'][:200]}...")
+        result = {'generated': 0, 'failed': 0}
+    else:
+        result = VeoPipeline(model=model, max_in_flight=max_in_flight, manifest=manifest, ledger=BudgetLedger(),
+                             daily_credits=daily_credits, metrics=MetricsRecorder('veo')).run(jobs)
 
     log(f"\n{'=' * 70}")
     log(f"Course Complete: {course['title']}")
-    log(f"Generated: {generated} | Failed: {failed} | Skipped: {skipped}")
+    log(f"Generated: {result['generated']} | Failed: {result['failed']} | Up to date: {skipped}")
     log(f"{'=' * 70}")
 
-def generate_all_videos(model: str = 'fast', batch_size: int = 10, dry_run: bool = False, daily_limit: int = 0):
+def generate_all_videos(model: str = 'fast', batch_size: int = 10, dry_run: bool = False, daily_limit: int = 0,
+                        max_in_flight: int = 3, daily_credits: float = 0, force: bool = False):
     """Generate videos for ALL courses in AI Implementation curriculum
 
+    Lessons from every course go through a single pipeline, so one course's
+    tail doesn't leave render slots idle. Pending lessons are ordered by
+    priority and submissions stop once today's credits in the ledger run out.
+    Lessons whose prompt and model are unchanged since their last build are skipped.
+
     Args:
         model: Veo model to use ('fast' or 'quality')
         batch_size: Not used currently
         dry_run: If True, only show what would be generated
         daily_limit: Max videos to generate (0 = unlimited)
+        max_in_flight: Veo operations rendering at the same time
+        daily_credits: Veo credits available per day (0 = no credit cap)
+        force: Rebuild every lesson, even if up to date
     """
-    summary = get_course_summary()
+    summary = catalog().summary
+    manifest = BuildManifest(read_only=dry_run)  # a preview changes nothing
+    ledger = BudgetLedger()
+    clip_credits = estimate_credits(model)
 
     log("=" * 70)
     log("NEXUS-PRIME: GENERATING AI IMPLEMENTATION VIDEOS")
@@ -400,172 +713,160 @@ def generate_all_videos(model: str = 'fast', batch_size: int = 10, dry_run: bool
     log(f"Curriculum: {summary['courses']} courses | {summary['lessons']} lessons")
     log(f"Model: {model}")
     log(f"Daily Limit: {daily_limit if daily_limit > 0 else 'unlimited'}")
+    log(f"In Flight: {max_in_flight}")
+    if daily_credits > 0:
+        log(f"Credits: {ledger.spent_today():g} of {daily_credits:g} spent today | ~{clip_credits:g} per video")
     log(f"Dry Run: {dry_run}")
     log("=" * 70)
 
-    total_generated = 0
+    jobs = []
     total_skipped = 0
-    total_failed = 0
-
-    for course in ALL_COURSES:
-        if daily_limit > 0 and total_generated >= daily_limit:
-            log(f"\n[DAILY LIMIT] Reached {daily_limit} videos. Stopping for today.")
-            break
-
-        result = generate_course_videos_with_limit(
-            course['id'],
-            model=model,
-            dry_run=dry_run,
-            remaining_limit=daily_limit - total_generated if daily_limit > 0 else 0
-        )
-
-        total_generated += result.get('generated', 0)
-        total_skipped += result.get('skipped', 0)
-        total_failed += result.get('failed', 0)
-
-        if daily_limit > 0 and total_generated >= daily_limit:
-            break
+    for course_index, course in enumerate(catalog().courses):
+        course_jobs, skipped = collect_lesson_jobs(course, model=model, manifest=manifest, force=force)
+        jobs.extend((lesson_priority(job, course_index), job) for job in course_jobs)
+        total_skipped += skipped
+    jobs = [job for _, job in sorted(jobs, key=lambda item: item[0])]
+
+    if dry_run:
+        planned = jobs[:daily_limit] if daily_limit > 0 else jobs
+        if daily_credits > 0:
+            planned = planned[:int(ledger.remaining_today(daily_credits) // clip_credits)]
+        for i, job in enumerate(planned, 1):
+            log(f"  [{i}] {job['course']['title']}: {job['lesson']['title']} ({job['reason']})")
+            log(f"      [DRY RUN] Would generate (~{clip_credits:g} credits)")
+        result = {'generated': len(planned), 'failed': 0, 'quota_exhausted': False}
+    else:
+        result = VeoPipeline(model=model, max_in_flight=max_in_flight, limit=daily_limit,
+                             manifest=manifest, ledger=ledger, daily_credits=daily_credits,
+                             metrics=MetricsRecorder('veo')).run(jobs)
+
+    total_generated = result['generated']
 
     log("\n" + "=" * 70)
     log("SESSION COMPLETE")
     log("=" * 70)
     log(f"Generated: {total_generated}")
-    log(f"Skipped (already exist): {total_skipped}")
-    log(f"Failed: {total_failed}")
+    log(f"Skipped (up to date): {total_skipped}")
+    log(f"Failed: {result['failed']}")
     log(f"Remaining: {summary['lessons'] - total_generated - total_skipped}")
+    if 'stats' in result:
+        stats = result['stats']
+        log(f"Wall time: {stats['wall_seconds'] / 60:.1f} min | Polls: {stats['polls']} "
+            f"({stats['poll_seconds']:.0f}s) | Idle: {stats['idle_seconds']:.0f}s | "
+            f"Backoff: {stats['backoff_seconds']:.0f}s")
+    if not dry_run:
+        log(f"Credits today: {ledger.spent_today():g}"
+            + (f" of {daily_credits:g}" if daily_credits > 0 else "")
+            + f" | All time: {ledger.total_spent():g}")
     log("=" * 70)
 
-    if daily_limit > 0 and total_generated >= daily_limit:
+    if result.get('quota_exhausted'):
+        log(f"\n{model} quota is exhausted for today; the next run resumes with the remaining lessons.")
+    elif result.get('budget_reached'):
+        log(f"\nRun again tomorrow to spend the next {daily_credits:g} credits!")
+    elif daily_limit > 0 and total_generated >= daily_limit:
         log(f"\nRun again tomorrow to generate the next {daily_limit} videos!")
 
 
-def generate_course_videos_with_limit(course_slug: str, model: str = 'fast', dry_run: bool = False, remaining_limit: int = 0):
+def generate_course_videos_with_limit(course_slug: str, model: str = 'fast', dry_run: bool = False,
+                                      remaining_limit: int = 0, max_in_flight: int = 3, daily_credits: float = 0,
+                                      force: bool = False):
     """Generate videos for a course with optional limit"""
     course = get_course_by_slug(course_slug)
 
     if not course:
         return {'generated': 0, 'skipped': 0, 'failed': 0}
 
-    instructor = INSTRUCTORS.get(course['instructor_id'], {})
-    instructor_name = instructor.get('name', 'Unknown')
-
-    log(f"\n{'─' * 50}")
-    log(f"Course: {course['title']}")
-    log(f"Instructor: {instructor_name}")
-    log(f"{'─' * 50}")
-
-    generated = 0
-    failed = 0
-    skipped = 0
-
-    for module in course['modules']:
-        if remaining_limit > 0 and generated >= remaining_limit:
-            break
-
-        for lesson in module['lessons']:
-            if remaining_limit > 0 and generated >= remaining_limit:
-                log(f"\n[LIMIT REACHED] Stopping at {generated} videos")
-                break
-
-            lesson_id = lesson['id']
-            output_path = OUTPUT_DIR / f"lesson-{lesson_id}-veo.mp4"
-
-            # Check if video already exists
-            if output_path.exists():
-                skipped += 1
-                continue
-
-            log(f"\n  [{generated + 1}] {lesson['title']}")
-
-            if dry_run:
-                prompt = get_video_prompt(course['instructor_id'], lesson, course['title'], module['title'])
-                log(f"      [DRY RUN] Would generate")
-                generated += 1
-                continue
-
-            try:
-                prompt = get_video_prompt(course['instructor_id'], lesson, course['title'], module['title'])
-                result = generate_video(prompt, model=model)
-
-                if download_video(result['videoUrl'], output_path, result.get('apiKey')):
-                    generated += 1
-                    log(f"      [SUCCESS] Saved to {output_path.name}")
-                else:
-                    failed += 1
-                    log(f"      [FAILED] Download failed")
-
-            except Exception as e:
-                failed += 1
-                error_msg = str(e)
-                if "429" in error_msg or "quota" in error_msg.lower():
-                    log(f"      [QUOTA EXHAUSTED] Daily limit reached")
-                    return {'generated': generated, 'skipped': skipped, 'failed': failed}
-                else:
-                    log(f"      [ERROR] {e}")
-
-            # Rate limiting
-            time.sleep(2)
-
-    return {'generated': generated, 'skipped': skipped, 'failed': failed}
-
-def save_all_lesson_scripts():
-    """Export all lesson scripts to JSON for reference and database seeding"""
-    all_scripts = []
-    summary = get_course_summary()
-
-    for course in ALL_COURSES:
-        instructor = INSTRUCTORS.get(course['instructor_id'], {})
-
-        for module in course['modules']:
-            for lesson in module['lessons']:
-                script_data = {
-                    'lessonId': lesson['id'],
-                    'title': lesson['title'],
-                    'courseId': course['id'],
-                    'courseSlug': course['slug'],
-                    'courseTitle': course['title'],
-                    'moduleId': module['id'],
-                    'moduleTitle': module['title'],
-                    'instructorId': course['instructor_id'],
-                    'instructorName': instructor.get('name', 'Unknown'),
+    manifest = BuildManifest(read_only=dry_run)  # a preview changes nothing
+    jobs, skipped = collect_lesson_jobs(course, model=model, manifest=manifest, force=force)
+    if dry_run:
+        planned = jobs[:remaining_limit] if remaining_limit > 0 else jobs
+        return {'generated': len(planned), 'skipped': skipped, 'failed': 0}
+
+    result = VeoPipeline(model=model, max_in_flight=max_in_flight, limit=remaining_limit,
+                         manifest=manifest, ledger=BudgetLedger(), daily_credits=daily_credits,
+                         metrics=MetricsRecorder('veo')).run(jobs)
+    return {'generated': result['generated'], 'skipped': skipped, 'failed': result['failed']}
+
+@contextmanager
+def atomic_output(path: Path):
+    """Write path via a temp file that replaces it only once writing succeeded"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def _json_item(value, indent: int) -> str:
+    """value as json.dump(indent=2) would lay it out at this nesting depth"""
+    return ' ' * indent + json.dumps(value, indent=2).replace('\n', '\n' + ' ' * indent)
+
+def iter_lesson_scripts():
+    """Export rows for every lesson, in curriculum order"""
+    for course in catalog().courses:
+        instructor = catalog().instructor(course.instructor_id)
+
+        for module in course.modules:
+            for lesson in module.lessons:
+                yield {
+                    'lessonId': lesson.id,
+                    'title': lesson.title,
+                    'courseId': course.id,
+                    'courseSlug': course.slug,
+                    'courseTitle': course.title,
+                    'moduleId': module.id,
+                    'moduleTitle': module.title,
+                    'instructorId': course.instructor_id,
+                    'instructorName': instructor.name if instructor else 'Unknown',
                     'lessonType': lesson.get('type', 'concept'),
                     'duration': lesson.get('duration', 6),
-                    'veoPrompt': get_video_prompt(
-                        course['instructor_id'],
-                        lesson,
-                        course['title'],
-                        module['title']
-                    ),
+                    'veoPrompt': get_video_prompt(course.instructor_id, lesson, course.title, module.title),
                 }
-                all_scripts.append(script_data)
-
-    # Save to temp directory
-    scripts_file = SCRIPTS_DIR / 'ai-implementation-lessons.json'
-    scripts_file.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(scripts_file, 'w') as f:
-        json.dump({
-            'summary': summary,
-            'lessons': all_scripts,
-            'generated_at': datetime.now().isoformat(),
-        }, f, indent=2)
-
-    log(f"Saved {len(all_scripts)} AI Implementation lesson scripts to {scripts_file}")
 
-    # Also save a simplified Veo prompts file
-    prompts_file = SCRIPTS_DIR / 'veo-prompts.json'
-    prompts = [{
-        'id': s['lessonId'],
-        'title': s['title'],
-        'prompt': s['veoPrompt'],
-    } for s in all_scripts]
+def save_all_lesson_scripts(jsonl: bool = False) -> int:
+    """Export all lesson scripts to JSON for reference and database seeding.
 
-    with open(prompts_file, 'w') as f:
-        json.dump(prompts, f, indent=2)
-
-    log(f"Saved {len(prompts)} Veo prompts to {prompts_file}")
-
-    return all_scripts
+    Both files are written in one pass over the catalog, a lesson at a time, and
+    only replace the previous export once complete. With jsonl, each file holds
+    one JSON object per line (the summary is left out) for streaming into seeders.
+    Returns the number of lessons exported.
+    """
+    suffix = 'jsonl' if jsonl else 'json'
+    scripts_file = SCRIPTS_DIR / f'ai-implementation-lessons.{suffix}'
+    prompts_file = SCRIPTS_DIR / f'veo-prompts.{suffix}'
+    count = 0
+
+    with atomic_output(scripts_file) as scripts, atomic_output(prompts_file) as prompts:
+        if not jsonl:
+            scripts.write('{\n  "summary": ' + _json_item(dict(catalog().summary), 2).lstrip() + ',\n  "lessons": [')
+            prompts.write('[')
+
+        for script_data in iter_lesson_scripts():
+            prompt_data = {
+                'id': script_data['lessonId'],
+                'title': script_data['title'],
+                'prompt': script_data['veoPrompt'],
+            }
+            if jsonl:
+                scripts.write(json.dumps(script_data) + '\n')
+                prompts.write(json.dumps(prompt_data) + '\n')
+            else:
+                separator = ',\n' if count else '\n'
+                scripts.write(separator + _json_item(script_data, 4))
+                prompts.write(separator + _json_item(prompt_data, 2))
+            count += 1
+
+        if not jsonl:
+            scripts.write(('\n  ]' if count else ']')
+                          + f',\n  "generated_at": {json.dumps(datetime.now().isoformat())}\n}}')
+            prompts.write('\n]' if count else ']')
+
+    log(f"Saved {count} AI Implementation lesson scripts to {scripts_file}")
+    log(f"Saved {count} Veo prompts to {prompts_file}")
+    return count
 
 # ============================================================================
 # MAIN EXECUTION
@@ -577,9 +878,14 @@ def main():
     parser.add_argument('--course', type=str, help='Generate videos for specific course')
     parser.add_argument('--all', action='store_true', help='Generate ALL videos for ALL courses')
     parser.add_argument('--export-scripts', action='store_true', help='Export all lesson scripts to JSON')
+    parser.add_argument('--jsonl', action='store_true', help='With --export-scripts, write JSON Lines instead')
     parser.add_argument('--model', default='fast', choices=['fast', 'quality'], help='Veo model quality')
     parser.add_argument('--daily-limit', type=int, default=10, help='Max videos per day (default: 10)')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be generated without actually generating')
+    parser.add_argument('--max-in-flight', type=int, default=3, help='Veo operations rendering at once (default: 3)')
+    parser.add_argument('--force', action='store_true', help='Rebuild lessons even if their prompt is unchanged')
+    parser.add_argument('--daily-credits', type=float, default=0,
+                        help='Veo credits to spend per day, tracked in temp/veo-ledger.json (default: no cap)')
 
     args = parser.parse_args()
 
@@ -588,15 +894,17 @@ def main():
         return
 
     if args.export_scripts:
-        save_all_lesson_scripts()
+        save_all_lesson_scripts(jsonl=args.jsonl)
         return
 
     if args.course:
-        generate_course_videos(args.course, model=args.model, dry_run=args.dry_run)
+        generate_course_videos(args.course, model=args.model, dry_run=args.dry_run, max_in_flight=args.max_in_flight,
+                               daily_credits=args.daily_credits, force=args.force)
         return
 
     if args.all:
-        generate_all_videos(model=args.model, dry_run=args.dry_run, daily_limit=args.daily_limit)
+        generate_all_videos(model=args.model, dry_run=args.dry_run, daily_limit=args.daily_limit,
+                            max_in_flight=args.max_in_flight, daily_credits=args.daily_credits, force=args.force)
         return
 
     parser.print_help()
@@ -18,8 +18,17 @@ import asyncio
 import argparse
 import subprocess
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
 
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / 'pipeline'))
+from tts_cache import AudioCache, edge_tts_engine_id, file_digest
+from tts_batch import EdgeTTSBatch, TTSJob
+from sadtalker_worker import SadTalkerWorker, SadTalkerWorkerError
+from build_manifest import BuildManifest
+from media_info import media_duration, validate_media
+
 # Edge TTS voices - professional narration voices
 VOICES = {
     "male_us": "en-US-GuyNeural",      # Professional male US
@@ -208,7 +217,8 @@ Let's explore the most useful custom hooks and build our own library of reusable
 }
 
 class CourseVideoGenerator:
-    def __init__(self, voice="female_us", use_sadtalker=False):
+    def __init__(self, voice="female_us", use_sadtalker=False, use_audio_cache=True, tts_concurrency=4,
+                 static_plate=True, force=False):
         self.project_root = Path(__file__).parent.parent
         self.output_dir = self.project_root / "public" / "videos" / "lessons"
         self.temp_dir = self.project_root / "temp" / "video-gen"
@@ -219,6 +229,11 @@ class CourseVideoGenerator:
         self.ffmpeg = self._find_ffmpeg()
         self.use_sadtalker = use_sadtalker
 
+        # Narration cache (skips TTS for unchanged scripts)
+        self.audio_cache = AudioCache() if use_audio_cache else None
+        self.tts_concurrency = tts_concurrency
+        self.prepared_audio = set()
+
         # SadTalker paths
         self.sadtalker_dir = self.project_root / "tools" / "SadTalker"
         self.sadtalker_available = (self.sadtalker_dir / "checkpoints").exists()
@@ -232,6 +247,14 @@ class CourseVideoGenerator:
         self.bg_color = "0x0f172a"  # Dark slate
         self.accent_color = "0x3b82f6"  # Blue
 
+        # Simple mode renders the static frame once and loops it for each lesson
+        self.static_plate = static_plate
+        self.plates_dir = self.project_root / "temp" / "plates"
+
+        # Lessons are only rebuilt when their inputs change (or with force)
+        self.manifest = BuildManifest()
+        self.force = force
+
     def _find_ffmpeg(self):
         """Find FFmpeg binary"""
         paths = [
@@ -245,8 +268,43 @@ class CourseVideoGenerator:
                 return path
         return "ffmpeg"
 
+    def lesson_inputs(self, lesson_id: str) -> dict:
+        """Everything that determines a lesson's video, for the build manifest"""
+        lesson = LESSON_SCRIPTS[lesson_id]
+        realistic = self.use_sadtalker and self.sadtalker_available
+        return {
+            'script': lesson["script"],
+            'title': [lesson["title"], lesson["course"]],
+            'voice': self.voice,
+            'avatar': self.avatar_path,
+            'settings': {'renderer': 'sadtalker' if realistic else 'simple',
+                         'colors': [self.bg_color, self.accent_color]},
+        }
+
+    def needs_build(self, lesson_id: str) -> str:
+        """Why a lesson's video must be (re)built, or None if it is up to date"""
+        if self.force:
+            return "forced"
+        return self.manifest.check(self.output_dir / f"{lesson_id}.mp4", self.lesson_inputs(lesson_id),
+                                   lesson_id=lesson_id, generator="course-videos")
+
+    def stale_lessons(self, lesson_ids: list) -> list:
+        """The lessons that need building, reporting how many are up to date"""
+        stale = [lesson_id for lesson_id in lesson_ids if self.needs_build(lesson_id)]
+        if len(stale) < len(lesson_ids):
+            print(f"⏭  {len(lesson_ids) - len(stale)} lessons up to date (use --force to rebuild)")
+        return stale
+
     async def generate_audio(self, text: str, output_path: Path) -> bool:
-        """Generate audio using edge-tts"""
+        """Generate audio using edge-tts (reused from the audio cache when unchanged)"""
+        cache_key = None
+        if self.audio_cache:
+            cache_key = self.audio_cache.key(text, self.voice, edge_tts_engine_id())
+            if self.audio_cache.fetch(cache_key, output_path):
+                size_kb = output_path.stat().st_size / 1024
+                print(f"  ♻️  Audio reused from cache: {size_kb:.1f} KB")
+                return True
+
         import edge_tts
 
         print(f"  🎤 Generating audio with Edge TTS ({self.voice})...")
@@ -257,17 +315,26 @@ class CourseVideoGenerator:
         if output_path.exists():
             size_kb = output_path.stat().st_size / 1024
             print(f"  ✅ Audio generated: {size_kb:.1f} KB")
+            if cache_key:
+                self.audio_cache.put(cache_key, output_path)
             return True
         return False
 
-    def get_audio_duration(self, audio_path: Path) -> float:
-        """Get audio duration using ffprobe"""
-        cmd = [
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", str(audio_path)
+    async def prepare_audio(self, lesson_ids: list):
+        """Synthesize narration for all lessons up front (concurrent batch TTS stage)"""
+        jobs = [
+            TTSJob(lesson_id, LESSON_SCRIPTS[lesson_id]["script"], self.voice,
+                   self.temp_dir / f"{lesson_id}.mp3")
+            for lesson_id in lesson_ids
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return float(result.stdout.strip())
+        print(f"\n🎤 Preparing narration for {len(jobs)} lessons...")
+        batch = EdgeTTSBatch(concurrency=self.tts_concurrency, audio_cache=self.audio_cache)
+        results = await batch.run(jobs)
+        self.prepared_audio.update(lesson_id for lesson_id, ok in results.items() if ok)
+
+    def get_audio_duration(self, audio_path: Path) -> float:
+        """Get audio duration (read from the file header, cached by path/size/mtime)"""
+        return media_duration(audio_path)
 
     def generate_realistic_video(self, audio_path: Path, output_path: Path) -> bool:
         """Generate realistic talking head video using SadTalker AI"""
@@ -294,71 +361,50 @@ class CourseVideoGenerator:
         sadtalker_output = self.temp_dir / "sadtalker_output"
         sadtalker_output.mkdir(parents=True, exist_ok=True)
 
-        # Run SadTalker inference
-        cmd = [
-            sys.executable,
-            str(self.sadtalker_dir / "inference.py"),
-            "--driven_audio", str(wav_path),
-            "--source_image", str(self.avatar_path),
-            "--result_dir", str(sadtalker_output),
-            "--checkpoint_dir", str(self.sadtalker_dir / "checkpoints"),
-            "--size", "256",  # 256 is faster, 512 for higher quality
-            "--batch_size", "1",  # Safer for CPU processing
-            "--preprocess", "crop",
-        ]
-
-        # Add CPU flag if no CUDA available
+        # Run SadTalker inference on the shared worker (models stay loaded between lessons)
         try:
             import torch
-            if torch.cuda.is_available():
-                print("  🚀 Running on GPU (CUDA)")
-            else:
-                cmd.append("--cpu")
+            use_cpu = not torch.cuda.is_available()
+            if use_cpu:
                 # Estimate: ~6 sec/frame, 25 fps, so 40s video = 1000 frames = ~1.5 hours
                 audio_duration = self.get_audio_duration(wav_path)
                 est_minutes = int(audio_duration * 25 * 6 / 60)
                 print(f"  ⚠️  Running on CPU - estimated time: ~{est_minutes} minutes")
                 print("  💡 Tip: For faster results, consider D-ID API or a machine with CUDA GPU")
+            else:
+                print("  🚀 Running on GPU (CUDA)")
         except ImportError:
-            cmd.append("--cpu")
+            use_cpu = True
             print("  ⚠️  Running on CPU (this may take 1-2 hours per video)")
 
         print("  ⏳ Processing... (this may take a few minutes)")
 
-        # Run SadTalker
-        env = os.environ.copy()
-        env["PYTHONPATH"] = str(self.sadtalker_dir)
-
-        result = subprocess.run(
-            cmd,
-            cwd=str(self.sadtalker_dir),
-            capture_output=True,
-            text=True,
-            env=env
-        )
-
-        # Find the generated video (SadTalker creates timestamped directories)
-        generated_videos = list(sadtalker_output.glob("*.mp4"))
-        if not generated_videos:
-            # Check subdirectories
-            generated_videos = list(sadtalker_output.glob("*/*.mp4"))
-
-        if generated_videos:
-            # Get the most recent one
-            latest_video = max(generated_videos, key=lambda p: p.stat().st_mtime)
+        worker = SadTalkerWorker.shared(self.sadtalker_dir, cpu=use_cpu)
+        try:
+            latest_video = worker.render(
+                wav_path, self.avatar_path, sadtalker_output,
+                size=256,  # 256 is faster, 512 for higher quality
+                batch_size=1,  # Safer for CPU processing
+                preprocess="crop",
+            )
+        except SadTalkerWorkerError as e:
+            wav_path.unlink(missing_ok=True)
+            print(f"  ❌ SadTalker failed. Error: {e}")
+            return False
 
-            # Move to final output with branded background
-            self._composite_on_background(latest_video, output_path)
+        # Move to final output with branded background
+        self._composite_on_background(latest_video, output_path)
 
-            # Cleanup
-            wav_path.unlink(missing_ok=True)
+        # Cleanup
+        wav_path.unlink(missing_ok=True)
+        latest_video.unlink(missing_ok=True)
 
-            if output_path.exists():
-                size_mb = output_path.stat().st_size / (1024 * 1024)
-                print(f"  ✅ Realistic video created: {size_mb:.1f} MB")
-                return True
+        if output_path.exists():
+            size_mb = output_path.stat().st_size / (1024 * 1024)
+            print(f"  ✅ Realistic video created: {size_mb:.1f} MB")
+            return True
 
-        print(f"  ❌ SadTalker failed. Error: {result.stderr[-500:] if result.stderr else 'Unknown'}")
+        print(f"  ❌ Compositing failed for {latest_video.name}")
         return False
 
     def _composite_on_background(self, talking_head_video: Path, output_path: Path):
@@ -391,8 +437,81 @@ class CourseVideoGenerator:
 
         subprocess.run(cmd, capture_output=True)
 
+    def render_plate(self) -> Optional[Path]:
+        """Render the branded background + avatar frame once per instructor avatar (None on failure)"""
+        has_avatar = self.avatar_path.exists()
+        avatar_hash = file_digest(self.avatar_path)[:16] if has_avatar else "none"
+        plate_path = self.plates_dir / f"plate-{self.bg_color[2:]}-{avatar_hash}.png"
+        if plate_path.exists():
+            return plate_path
+
+        print(f"  🖼  Rendering background plate ({'avatar' if has_avatar else 'no avatar'})...")
+        self.plates_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = plate_path.with_name(f"{plate_path.stem}.tmp.png")
+
+        cmd = [self.ffmpeg, "-y", "-f", "lavfi", "-i", f"color=c={self.bg_color}:s=1920x1080"]
+        if has_avatar:
+            cmd += [
+                "-i", str(self.avatar_path),
+                "-filter_complex", "[1:v]scale=400:400[avatar];[0:v][avatar]overlay=(W-w)/2:(H-h)/2-100",
+            ]
+        cmd += ["-frames:v", "1", str(tmp_path)]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or not tmp_path.exists():
+            print(f"  ❌ Plate render error: {result.stderr[:300]}")
+            return None
+
+        tmp_path.replace(plate_path)
+        return plate_path
+
+    def generate_video_from_plate(self, audio_path: Path, output_path: Path) -> bool:
+        """Loop the pre-rendered plate as a still image and mux in the narration"""
+        plate_path = self.render_plate()
+        if not plate_path:
+            return False
+
+        print(f"  🎬 Creating video from static plate...")
+        duration = self.get_audio_duration(audio_path)
+
+        cmd = [
+            self.ffmpeg,
+            "-y",
+            "-loop", "1",
+            "-framerate", "5",
+            "-i", str(plate_path),
+            "-i", str(audio_path),
+            "-map", "0:v",
+            "-map", "1:a",
+            "-c:v", "libx264",
+            "-preset", "fast",
+            "-tune", "stillimage",
+            "-crf", "23",
+            "-g", "150",  # Keyframe every 30s - the frame never changes
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            "-b:a", "192k",
+            "-shortest",
+            "-movflags", "+faststart",
+            str(output_path)
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        problem = validate_media(output_path, audio=True)
+        if problem is None:
+            size_mb = output_path.stat().st_size / (1024 * 1024)
+            print(f"  ✅ Video created: {size_mb:.1f} MB ({duration:.1f}s)")
+            return True
+        else:
+            print(f"  ❌ Invalid output ({problem}). FFmpeg: {result.stderr[:300]}")
+            return False
+
     def generate_video(self, audio_path: Path, output_path: Path, title: str, course: str) -> bool:
         """Generate video with instructor avatar, background, and title (simple mode)"""
+        if self.static_plate:
+            return self.generate_video_from_plate(audio_path, output_path)
+
         print(f"  🎬 Creating video with avatar...")
 
         duration = self.get_audio_duration(audio_path)
@@ -450,12 +569,13 @@ class CourseVideoGenerator:
 
         result = subprocess.run(cmd, capture_output=True, text=True)
 
-        if output_path.exists() and output_path.stat().st_size > 1000:
+        problem = validate_media(output_path, audio=True)
+        if problem is None:
             size_mb = output_path.stat().st_size / (1024 * 1024)
             print(f"  ✅ Video created: {size_mb:.1f} MB ({duration:.1f}s)")
             return True
         else:
-            print(f"  ❌ FFmpeg error: {result.stderr[:300]}")
+            print(f"  ❌ Invalid output ({problem}). FFmpeg: {result.stderr[:300]}")
             return False
 
     async def generate_lesson_video(self, lesson_id: str) -> bool:
@@ -474,18 +594,25 @@ class CourseVideoGenerator:
         course = lesson["course"]
         script = lesson["script"]
 
+        reason = self.needs_build(lesson_id)
+        if reason is None:
+            print(f"⏭  Up to date: {lesson_id} (use --force to rebuild)")
+            return True
+
         print(f"\n{'='*60}")
         print(f"🎬 Generating: {title}")
         print(f"   Course: {course}")
-        print(f"   Lesson: {lesson_id}")
+        print(f"   Lesson: {lesson_id} ({reason})")
         print(f"{'='*60}")
 
         # Paths
         audio_path = self.temp_dir / f"{lesson_id}.mp3"
         video_path = self.output_dir / f"{lesson_id}.mp4"
 
-        # Step 1: Generate audio
-        if not await self.generate_audio(script, audio_path):
+        # Step 1: Generate audio (unless the batch TTS stage already produced it)
+        if lesson_id in self.prepared_audio and audio_path.exists():
+            print(f"  🎤 Using prepared narration: {audio_path.name}")
+        elif not await self.generate_audio(script, audio_path):
             return False
 
         # Step 2: Create video (realistic or simple)
@@ -497,8 +624,12 @@ class CourseVideoGenerator:
         if not success:
             return False
 
+        self.manifest.record(video_path, self.lesson_inputs(lesson_id), lesson_id=lesson_id,
+                             generator="course-videos")
+
         # Cleanup temp audio
         audio_path.unlink(missing_ok=True)
+        self.prepared_audio.discard(lesson_id)
 
         print(f"\n✅ Video saved to: {video_path}")
         return True
@@ -522,10 +653,21 @@ async def main():
                        default="female_us", help="Voice to use")
     parser.add_argument("--realistic", action="store_true",
                        help="Use SadTalker AI for realistic talking head videos")
+    parser.add_argument("--no-audio-cache", action="store_true",
+                       help="Always re-synthesize narration instead of reusing cached audio")
+    parser.add_argument("--tts-concurrency", type=int, default=4,
+                       help="Concurrent Edge TTS sessions when preparing a batch (default: 4)")
+    parser.add_argument("--no-static-plate", action="store_true",
+                       help="Simple mode: composite every frame instead of looping a pre-rendered plate")
+    parser.add_argument("--force", action="store_true",
+                       help="Rebuild videos even if their script, voice and avatar are unchanged")
 
     args = parser.parse_args()
 
-    generator = CourseVideoGenerator(voice=args.voice, use_sadtalker=args.realistic)
+    generator = CourseVideoGenerator(voice=args.voice, use_sadtalker=args.realistic,
+                                     use_audio_cache=not args.no_audio_cache,
+                                     tts_concurrency=args.tts_concurrency,
+                                     static_plate=not args.no_static_plate, force=args.force)
 
     # Show SadTalker status
     if args.realistic:
@@ -551,6 +693,9 @@ async def main():
             sys.exit(1)
 
         print(f"\n🎓 Found {len(matching)} lessons for '{args.course}'")
+        matching = generator.stale_lessons(matching)
+        if not matching:
+            return
         for lid in matching:
             print(f"   • {lid}: {LESSON_SCRIPTS[lid]['title']}")
 
@@ -559,6 +704,8 @@ async def main():
             print("Cancelled")
             return
 
+        await generator.prepare_audio(matching)
+
         success_count = 0
         for i, lesson_id in enumerate(matching, 1):
             print(f"\n[{i}/{len(matching)}]")
@@ -569,15 +716,20 @@ async def main():
         return
 
     if args.all:
-        total = len(LESSON_SCRIPTS)
-        print(f"\n🚀 Generate ALL {total} videos?")
+        lesson_ids = generator.stale_lessons(list(LESSON_SCRIPTS.keys()))
+        total = len(lesson_ids)
+        if not total:
+            return
+        print(f"\n🚀 Generate {total} videos?")
         response = input("(y/n): ").strip().lower()
         if response != 'y':
             print("Cancelled")
             return
 
+        await generator.prepare_audio(lesson_ids)
+
         success_count = 0
-        for i, lesson_id in enumerate(LESSON_SCRIPTS.keys(), 1):
+        for i, lesson_id in enumerate(lesson_ids, 1):
             print(f"\n[{i}/{total}]")
             if await generator.generate_lesson_video(lesson_id):
                 success_count += 1
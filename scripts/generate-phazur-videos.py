@@ -8,6 +8,9 @@ Usage:
     python scripts/generate-phazur-videos.py --lesson lesson-react-1-1
     python scripts/generate-phazur-videos.py --course react-patterns
     python scripts/generate-phazur-videos.py --all
+
+Videos are rendered in-process by custom-video-generator.py's stage pipeline,
+so the TTS model and SadTalker worker load once per run.
 """
 
 import os
@@ -17,12 +20,25 @@ import argparse
 import subprocess
 from pathlib import Path
 
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / "pipeline"))
+from throttle import Throttle
+from generator_loader import LazyVideoGenerator
+
+
 class PhazurVideoGenerator:
-    def __init__(self, test_mode=False):
+    # The in-process VideoGenerator, built on first use (--list/--extract never import TTS)
+    generator = LazyVideoGenerator()
+
+    def __init__(self, test_mode=False, force=False):
         self.test_mode = test_mode
+        self.force = force
         self.project_root = Path(__file__).parent.parent
         self.scripts_file = self.project_root / "temp" / "lesson-scripts.json"
-        self.generator = self.project_root / "scripts" / "custom-video-generator.py"
+        self._generator = None
+
+        # New lessons wait only while the machine is hot or overloaded
+        self.throttle = Throttle()
 
         self.lesson_scripts = {}
 
@@ -73,6 +89,24 @@ class PhazurVideoGenerator:
             print(f"❌ Failed to load scripts: {e}")
             return False
 
+    def _lesson(self, lesson_id):
+        script_data = self.lesson_scripts[lesson_id]
+        return self.generator.lesson(
+            lesson_id=lesson_id,
+            script=script_data['script'],
+            title=script_data['title'],
+            output_name=lesson_id
+        )
+
+    def generate_videos(self, lesson_ids):
+        """Generate videos for lessons in one pipeline run; returns how many are built or up to date"""
+        results = self.generator.generate_many([self._lesson(lesson_id) for lesson_id in lesson_ids],
+                                               throttle=self.throttle)
+        for result in results:
+            if result.status == "built":
+                print(f"✅ Video saved: {result.artifacts['video']}")
+        return sum(result.status != "failed" for result in results)
+
     def generate_video(self, lesson_id):
         """Generate video for a specific lesson"""
         if lesson_id not in self.lesson_scripts:
@@ -88,37 +122,8 @@ class PhazurVideoGenerator:
         print(f"   Lesson ID: {lesson_id}")
         print(f"{'='*60}\n")
 
-        # Build command
-        cmd = [
-            "python3",
-            str(self.generator),
-            "--script", script_data['script'],
-            "--title", script_data['title']
-        ]
-
-        if self.test_mode:
-            cmd.append("--test")
-
-        # Add custom output filename
-        output_name = lesson_id
-
-        try:
-            result = subprocess.run(cmd, check=True)
-
-            # Rename output to match lesson ID
-            temp_output = self.project_root / "public" / "courses" / f"custom_{lesson_id}.mp4"
-            final_output = self.project_root / "public" / "courses" / f"{lesson_id}.mp4"
-
-            if temp_output.exists():
-                import shutil
-                shutil.move(str(temp_output), str(final_output))
-
-            print(f"✅ Video saved: {final_output}")
-            return True
-
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Generation failed: {e}")
-            return False
+        # The generator skips lessons whose inputs are unchanged
+        return self.generate_videos([lesson_id]) == 1
 
     def generate_course(self, course_filter):
         """Generate all videos for lessons matching a course filter"""
@@ -140,19 +145,10 @@ class PhazurVideoGenerator:
             print("Cancelled")
             return False
 
-        success_count = 0
-        for i, lesson_id in enumerate(matching_lessons, 1):
-            print(f"\n[{i}/{len(matching_lessons)}]")
-            if self.generate_video(lesson_id):
-                success_count += 1
-
-            # Cooling period between videos
-            if i < len(matching_lessons):
-                import time
-                print("\n⏸  Cooling down (10s)...")
-                time.sleep(10)
+        success_count = self.generate_videos(matching_lessons)
 
         print(f"\n✅ Generated {success_count}/{len(matching_lessons)} videos")
+        print(f"⏸  Cool-down: {self.throttle.summary()}")
         return True
 
     def generate_all(self):
@@ -169,19 +165,10 @@ class PhazurVideoGenerator:
             print("Cancelled")
             return False
 
-        success_count = 0
-        for i, lesson_id in enumerate(self.lesson_scripts.keys(), 1):
-            print(f"\n[{i}/{total}]")
-            if self.generate_video(lesson_id):
-                success_count += 1
-
-            # Cooling period
-            if i < total:
-                import time
-                print("\n⏸  Cooling down (10s)...")
-                time.sleep(10)
+        success_count = self.generate_videos(list(self.lesson_scripts.keys()))
 
         print(f"\n✅ Generated {success_count}/{total} videos")
+        print(f"⏸  Cool-down: {self.throttle.summary()}")
         return True
 
 def main():
@@ -192,10 +179,11 @@ def main():
     parser.add_argument("--all", action="store_true", help="Generate all videos")
     parser.add_argument("--test", action="store_true", help="Test mode (faster, lower quality)")
     parser.add_argument("--list", action="store_true", help="List all available lessons")
+    parser.add_argument("--force", action="store_true", help="Rebuild lessons even if their inputs are unchanged")
 
     args = parser.parse_args()
 
-    generator = PhazurVideoGenerator(test_mode=args.test)
+    generator = PhazurVideoGenerator(test_mode=args.test, force=args.force)
 
     # Extract scripts if requested
     if args.extract:
@@ -21,7 +21,30 @@ import argparse
 import requests
 import base64
 import time
+import threading
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / 'pipeline'))
+from tts_cache import AudioCache, edge_tts_engine_id
+from tts_batch import EdgeTTSBatch, TTSJob
+from downloader import Downloader, DownloadError
+from upload_cache import UploadCache
+from build_manifest import BuildManifest
+from throttle import Throttle
+from batch_journal import collect_garbage
+from metrics import MetricsRecorder, current_stage
+
+# Edge TTS writes 24 kHz 48 kbit/s mono MP3, so 6000 bytes per second of audio
+EDGE_TTS_BYTES_PER_SECOND = 6000
+
+# Rough D-ID render time: seconds of render per second of audio, plus queueing overhead
+DID_RENDER_FACTOR = 1.0
+DID_RENDER_OVERHEAD = 10
+DID_POLL_MIN = 1.0
+DID_POLL_MAX = 10.0
+DID_RATE_LIMIT_RETRIES = 4
 
 # Edge TTS voices
 VOICES = {
@@ -167,8 +190,13 @@ Let's explore the most useful custom hooks and build our own library.
 }
 
 
+class RenderFailed(Exception):
+    """Raised inside the render stage when a D-ID step gave up (it has printed why)"""
+
+
 class RealisticVideoGenerator:
-    def __init__(self, voice="female_us"):
+    def __init__(self, voice="female_us", use_audio_cache=True, tts_concurrency=4, max_concurrent_talks=2,
+                 use_upload_cache=True, force=False):
         self.project_root = Path(__file__).parent.parent
         self.output_dir = self.project_root / "public" / "videos" / "lessons"
         self.temp_dir = self.project_root / "temp" / "video-gen"
@@ -177,13 +205,55 @@ class RealisticVideoGenerator:
 
         self.voice = VOICES.get(voice, VOICES["female_us"])
 
-        # D-ID API
+        # Narration cache (skips TTS for unchanged scripts)
+        self.audio_cache = AudioCache() if use_audio_cache else None
+        self.tts_concurrency = tts_concurrency
+        self.prepared_audio = set()
+
+        # D-ID API (one keep-alive session shared by every request)
         self.did_api_key = os.environ.get("DID_API_KEY")
         self.did_base_url = "https://api.d-id.com"
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Basic {self.did_api_key}"
+        adapter = HTTPAdapter(pool_maxsize=max(4, max_concurrent_talks * 2))
+        self.session.mount("https://", adapter)
+        self.session.hooks["response"].append(self._record_api_call)
+        self.max_concurrent_talks = max_concurrent_talks
+        self._talk_slots = None
+
+        # New talks wait out D-ID 429s (Retry-After, or a doubling backoff) instead of failing
+        self.throttle = Throttle(watch_host=False)
+
+        # Per-lesson narrate / render timings and D-ID latency (report: pipeline/metrics.py)
+        self.metrics = MetricsRecorder("realistic-videos")
+
+        # Avatar uploads are reused across lessons (and runs) until they expire
+        self.image_uploads = UploadCache("d-id-images") if use_upload_cache else None
+        self._avatar_lock = threading.Lock()
+
+        # Lessons are only rebuilt when their inputs change (or with force)
+        self.manifest = BuildManifest()
+        self.force = force
 
         # Instructor photo
         self.avatar_path = self._find_avatar()
 
+    def lesson_inputs(self, lesson_id: str) -> dict:
+        """Everything that determines a lesson's video, for the build manifest"""
+        return {
+            'script': LESSON_SCRIPTS[lesson_id]['script'],
+            'voice': self.voice,
+            'avatar': self.avatar_path,
+            'settings': {'renderer': 'd-id', 'stitch': True},
+        }
+
+    def needs_build(self, lesson_id: str) -> str:
+        """Why a lesson's video must be (re)built, or None if it is up to date"""
+        if self.force:
+            return "forced"
+        return self.manifest.check(self.output_dir / f"{lesson_id}.mp4", self.lesson_inputs(lesson_id),
+                                   lesson_id=lesson_id, generator="realistic-videos")
+
     def _find_avatar(self):
         """Find instructor avatar"""
         for ext in ['jpg', 'jpeg', 'png']:
@@ -193,7 +263,15 @@ class RealisticVideoGenerator:
         return None
 
     async def generate_audio(self, text: str, output_path: Path) -> bool:
-        """Generate audio using edge-tts"""
+        """Generate audio using edge-tts (reused from the audio cache when unchanged)"""
+        cache_key = None
+        if self.audio_cache:
+            cache_key = self.audio_cache.key(text, self.voice, edge_tts_engine_id())
+            if self.audio_cache.fetch(cache_key, output_path):
+                size_kb = output_path.stat().st_size / 1024
+                print(f"  ♻️  Audio (cached): {size_kb:.1f} KB")
+                return True
+
         import edge_tts
 
         print(f"  🎤 Generating audio...")
@@ -203,9 +281,23 @@ class RealisticVideoGenerator:
         if output_path.exists():
             size_kb = output_path.stat().st_size / 1024
             print(f"  ✅ Audio: {size_kb:.1f} KB")
+            if cache_key:
+                self.audio_cache.put(cache_key, output_path)
             return True
         return False
 
+    async def prepare_audio(self, lesson_ids: list):
+        """Synthesize narration for all lessons up front (concurrent batch TTS stage)"""
+        jobs = [
+            TTSJob(lesson_id, LESSON_SCRIPTS[lesson_id]['script'], self.voice,
+                   self.temp_dir / f"{lesson_id}.mp3")
+            for lesson_id in lesson_ids
+        ]
+        print(f"\n🎤 Preparing narration for {len(jobs)} lessons...")
+        batch = EdgeTTSBatch(concurrency=self.tts_concurrency, audio_cache=self.audio_cache)
+        results = await batch.run(jobs)
+        self.prepared_audio.update(lesson_id for lesson_id, ok in results.items() if ok)
+
     def upload_audio_to_did(self, audio_path: Path) -> str:
         """Upload audio to D-ID and get URL"""
         print(f"  📤 Uploading audio to D-ID...")
@@ -218,13 +310,7 @@ class RealisticVideoGenerator:
             'audio': (audio_path.name, audio_data, 'audio/mpeg')
         }
 
-        response = requests.post(
-            f"{self.did_base_url}/audios",
-            headers={
-                "Authorization": f"Basic {self.did_api_key}",
-            },
-            files=files
-        )
+        response = self.session.post(f"{self.did_base_url}/audios", files=files)
 
         if response.status_code in [200, 201]:
             result = response.json()
@@ -251,13 +337,7 @@ class RealisticVideoGenerator:
             'image': (image_path.name, image_data, mime_type)
         }
 
-        response = requests.post(
-            f"{self.did_base_url}/images",
-            headers={
-                "Authorization": f"Basic {self.did_api_key}",
-            },
-            files=files
-        )
+        response = self.session.post(f"{self.did_base_url}/images", files=files)
 
         if response.status_code in [200, 201]:
             result = response.json()
@@ -268,6 +348,24 @@ class RealisticVideoGenerator:
             print(f"  ❌ Image upload failed: {response.status_code} - {response.text[:200]}")
             return None
 
+    def avatar_image_url(self, stale_url: str = None) -> tuple:
+        """(D-ID URL for the avatar, whether it came from the upload cache).
+
+        Concurrent lessons wait on one upload instead of each sending the photo.
+        A cached URL equal to stale_url is replaced by a fresh upload.
+        """
+        with self._avatar_lock:
+            if self.image_uploads:
+                image_url = self.image_uploads.get(self.avatar_path)
+                if image_url and image_url != stale_url:
+                    print(f"  ♻️  Image (cached upload)")
+                    return image_url, True
+
+            image_url = self.upload_image_to_did(self.avatar_path)
+            if image_url and self.image_uploads:
+                self.image_uploads.put(self.avatar_path, image_url)
+            return image_url, False
+
     def create_did_video(self, audio_url: str, image_url: str) -> str:
         """Create talking head video with D-ID"""
         print(f"  🎬 Creating D-ID video...")
@@ -284,16 +382,16 @@ class RealisticVideoGenerator:
             }
         }
 
-        response = requests.post(
-            f"{self.did_base_url}/talks",
-            headers={
-                "Authorization": f"Basic {self.did_api_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload
-        )
+        for _ in range(DID_RATE_LIMIT_RETRIES):
+            self.throttle.wait()
+            response = self.session.post(f"{self.did_base_url}/talks", json=payload)
+            if response.status_code != 429:
+                break
+            retry_after = response.headers.get("Retry-After", "")
+            self.throttle.rate_limited(float(retry_after) if retry_after.isdigit() else None)
 
         if response.status_code in [200, 201]:
+            self.throttle.succeeded()
             result = response.json()
             talk_id = result.get('id')
             print(f"  ✅ Video job created: {talk_id}")
@@ -302,16 +400,35 @@ class RealisticVideoGenerator:
             print(f"  ❌ D-ID error: {response.status_code} - {response.text[:300]}")
             return None
 
-    def wait_for_video(self, talk_id: str, max_wait: int = 300) -> str:
+    @staticmethod
+    def expected_render_seconds(audio_path: Path) -> float:
+        """Rough D-ID render time for a narration file"""
+        audio_seconds = audio_path.stat().st_size / EDGE_TTS_BYTES_PER_SECOND
+        return audio_seconds * DID_RENDER_FACTOR + DID_RENDER_OVERHEAD
+
+    @staticmethod
+    def next_poll_delay(status: str, elapsed: float, expected: float, previous: float) -> float:
+        """Poll quickly at first, wait out most of the expected render, then poll closely again"""
+        if status == 'started':
+            remaining = expected - elapsed
+            if remaining > DID_POLL_MIN * 2:
+                return min(DID_POLL_MAX, remaining / 2)
+            return DID_POLL_MIN * 2
+        # Still queued ('created') or unknown: back off gradually
+        return min(DID_POLL_MAX, max(DID_POLL_MIN, previous * 1.5))
+
+    def wait_for_video(self, talk_id: str, max_wait: int = 300, expected_seconds: float = 60) -> str:
         """Wait for D-ID video to complete and return URL"""
-        print(f"  ⏳ Waiting for video generation...")
+        print(f"  ⏳ Waiting for video generation ({talk_id}, ~{expected_seconds:.0f}s)...")
 
         start_time = time.time()
+        delay = DID_POLL_MIN
+        last_status = None
+        polls = 0
         while time.time() - start_time < max_wait:
-            response = requests.get(
-                f"{self.did_base_url}/talks/{talk_id}",
-                headers={"Authorization": f"Basic {self.did_api_key}"}
-            )
+            response = self.session.get(f"{self.did_base_url}/talks/{talk_id}")
+            polls += 1
+            status = None
 
             if response.status_code == 200:
                 result = response.json()
@@ -319,33 +436,34 @@ class RealisticVideoGenerator:
 
                 if status == 'done':
                     video_url = result.get('result_url')
-                    print(f"  ✅ Video ready!")
+                    print(f"  ✅ Video ready: {talk_id} ({time.time() - start_time:.0f}s, {polls} polls)")
                     return video_url
-                elif status == 'error':
+                elif status in ('error', 'rejected'):
                     print(f"  ❌ Generation failed: {result.get('error', 'Unknown error')}")
                     return None
-                else:
-                    print(f"     Status: {status}...", end='\r')
+                elif status != last_status:
+                    print(f"     {talk_id}: {status}...")
+                    last_status = status
 
-            time.sleep(5)
+            delay = self.next_poll_delay(status, time.time() - start_time, expected_seconds, delay)
+            time.sleep(delay)
 
-        print(f"  ❌ Timeout waiting for video")
+        print(f"  ❌ Timeout waiting for video {talk_id}")
         return None
 
     def download_video(self, video_url: str, output_path: Path) -> bool:
         """Download video from D-ID"""
         print(f"  📥 Downloading video...")
 
-        response = requests.get(video_url, stream=True)
-        if response.status_code == 200:
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        try:
+            size = Downloader.shared().download(video_url, output_path)
+        except DownloadError as e:
+            print(f"  ❌ Download failed: {e}")
+            return False
 
-            size_mb = output_path.stat().st_size / (1024 * 1024)
-            print(f"  ✅ Downloaded: {size_mb:.1f} MB")
-            return True
-        return False
+        size_mb = size / (1024 * 1024)
+        print(f"  ✅ Downloaded: {size_mb:.1f} MB")
+        return True
 
     async def generate_lesson_video(self, lesson_id: str) -> bool:
         """Generate realistic video for a lesson"""
@@ -367,9 +485,14 @@ class RealisticVideoGenerator:
             print("   Add photo at: assets/instructor/avatar.jpg")
             return False
 
+        reason = self.needs_build(lesson_id)
+        if reason is None:
+            print(f"⏭  Up to date: {lesson_id} (use --force to rebuild)")
+            return True
+
         lesson = LESSON_SCRIPTS[lesson_id]
         print(f"\n{'='*60}")
-        print(f"🎬 Generating: {lesson['title']}")
+        print(f"🎬 Generating: {lesson['title']} ({reason})")
         print(f"   Using D-ID for realistic talking head video")
         print(f"{'='*60}")
 
@@ -377,39 +500,79 @@ class RealisticVideoGenerator:
         audio_path = self.temp_dir / f"{lesson_id}.mp3"
         video_path = self.output_dir / f"{lesson_id}.mp4"
 
-        # Step 1: Generate audio
-        if not await self.generate_audio(lesson['script'], audio_path):
+        # Step 1: Generate audio (unless the batch TTS stage already produced it)
+        if lesson_id in self.prepared_audio and audio_path.exists():
+            print(f"  🎤 Using prepared narration: {audio_path.name}")
+        else:
+            narrate_start = time.perf_counter()
+            narrated = await self.generate_audio(lesson['script'], audio_path)
+            self.metrics.record(lesson_id, "narrate", time.perf_counter() - narrate_start,
+                                status="ok" if narrated else "failed",
+                                bytes_out=audio_path.stat().st_size if narrated else 0)
+            if not narrated:
+                return False
+
+        # Steps 2-6 block on D-ID, so they run in a thread; at most
+        # max_concurrent_talks lessons are talking to D-ID at once
+        if self._talk_slots is None:
+            self._talk_slots = asyncio.Semaphore(self.max_concurrent_talks)
+        async with self._talk_slots:
+            if not await asyncio.to_thread(self._render_with_did, audio_path, video_path):
+                return False
+
+        self.manifest.record(video_path, self.lesson_inputs(lesson_id), lesson_id=lesson_id,
+                             generator="realistic-videos")
+
+        # Cleanup
+        audio_path.unlink(missing_ok=True)
+        self.prepared_audio.discard(lesson_id)
+
+        print(f"\n✅ Video saved: {video_path}")
+        return True
+
+    def _record_api_call(self, response, *args, **kwargs):
+        """Session hook: count every D-ID request toward the stage making it"""
+        endpoint = response.request.path_url.split("?")[0].strip("/").split("/")[0]
+        current_stage().api_call(f"d-id {response.request.method} /{endpoint}",
+                                 response.elapsed.total_seconds(), ok=response.ok)
+
+    def _render_with_did(self, audio_path: Path, video_path: Path) -> bool:
+        # _did_steps reports failure by returning False; raise so the stage is recorded as failed
+        try:
+            with self.metrics.stage(video_path.stem, "render", inputs=[audio_path], outputs=[video_path]):
+                if not self._did_steps(audio_path, video_path):
+                    raise RenderFailed(video_path.stem)
+        except RenderFailed:
             return False
+        return True
 
+    def _did_steps(self, audio_path: Path, video_path: Path) -> bool:
         # Step 2: Upload audio to D-ID
         audio_url = self.upload_audio_to_did(audio_path)
         if not audio_url:
             return False
 
-        # Step 3: Upload image to D-ID
-        image_url = self.upload_image_to_did(self.avatar_path)
+        # Step 3: Upload image to D-ID (once per avatar, see avatar_image_url)
+        image_url, cached = self.avatar_image_url()
         if not image_url:
             return False
 
         # Step 4: Create D-ID video
         talk_id = self.create_did_video(audio_url, image_url)
+        if not talk_id and cached:
+            # The cached upload may have expired on D-ID's side: upload again and retry once
+            image_url, _ = self.avatar_image_url(stale_url=image_url)
+            talk_id = image_url and self.create_did_video(audio_url, image_url)
         if not talk_id:
             return False
 
         # Step 5: Wait for completion
-        video_url = self.wait_for_video(talk_id)
+        video_url = self.wait_for_video(talk_id, expected_seconds=self.expected_render_seconds(audio_path))
         if not video_url:
             return False
 
         # Step 6: Download video
-        if not self.download_video(video_url, video_path):
-            return False
-
-        # Cleanup
-        audio_path.unlink(missing_ok=True)
-
-        print(f"\n✅ Video saved: {video_path}")
-        return True
+        return self.download_video(video_url, video_path)
 
     def list_lessons(self):
         """List available lessons"""
@@ -424,10 +587,23 @@ async def main():
     parser.add_argument("--lesson", help="Generate specific lesson")
     parser.add_argument("--all", action="store_true", help="Generate all videos")
     parser.add_argument("--voice", choices=list(VOICES.keys()), default="female_us")
+    parser.add_argument("--no-audio-cache", action="store_true",
+                       help="Always re-synthesize narration instead of reusing cached audio")
+    parser.add_argument("--tts-concurrency", type=int, default=4,
+                       help="Concurrent Edge TTS sessions when preparing a batch (default: 4)")
+    parser.add_argument("--no-upload-cache", action="store_true",
+                       help="Upload the avatar for every lesson instead of reusing a recent upload")
+    parser.add_argument("--max-concurrent-talks", type=int, default=2,
+                       help="D-ID talks rendering at the same time with --all (default: 2)")
+    parser.add_argument("--force", action="store_true",
+                       help="Rebuild videos even if their script, voice and avatar are unchanged")
 
     args = parser.parse_args()
 
-    generator = RealisticVideoGenerator(voice=args.voice)
+    generator = RealisticVideoGenerator(voice=args.voice, use_audio_cache=not args.no_audio_cache,
+                                        tts_concurrency=args.tts_concurrency,
+                                        max_concurrent_talks=args.max_concurrent_talks,
+                                        use_upload_cache=not args.no_upload_cache, force=args.force)
 
     if args.list:
         generator.list_lessons()
@@ -438,16 +614,32 @@ async def main():
         return
 
     if args.all:
-        print(f"\n🚀 Generate {len(LESSON_SCRIPTS)} realistic videos with D-ID?")
+        lesson_ids = [lesson_id for lesson_id in LESSON_SCRIPTS if generator.needs_build(lesson_id)]
+        if len(lesson_ids) < len(LESSON_SCRIPTS):
+            print(f"⏭  {len(LESSON_SCRIPTS) - len(lesson_ids)} lessons up to date (use --force to rebuild)")
+        if not lesson_ids:
+            return
+
+        print(f"\n🚀 Generate {len(lesson_ids)} realistic videos with D-ID?")
         print("   Note: This uses D-ID API credits (free tier: 20 videos)")
         response = input("Continue? (y/n): ").strip().lower()
         if response != 'y':
             return
 
-        for i, lesson_id in enumerate(LESSON_SCRIPTS.keys(), 1):
-            print(f"\n[{i}/{len(LESSON_SCRIPTS)}]")
-            await generator.generate_lesson_video(lesson_id)
-            time.sleep(2)  # Rate limiting
+        # Narration orphaned by earlier interrupted runs
+        freed = collect_garbage([generator.temp_dir])
+        if freed:
+            print(f"🧹 Removed {freed / (1024*1024):.1f} MB of stale temp files")
+
+        await generator.prepare_audio(lesson_ids)
+
+        # Lessons share the talk slots, so up to --max-concurrent-talks render at once
+        results = await asyncio.gather(*(generator.generate_lesson_video(lesson_id)
+                                         for lesson_id in lesson_ids))
+        print(f"\n✅ {sum(results)}/{len(results)} videos generated")
+        print(f"⏸  Rate limiting: {generator.throttle.summary()}")
+        if generator.metrics.records:
+            print(f"📈 Stage time: {generator.metrics.summary()} (run {generator.metrics.run_id})")
         return
 
     parser.print_help()
@@ -10,12 +10,18 @@ Usage:
 """
 
 import os
+import sys
 import json
 import time
 import argparse
 import requests
 from pathlib import Path
 
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / 'pipeline'))
+from downloader import Downloader, DownloadError
+from build_manifest import BuildManifest
+
 # Configuration
 API_KEY = os.environ.get('GOOGLE_GEMINI_API_KEY', '')
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -151,18 +157,13 @@ def download_video(video_url: str, output_path: Path, api_key: str = None) -> bo
     if api_key:
         headers['x-goog-api-key'] = api_key
 
-    response = requests.get(video_url, headers=headers, stream=True)
-    if response.status_code != 200:
-        print(f"   ❌ Download failed: {response.status_code}")
+    try:
+        size = Downloader.shared().download(video_url, output_path, headers=headers)
+    except DownloadError as e:
+        print(f"   ❌ Download failed: {e}")
         return False
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-
-    size_mb = output_path.stat().st_size / (1024 * 1024)
+    size_mb = size / (1024 * 1024)
     print(f"   ✅ Saved: {output_path} ({size_mb:.1f} MB)")
     return True
 
@@ -199,6 +200,7 @@ def main():
     parser.add_argument('--prompt', help='Custom prompt for video generation')
     parser.add_argument('--model', default='fast', choices=['fast', 'quality', 'stable'])
     parser.add_argument('--output', help='Output file path')
+    parser.add_argument('--force', action='store_true', help='Regenerate even if the lesson prompt is unchanged')
 
     args = parser.parse_args()
 
@@ -217,13 +219,22 @@ def main():
             print(f"❌ Lesson not found: {args.lesson}")
             return
 
-        print(f"\n🎬 Generating video for: {lesson['title']}\n")
-
         prompt = get_lesson_prompt(lesson)
-        result = generate_video(prompt, model=args.model)
-
         output_path = OUTPUT_DIR / f"{args.lesson}-veo.mp4"
-        download_video(result['videoUrl'], output_path, api_key=result.get('apiKey'))
+        inputs = {'prompt': prompt, 'model': VEO_MODELS.get(args.model, args.model)}
+
+        manifest = BuildManifest()
+        reason = 'forced' if args.force else manifest.check(output_path, inputs, lesson_id=args.lesson,
+                                                             generator='veo')
+        if reason is None:
+            print(f"⏭  Up to date: {output_path.name} (use --force to regenerate)")
+            return
+
+        print(f"\n🎬 Generating video for: {lesson['title']} ({reason})\n")
+
+        result = generate_video(prompt, model=args.model)
+        if download_video(result['videoUrl'], output_path, api_key=result.get('apiKey')):
+            manifest.record(output_path, inputs, lesson_id=args.lesson, generator='veo')
         return
 
     if args.prompt:
@@ -17,11 +17,21 @@ import sys
 import json
 import asyncio
 import argparse
-import subprocess
 import shutil
 from pathlib import Path
 from datetime import datetime
 
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / 'pipeline'))
+from tts_cache import AudioCache, edge_tts_engine_id, coqui_engine_id, file_digest
+from xtts_engine import XTTSEngine, XTTS_MODEL, format_timings
+from narration import ChunkedNarration, split_script
+from sadtalker_worker import SadTalkerWorker, SadTalkerWorkerError
+from sadtalker_parallel import ParallelSadTalker
+from build_manifest import BuildManifest
+from throttle import Throttle
+from batch_journal import collect_garbage
+
 # Edge TTS voices for different instructors
 INSTRUCTOR_VOICES = {
     "sarah-chen": "en-US-AriaNeural",      # Energetic female
@@ -35,12 +45,21 @@ INSTRUCTOR_VOICES = {
 
 
 class FreeVideoGenerator:
-    def __init__(self, test_mode=False, instructor="default"):
+    def __init__(self, test_mode=False, instructor="default", use_audio_cache=True, tts_concurrency=4,
+                 parallel_workers=None, force=False):
         self.test_mode = test_mode
         self.project_root = Path(__file__).parent.parent
         self.output_dir = self.project_root / "public" / "courses"
         self.temp_dir = self.project_root / "temp" / "video-gen"
         self.sadtalker_dir = self.project_root / "tools" / "SadTalker"
+        # CPU required: MPS/Metal has compatibility issues
+        self.sadtalker = SadTalkerWorker.shared(self.sadtalker_dir, cpu=True)
+
+        # Optional: split each lesson at silences and render segments on all cores
+        self.parallel = None
+        if parallel_workers is not None:
+            self.parallel = ParallelSadTalker(self.sadtalker_dir, self.temp_dir / "sadtalker_parallel",
+                                              workers=parallel_workers or None)
 
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -52,10 +71,31 @@ class FreeVideoGenerator:
         self.avatar_path = self._find_avatar()
         self.voice_sample = self.project_root / "assets" / "instructor" / "voice-sample.wav"
 
+        # Narration cache (skips TTS for unchanged scripts)
+        self.audio_cache = AudioCache() if use_audio_cache else None
+
+        # XTTS model is loaded on first use and shared by every lesson in this run
+        self.xtts = XTTSEngine.shared(XTTS_MODEL)
+        self.tts_timings = []
+
+        # Edge TTS batch stage (narration produced up front for a whole run)
+        self.tts_concurrency = tts_concurrency
+        self.prepared_audio = {}
+
+        # Scripts are synthesized per paragraph/sentence chunk and stitched
+        self.narration = ChunkedNarration(self.temp_dir / "narration", audio_cache=self.audio_cache)
+
         # Lesson scripts
         self.scripts_file = self.project_root / "temp" / "lesson-scripts.json"
         self.lesson_scripts = {}
 
+        # Lessons are only rebuilt when their inputs change (or with force)
+        self.manifest = BuildManifest()
+        self.force = force
+
+        # Pauses between lessons only while the machine is hot or overloaded
+        self.throttle = Throttle()
+
     def _find_avatar(self):
         """Find instructor avatar image"""
         for name in ['avatar.jpg', 'avatar.jpeg', 'avatar.png', 'photo.jpg', 'photo.png']:
@@ -64,6 +104,23 @@ class FreeVideoGenerator:
                 return path
         return None
 
+    def lesson_inputs(self, lesson_id: str) -> dict:
+        """Everything that determines a lesson's video, for the build manifest"""
+        return {
+            'script': self.lesson_scripts[lesson_id]['script'],
+            # Narration is cloned from the voice sample when there is one
+            'voice': self.voice_sample if self.voice_sample.exists() else self.voice,
+            'avatar': self.avatar_path,
+            'settings': {'renderer': 'sadtalker', 'test_mode': self.test_mode},
+        }
+
+    def needs_build(self, lesson_id: str) -> str:
+        """Why a lesson's video must be (re)built, or None if it is up to date"""
+        if self.force:
+            return "forced"
+        return self.manifest.check(self.output_dir / f"{lesson_id}.mp4", self.lesson_inputs(lesson_id),
+                                   lesson_id=lesson_id, generator="video-free")
+
     def load_scripts(self):
         """Load lesson scripts from JSON"""
         if not self.scripts_file.exists():
@@ -88,42 +145,88 @@ class FreeVideoGenerator:
             print("❌ edge-tts not installed. Run: pip install edge-tts")
             return False
 
-        print(f"  🎤 Generating audio with Edge TTS ({self.voice})...")
+        cache_key = None
+        if self.audio_cache:
+            cache_key = self.audio_cache.key(text, self.voice, f"{edge_tts_engine_id()}+chunked")
+            if self.audio_cache.fetch(cache_key, output_path):
+                size_kb = output_path.stat().st_size / 1024
+                print(f"  ♻️  Audio reused from cache: {size_kb:.1f} KB")
+                return True
+
+        chunks = len(split_script(text))
+        print(f"  🎤 Generating audio with Edge TTS ({self.voice}, {chunks} chunks)...")
 
         try:
-            communicate = edge_tts.Communicate(text, self.voice)
-            await communicate.save(str(output_path))
+            results = await self.narration.synthesize_edge(
+                [(output_path.stem, text, self.voice, output_path)],
+                concurrency=self.tts_concurrency
+            )
 
-            if output_path.exists():
+            if results[output_path.stem] and output_path.exists():
                 size_kb = output_path.stat().st_size / 1024
                 print(f"  ✅ Audio generated: {size_kb:.1f} KB")
+                if cache_key:
+                    self.audio_cache.put(cache_key, output_path)
                 return True
             return False
         except Exception as e:
             print(f"  ❌ Edge TTS error: {e}")
             return False
 
+    async def prepare_audio(self, lesson_ids: list):
+        """Synthesize Edge TTS narration for all lessons up front (concurrent batch stage).
+
+        Chunks from every lesson are fanned out together. Skipped when a voice
+        sample exists, since Coqui voice cloning runs locally per lesson.
+        """
+        if self.voice_sample.exists():
+            return
+
+        items = [
+            (lesson_id, self.lesson_scripts[lesson_id]['script'], self.voice,
+             self.temp_dir / f"{lesson_id}_narration.mp3")
+            for lesson_id in lesson_ids
+        ]
+        print(f"\n🎤 Preparing narration for {len(items)} lessons...")
+        results = await self.narration.synthesize_edge(items, concurrency=self.tts_concurrency)
+        for lesson_id, _, _, output_path in items:
+            if results[lesson_id]:
+                self.prepared_audio[lesson_id] = output_path
+
     def generate_audio_coqui(self, text: str, output_path: Path) -> bool:
         """Generate audio using Coqui TTS with voice cloning (requires voice sample)"""
         if not self.voice_sample.exists():
             print(f"  ⚠️  Voice sample not found, using Edge TTS instead")
             return False
 
+        cache_key = None
+        if self.audio_cache:
+            # Keyed on the sample's contents so re-recording the voice invalidates
+            voice = f"clone:{file_digest(self.voice_sample)}"
+            cache_key = self.audio_cache.key(text, voice, f"{coqui_engine_id(XTTS_MODEL)}+chunked")
+            if self.audio_cache.fetch(cache_key, output_path):
+                size_kb = output_path.stat().st_size / 1024
+                print(f"  ♻️  Voice clone audio reused from cache: {size_kb:.1f} KB")
+                return True
+
         try:
-            from TTS.api import TTS
-            print(f"  🎤 Generating audio with Coqui TTS (voice cloning)...")
-
-            tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-            tts.tts_to_file(
-                text=text,
-                file_path=str(output_path),
-                speaker_wav=str(self.voice_sample),
-                language="en"
-            )
+            if not self.xtts.loaded:
+                print(f"  🎤 Loading Coqui XTTS model (once per run)...")
+            chunks = len(split_script(text))
+            print(f"  🎤 Generating audio with Coqui TTS (voice cloning, {chunks} chunks)...")
+
+            # Chunks go through the one loaded model, so memory stays flat with script length
+            timings = self.narration.synthesize_xtts(self.xtts, text, output_path, self.voice_sample)
+            if timings is None:
+                return False
+            self.tts_timings.append(timings)
+            print(f"  ⏱  {format_timings(timings)}")
 
             if output_path.exists():
                 size_kb = output_path.stat().st_size / 1024
                 print(f"  ✅ Audio generated with voice clone: {size_kb:.1f} KB")
+                if cache_key:
+                    self.audio_cache.put(cache_key, output_path)
                 return True
             return False
         except Exception as e:
@@ -131,7 +234,7 @@ class FreeVideoGenerator:
             return False
 
     def generate_video_sadtalker(self, audio_path: Path, output_path: Path) -> bool:
-        """Generate talking head video using SadTalker"""
+        """Generate talking head video using the shared SadTalker worker"""
         if not self.avatar_path:
             print("  ❌ No avatar image found!")
             print(f"     Add photo at: assets/instructor/avatar.jpg")
@@ -143,63 +246,44 @@ class FreeVideoGenerator:
             return False
 
         print(f"  🎬 Generating video with SadTalker...")
+        if not self.sadtalker.running and not self.parallel:
+            print("     (starting SadTalker worker - models load once per run)")
 
         # SadTalker output directory
         result_dir = self.temp_dir / "sadtalker_output"
         result_dir.mkdir(exist_ok=True)
 
-        # Build command with absolute paths (required for SadTalker)
-        inference_script = self.sadtalker_dir / "inference.py"
-        cmd = [
-            sys.executable,
-            str(inference_script.absolute()),
-            "--driven_audio", str(audio_path.absolute()),
-            "--source_image", str(self.avatar_path.absolute()),
-            "--result_dir", str(result_dir.absolute()),
-            "--still",  # Minimize head movement for professional look
-            "--preprocess", "full",
-            "--cpu",  # Required: MPS/Metal has compatibility issues
-        ]
-
         if self.test_mode:
-            cmd.extend(["--size", "256"])
+            options = {"size": 256}
             print("     (test mode: ~15min for 5s video, CPU)")
         else:
-            cmd.extend(["--size", "512", "--enhancer", "gfpgan"])
+            options = {"size": 512, "enhancer": "gfpgan"}
             print("     (production mode: higher quality, ~30min for 5s video, CPU)")
 
+        if self.parallel:
+            if self.parallel.render(audio_path, self.avatar_path, output_path, preprocess="full",
+                                    timeout=3600, **options):
+                size_mb = output_path.stat().st_size / (1024 * 1024)
+                print(f"  ✅ Video generated: {size_mb:.1f} MB")
+                return True
+            return False
+
         try:
-            # Run SadTalker from its directory
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=str(self.sadtalker_dir.absolute()),
-                timeout=3600  # 1 hour timeout for longer videos
+            video = self.sadtalker.render(
+                audio_path, self.avatar_path, result_dir,
+                preprocess="full",
+                still=True,  # Minimize head movement for professional look
+                timeout=3600,  # 1 hour timeout for longer videos
+                **options
             )
-
-            if result.returncode != 0:
-                print(f"  ❌ SadTalker failed:")
-                if result.stderr:
-                    print(f"     {result.stderr[:500]}")
-                return False
-
-            # Find the generated video
-            mp4_files = list(result_dir.glob("**/*.mp4"))
-            if not mp4_files:
-                print("  ❌ No output video found")
-                return False
-
-            # Get most recent video
-            latest = max(mp4_files, key=lambda p: p.stat().st_mtime)
-            shutil.move(str(latest), str(output_path))
+            shutil.move(str(video), str(output_path))
 
             size_mb = output_path.stat().st_size / (1024 * 1024)
             print(f"  ✅ Video generated: {size_mb:.1f} MB")
             return True
 
-        except subprocess.TimeoutExpired:
-            print("  ❌ SadTalker timed out (>10 min)")
+        except SadTalkerWorkerError as e:
+            print(f"  ❌ SadTalker failed: {e}")
             return False
         except Exception as e:
             print(f"  ❌ Error: {e}")
@@ -215,10 +299,15 @@ class FreeVideoGenerator:
 
         lesson = self.lesson_scripts[lesson_id]
 
+        reason = self.needs_build(lesson_id)
+        if reason is None:
+            print(f"⏭  Up to date: {lesson_id} (use --force to rebuild)")
+            return True
+
         print(f"\n{'='*60}")
         print(f"🎬 {lesson['title']}")
         print(f"   Course: {lesson['courseTitle']}")
-        print(f"   ID: {lesson_id}")
+        print(f"   ID: {lesson_id} ({reason})")
         print(f"{'='*60}")
 
         # File paths
@@ -227,8 +316,15 @@ class FreeVideoGenerator:
         video_path = self.output_dir / f"{lesson_id}.mp4"
 
         # Step 1: Generate audio
-        # Try voice cloning first if sample exists, fall back to Edge TTS
-        audio_ok = self.generate_audio_coqui(lesson['script'], audio_path)
+        # Use narration from the batch stage if prepared, otherwise try voice
+        # cloning first if sample exists, falling back to Edge TTS
+        prepared = self.prepared_audio.pop(lesson_id, None)
+        if prepared and prepared.exists():
+            print(f"  🎤 Using prepared narration: {prepared.name}")
+            audio_path = prepared
+            audio_ok = True
+        else:
+            audio_ok = self.generate_audio_coqui(lesson['script'], audio_path)
         if not audio_ok:
             audio_ok = await self.generate_audio_edge_tts(lesson['script'], audio_path)
 
@@ -239,6 +335,9 @@ class FreeVideoGenerator:
         if not self.generate_video_sadtalker(audio_path, video_path):
             return False
 
+        self.manifest.record(video_path, self.lesson_inputs(lesson_id), lesson_id=lesson_id,
+                             generator="video-free")
+
         # Cleanup
         audio_path.unlink(missing_ok=True)
 
@@ -271,7 +370,12 @@ class FreeVideoGenerator:
         if not self.load_scripts():
             return
 
-        total = len(self.lesson_scripts)
+        lesson_ids = [lesson_id for lesson_id in self.lesson_scripts if self.needs_build(lesson_id)]
+        if len(lesson_ids) < len(self.lesson_scripts):
+            print(f"⏭  {len(self.lesson_scripts) - len(lesson_ids)} lessons up to date (use --force to rebuild)")
+        total = len(lesson_ids)
+        if not total:
+            return
 
         print(f"\n🚀 Generate {total} videos?")
         print(f"   Estimated time: {total * 120} minutes in CPU mode (~{total * 2} hours)")
@@ -283,19 +387,29 @@ class FreeVideoGenerator:
                 print("Cancelled")
                 return
 
+        # Narration and SadTalker output orphaned by earlier interrupted runs
+        freed = collect_garbage([self.temp_dir])
+        if freed:
+            print(f"🧹 Removed {freed / (1024*1024):.1f} MB of stale temp files")
+
+        await self.prepare_audio(lesson_ids)
+
         success = 0
-        for i, lesson_id in enumerate(self.lesson_scripts.keys(), 1):
+        for i, lesson_id in enumerate(lesson_ids, 1):
             print(f"\n[{i}/{total}]")
             if await self.generate_lesson(lesson_id):
                 success += 1
 
-            # Small delay between videos
             if i < total:
-                await asyncio.sleep(2)
+                await self.throttle.wait_async()
 
         print(f"\n{'='*60}")
         print(f"✅ Generated {success}/{total} videos")
         print(f"   Output: {self.output_dir}")
+        print(f"   Cool-down: {self.throttle.summary()}")
+        if self.tts_timings:
+            totals = {stage: sum(t[stage] for t in self.tts_timings) for stage in self.tts_timings[0]}
+            print(f"   Coqui TTS ({len(self.tts_timings)} lessons): {format_timings(totals)}")
         print(f"{'='*60}")
 
 
@@ -310,12 +424,25 @@ async def main():
     parser.add_argument("--instructor", default="sarah-chen",
                        choices=list(INSTRUCTOR_VOICES.keys()),
                        help="Instructor voice to use")
+    parser.add_argument("--no-audio-cache", action="store_true",
+                       help="Always re-synthesize narration instead of reusing cached audio")
+    parser.add_argument("--tts-concurrency", type=int, default=4,
+                       help="Concurrent Edge TTS sessions when preparing a batch (default: 4)")
+    parser.add_argument("--parallel", type=int, nargs="?", const=0, default=None, metavar="WORKERS",
+                       help="Split lessons at silences and render segments on WORKERS processes "
+                            "(default: sized to the CPU count)")
+    parser.add_argument("--force", action="store_true",
+                       help="Rebuild videos even if their script, voice and avatar are unchanged")
 
     args = parser.parse_args()
 
     generator = FreeVideoGenerator(
         test_mode=args.test,
-        instructor=args.instructor
+        instructor=args.instructor,
+        use_audio_cache=not args.no_audio_cache,
+        tts_concurrency=args.tts_concurrency,
+        parallel_workers=args.parallel,
+        force=args.force
     )
 
     if args.list:
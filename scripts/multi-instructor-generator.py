@@ -9,13 +9,15 @@ Usage:
     python scripts/multi-instructor-generator.py --all-instructors --test
 """
 
-import os
 import sys
 import argparse
-import subprocess
 from pathlib import Path
 from datetime import datetime
 
+# Shared pipeline helpers
+sys.path.insert(0, str(Path(__file__).parent / "pipeline"))
+from generator_loader import LazyVideoGenerator
+
 # Instructor configurations
 INSTRUCTORS = {
     'sarah-chen': {
@@ -79,10 +81,14 @@ DEFAULT_INSTRUCTOR = 'sarah-chen'
 
 
 class MultiInstructorGenerator:
-    def __init__(self, test_mode=False):
+    # The in-process VideoGenerator, built on first use (--list/--setup never import TTS)
+    base_generator = LazyVideoGenerator()
+
+    def __init__(self, test_mode=False, force=False):
         self.test_mode = test_mode
+        self.force = force
         self.project_root = Path(__file__).parent.parent
-        self.base_generator = self.project_root / "scripts" / "custom-video-generator.py"
+        self._base_generator = None
 
     def get_instructor_for_course(self, course_id):
         """Auto-select instructor based on course"""
@@ -147,38 +153,23 @@ class MultiInstructorGenerator:
         print(f"   Specialty: {instructor['specialty']}")
         print(f"{'='*60}\n")
 
-        # Build command for base generator
-        cmd = [
-            "python3",
-            str(self.base_generator),
-        ]
-
-        if lesson_id:
-            # Use lesson script
-            cmd.extend(["--lesson", lesson_id])
-        elif script:
-            # Use custom script
-            cmd.extend(["--script", script])
-            if title:
-                cmd.extend(["--title", title])
-
-        if self.test_mode:
-            cmd.append("--test")
-
-        # Set environment variables for instructor assets
-        env = os.environ.copy()
-        env['INSTRUCTOR_VOICE'] = str(voice_path)
-        env['INSTRUCTOR_PHOTO'] = str(photo_path)
-        env['INSTRUCTOR_NAME'] = instructor['name']
-
-        try:
-            result = subprocess.run(cmd, env=env, check=True)
-            print(f"✅ Video generated with {instructor['name']}")
-            return True
+        # Instructor assets go to the base generator per lesson (the same pipeline can
+        # render lessons for several instructors)
+        lesson = self.base_generator.lesson(
+            lesson_id=lesson_id,
+            script=None if lesson_id else script,
+            title=title,
+            voice_sample=voice_path,
+            instructor_photo=photo_path
+        )
+        result = self.base_generator.generate_many([lesson])[0]
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Generation failed: {e}")
+        if result.status == "failed":
+            print(f"❌ Generation failed: {result.reason}")
             return False
+        if result.status == "built":
+            print(f"✅ Video generated with {instructor['name']}")
+        return True
 
     def list_instructors(self):
         """List all available instructors"""
@@ -286,12 +277,13 @@ def main():
     parser.add_argument("--title", help="Custom video title")
     parser.add_argument("--course", help="Auto-select instructor for course")
     parser.add_argument("--test", action="store_true", help="Test mode (faster)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the script, voice and photo are unchanged")
     parser.add_argument("--list", action="store_true", help="List all instructors")
     parser.add_argument("--setup", help="Setup guide for specific instructor")
 
     args = parser.parse_args()
 
-    generator = MultiInstructorGenerator(test_mode=args.test)
+    generator = MultiInstructorGenerator(test_mode=args.test, force=args.force)
 
     # List instructors
     if args.list:
@@ -0,0 +1,203 @@
+"""
+Phazur Labs Academy - Batch Journal
+Crash-safe record of how far each lesson in a batch got, so a restart resumes mid-pipeline
+
+Every finished stage appends one fsync'd JSON line naming the lesson, the stage,
+the files it produced (with their size and mtime) and a key over the lesson's
+inputs. After a crash or Ctrl+C, the next run of the same batch reuses a stage's
+output only if the key still matches and the files are untouched - e.g. finished
+narration is kept and only the talking head is rendered again. A half-written
+last line from a crash is ignored. Lessons that were built or skipped leave the
+journal when the run completes; a failed lesson keeps its checkpoints, so the
+next run redoes only the stage that failed. The file is removed once nothing in
+it is pending.
+
+collect_garbage() removes stale temp artifacts that no journal still points at.
+
+Configuration (environment):
+    PHAZUR_BATCH_JOURNAL_DIR    Journal location (default: temp/batch-journals)
+    PHAZUR_TEMP_MAX_AGE_HOURS   Age at which unreferenced temp files are removed (default: 24)
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from build_manifest import input_hash
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_JOURNAL_DIR = PROJECT_ROOT / "temp" / "batch-journals"
+DEFAULT_TEMP_MAX_AGE_HOURS = 24
+DONE_STATUSES = ('built', 'skipped')   # finished for good; 'failed' lessons stay resumable
+
+
+def _encode(value):
+    if isinstance(value, Path):
+        stat = value.stat()
+        return {'path': str(value), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    return {'value': value}
+
+
+def _decode(encoded) -> Optional[Any]:
+    """The artifact, or None if the file it names is gone or has changed since"""
+    if 'path' not in encoded:
+        return encoded['value']
+    path = Path(encoded['path'])
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    if stat.st_size != encoded['size'] or stat.st_mtime_ns != encoded['mtime_ns']:
+        return None
+    return path
+
+
+class BatchJournal:
+    def __init__(self, name: str, journal_dir: Optional[Path] = None):
+        journal_dir = Path(journal_dir or os.environ.get('PHAZUR_BATCH_JOURNAL_DIR', DEFAULT_JOURNAL_DIR))
+        self.path = journal_dir / f"{name}.jsonl"
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, dict]] = {}
+        self._finished: Dict[str, dict] = {}
+        self._replay()
+
+    @staticmethod
+    def lesson_key(lesson: Dict[str, Any]) -> str:
+        """Hash over a lesson's inputs; checkpoints from different inputs are never reused"""
+        return input_hash({name: input_hash(value) for name, value in lesson.items()})
+
+    def _replay(self):
+        try:
+            lines = self.path.read_text().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn write from a crash
+            self._apply(record)
+
+    def _apply(self, record: dict):
+        lesson_id = record['lesson']
+        if record['event'] == 'stage':
+            if self._stages.get(lesson_id, {}).get('key') != record['key']:
+                self._stages[lesson_id] = {'key': record['key'], 'stages': {}}
+            self._stages[lesson_id]['stages'][record['stage']] = record['artifacts']
+            self._finished.pop(lesson_id, None)
+        elif record['event'] == 'finished':
+            self._finished[lesson_id] = record
+
+    def _append(self, record: dict):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(record)
+
+    def _done(self, lesson_id: str) -> bool:
+        return self._finished.get(lesson_id, {}).get('status') in DONE_STATUSES
+
+    @property
+    def pending(self) -> bool:
+        """Whether a previous run left lessons unfinished (or failed)"""
+        return any(not self._done(lesson_id) for lesson_id in self._stages)
+
+    def finished(self, status: Optional[str] = None) -> Dict[str, str]:
+        """{lesson_id: status} for lessons the journal saw finish (optionally only one status)"""
+        return {lesson_id: record['status'] for lesson_id, record in self._finished.items()
+                if status is None or record['status'] == status}
+
+    def completed_stage(self, lesson_id: str, key: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Artifacts a stage produced for this lesson in an earlier run, if all are still valid"""
+        entry = self._stages.get(lesson_id)
+        if not entry or entry['key'] != key or stage not in entry['stages']:
+            return None
+        artifacts = {}
+        for name, encoded in entry['stages'][stage].items():
+            value = _decode(encoded)
+            if value is None:
+                return None
+            artifacts[name] = value
+        return artifacts
+
+    def stage_done(self, lesson_id: str, key: str, stage: str, artifacts: Dict[str, Any]):
+        try:
+            encoded = {name: _encode(value) for name, value in artifacts.items()}
+            json.dumps(encoded)
+        except (OSError, TypeError, ValueError):
+            return  # not checkpointable; the stage simply runs again on resume
+        self._append({'event': 'stage', 'lesson': lesson_id, 'key': key, 'stage': stage,
+                      'artifacts': encoded, 'at': time.time()})
+
+    def lesson_finished(self, lesson_id: str, status: str, reason: Optional[str] = None):
+        self._append({'event': 'finished', 'lesson': lesson_id, 'status': status, 'reason': reason,
+                      'at': time.time()})
+
+    def referenced_paths(self) -> Set[Path]:
+        """Files that unfinished or failed lessons could still resume from"""
+        return {Path(encoded['path']).resolve()
+                for lesson_id, entry in self._stages.items() if not self._done(lesson_id)
+                for artifacts in entry['stages'].values()
+                for encoded in artifacts.values() if 'path' in encoded}
+
+    def close(self):
+        """Drop built / skipped lessons, rewriting the journal atomically (or removing it)"""
+        with self._lock:
+            keep = [lesson_id for lesson_id in self._stages if not self._done(lesson_id)]
+            if not keep:
+                self.path.unlink(missing_ok=True)
+                return
+            records = [{'event': 'stage', 'lesson': lesson_id, 'key': self._stages[lesson_id]['key'],
+                        'stage': stage, 'artifacts': artifacts, 'at': time.time()}
+                       for lesson_id in keep for stage, artifacts in self._stages[lesson_id]['stages'].items()]
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+            os.replace(tmp_path, self.path)
+
+
+def journal_paths(journal_dir: Optional[Path] = None) -> List[Path]:
+    journal_dir = Path(journal_dir or os.environ.get('PHAZUR_BATCH_JOURNAL_DIR', DEFAULT_JOURNAL_DIR))
+    return sorted(journal_dir.glob("*.jsonl"))
+
+
+def collect_garbage(temp_dirs: Iterable[Path], max_age_hours: Optional[float] = None) -> int:
+    """Remove temp artifacts older than max_age_hours that no batch journal references.
+
+    Returns the number of bytes freed.
+    """
+    if max_age_hours is None:
+        max_age_hours = float(os.environ.get('PHAZUR_TEMP_MAX_AGE_HOURS', DEFAULT_TEMP_MAX_AGE_HOURS))
+    cutoff = time.time() - max_age_hours * 3600
+    keep = set()
+    for path in journal_paths():
+        keep |= BatchJournal(path.stem, path.parent).referenced_paths()
+
+    freed = 0
+    for temp_dir in temp_dirs:
+        temp_dir = Path(temp_dir)
+        if not temp_dir.is_dir():
+            continue
+        for entry in temp_dir.iterdir():
+            try:
+                stat = entry.stat()
+                if stat.st_mtime >= cutoff or entry.resolve() in keep:
+                    continue
+                if entry.is_dir():
+                    files = [p for p in entry.rglob('*') if p.is_file()]
+                    if any(p.resolve() in keep or p.stat().st_mtime >= cutoff for p in files):
+                        continue
+                    freed += sum(p.stat().st_size for p in files)
+                    shutil.rmtree(entry)
+                else:
+                    freed += stat.st_size
+                    entry.unlink()
+            except FileNotFoundError:
+                continue
+    return freed
@@ -0,0 +1,142 @@
+"""
+Phazur Labs Academy - Build Manifest
+Make-style incremental builds for lesson videos, shared by every generator
+
+For each produced video the manifest records a hash of every input that went
+into it (script, prompt, voice, avatar, render settings) along with the
+artifact's size and mtime. A lesson is rebuilt only when one of those inputs
+changed or the artifact is missing or was replaced, so edited scripts re-render
+and unchanged ones are skipped without asking.
+
+Videos that already exist but predate the manifest are adopted on first sight
+(recorded as up to date with the current inputs) rather than re-rendered. Give
+the manifest a validate callable (e.g. media_info.validate_media) and a file
+is only adopted if it passes, so a truncated leftover is rebuilt instead.
+A read-only manifest (for dry runs) answers check() the same way but never
+writes, adoptions included.
+
+Configuration (environment):
+    PHAZUR_BUILD_MANIFEST   Manifest location (default: temp/build-manifest.json)
+"""
+
+import os
+import json
+import time
+import fcntl
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from tts_cache import file_digest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_MANIFEST = PROJECT_ROOT / "temp" / "build-manifest.json"
+
+_digest_cache = {}
+
+
+def input_hash(value) -> Optional[str]:
+    """Hash of one build input. Paths hash by file contents; anything else by its JSON form."""
+    if value is None:
+        return None
+    if isinstance(value, Path):
+        try:
+            stat = value.stat()
+        except FileNotFoundError:
+            return "missing"
+        key = (str(value.resolve()), stat.st_mtime_ns, stat.st_size)
+        if key not in _digest_cache:
+            _digest_cache[key] = file_digest(value)[:16]
+        return _digest_cache[key]
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class BuildManifest:
+    def __init__(self, path: Optional[Path] = None, adopt_existing: bool = True, read_only: bool = False,
+                 validate: Optional[Callable[[Path], Optional[str]]] = None):
+        self.path = Path(path or os.environ.get('PHAZUR_BUILD_MANIFEST', DEFAULT_MANIFEST))
+        self.adopt_existing = adopt_existing
+        self.validate = validate   # what's wrong with an existing file, or None (checked before adopting)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(inputs: Dict[str, object]) -> Dict[str, Optional[str]]:
+        return {name: input_hash(value) for name, value in sorted(inputs.items())}
+
+    def _target(self, output_path: Path) -> str:
+        output_path = Path(output_path).resolve()
+        try:
+            return str(output_path.relative_to(PROJECT_ROOT.resolve()))
+        except ValueError:
+            return str(output_path)
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _update(self, target: str, entry: dict):
+        """Set one entry under an exclusive lock, replacing the file atomically"""
+        if self.read_only:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path.with_suffix('.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = self._load()
+            data[target] = entry
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True))
+            os.replace(tmp_path, self.path)
+
+    def entry(self, output_path: Path) -> Optional[dict]:
+        return self._load().get(self._target(output_path))
+
+    def check(self, output_path: Path, inputs: Dict[str, object], lesson_id: Optional[str] = None,
+              generator: Optional[str] = None) -> Optional[str]:
+        """Why output_path needs rebuilding, or None if it is up to date"""
+        output_path = Path(output_path)
+        fingerprint = self.fingerprint(inputs)
+        entry = self.entry(output_path)
+
+        try:
+            stat = output_path.stat()
+        except FileNotFoundError:
+            return "new" if entry is None else "output missing"
+        if stat.st_size == 0:
+            return "output empty"
+
+        if entry is None:
+            problem = self.validate(output_path) if self.validate else None
+            if problem:
+                return f"existing output invalid ({problem})"
+            if self.adopt_existing:
+                self.record(output_path, inputs, lesson_id=lesson_id, generator=generator)
+                return None
+            return "not in manifest"
+
+        artifact = entry.get('artifact', {})
+        if artifact.get('size') != stat.st_size or artifact.get('mtime_ns') != stat.st_mtime_ns:
+            return "output replaced"
+
+        changed = [name for name in sorted(set(fingerprint) | set(entry.get('inputs', {})))
+                   if fingerprint.get(name) != entry['inputs'].get(name)]
+        if changed:
+            return f"{', '.join(changed)} changed"
+        return None
+
+    def record(self, output_path: Path, inputs: Dict[str, object], lesson_id: Optional[str] = None,
+               generator: Optional[str] = None):
+        """Record output_path as freshly built from inputs"""
+        output_path = Path(output_path)
+        stat = output_path.stat()
+        self._update(self._target(output_path), {
+            'lesson_id': lesson_id,
+            'generator': generator,
+            'inputs': self.fingerprint(inputs),
+            'artifact': {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+            'built_at': time.time(),
+        })
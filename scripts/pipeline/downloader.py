@@ -0,0 +1,270 @@
+"""
+Phazur Labs Academy - Shared Downloader
+Resumable, verified downloads of generated videos over one pooled HTTP session
+
+Data is written to "<name>.part" and only renamed onto the final path once its
+size (and checksum, when one is known) checks out, so an interrupted download
+never leaves a truncated mp4 that a later "already exists" check mistakes for
+a finished video. A retry resumes the .part file with an HTTP Range request.
+Large files can optionally be fetched as several ranges in parallel.
+
+Generators reuse one output path per lesson, so a .part file may be left over
+from an earlier render. The URL and ETag / Last-Modified it was fetched with are
+kept in "<name>.part.json", and a resume sends If-Range: a different URL, a
+changed validator or a full (200) response discards the old bytes instead of
+appending new ones to them.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 60
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _validators(response: requests.Response) -> Dict[str, str]:
+    """ETag / Last-Modified of a response (whichever the server sent)"""
+    return {key: response.headers[header] for key, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'))
+            if response.headers.get(header)}
+
+
+def _if_range(state: Dict[str, str]) -> Optional[str]:
+    """If-Range value for a stored state (weak ETags aren't allowed there)"""
+    etag = state.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return state.get('last_modified')
+
+
+def _changed(state: Dict[str, str], response: requests.Response) -> bool:
+    """Whether a response carries a different validator than the partial download"""
+    current = _validators(response)
+    return any(key in current and state.get(key) and current[key] != state[key]
+               for key in ('etag', 'last_modified'))
+
+
+def sha256_file(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Downloader:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, parts: int = 1, retries: int = DEFAULT_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT, session: Optional[requests.Session] = None):
+        self.chunk_size = chunk_size
+        self.parts = max(1, parts)
+        self.retries = retries
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, self.parts * 2))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+    @classmethod
+    def shared(cls) -> "Downloader":
+        """One pooled downloader per process, so connections are reused across videos.
+
+        PHAZUR_DOWNLOAD_PARTS sets how many ranges large files are fetched in.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(parts=int(os.environ.get('PHAZUR_DOWNLOAD_PARTS', '1')))
+            return cls._shared
+
+    @staticmethod
+    def _state_path(part_path: Path) -> Path:
+        return part_path.with_name(f"{part_path.name}.json")
+
+    def _save_state(self, part_path: Path, url: str, validators: Dict[str, str]):
+        self._state_path(part_path).write_text(json.dumps(dict(validators, url=url)))
+
+    def _resume_state(self, part_path: Path, url: str) -> Optional[Dict[str, str]]:
+        """Validators the .part file was fetched with, if it came from this url"""
+        try:
+            state = json.loads(self._state_path(part_path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return state if state.get('url') == url else None
+
+    def _discard(self, part_path: Path):
+        part_path.unlink(missing_ok=True)
+        self._state_path(part_path).unlink(missing_ok=True)
+
+    def _probe(self, url: str, headers: Dict[str, str]) -> Tuple[Optional[int], bool, Dict[str, str]]:
+        """(total size, whether the server honours Range, validators) from a one-byte ranged GET"""
+        response = self.session.get(url, headers=dict(headers, Range='bytes=0-0'), stream=True,
+                                    timeout=self.timeout)
+        try:
+            validators = _validators(response)
+            if response.status_code == 206:
+                match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+                if match and match.group(3) != '*':
+                    return int(match.group(3)), True, validators
+            elif response.status_code == 200:
+                length = response.headers.get('Content-Length')
+                return (int(length) if length else None), False, validators
+            return None, False, validators
+        finally:
+            response.close()
+
+    def _fetch_sequential(self, url: str, headers: Dict[str, str], part_path: Path) -> Optional[int]:
+        """Fetch into part_path, resuming from whatever it already holds. Returns the expected total size."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        state = self._resume_state(part_path, url) if offset else None
+        validator = _if_range(state) if state else None
+        if offset and not validator:
+            # No proof the partial data came from this resource: start over
+            self._discard(part_path)
+            offset = 0
+        request_headers = dict(headers)
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+            request_headers['If-Range'] = validator
+
+        response = self.session.get(url, headers=request_headers, stream=True, timeout=self.timeout)
+        try:
+            if response.status_code == 416 and offset:
+                # Nothing left past our offset: the previous attempt already has every byte,
+                # unless the resource was replaced by one no longer than what we hold
+                match = re.search(r'/(\d+)', response.headers.get('Content-Range', ''))
+                if match and int(match.group(1)) == offset and not _changed(state, response):
+                    return offset
+                self._discard(part_path)
+                raise DownloadError("resource changed since the partial download")
+            if response.status_code == 206:
+                if _changed(state, response):
+                    self._discard(part_path)
+                    raise DownloadError("resource changed since the partial download")
+                match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+                total = int(match.group(3)) if match and match.group(3) != '*' else None
+                mode = 'ab'
+            elif response.status_code == 200:
+                # The whole resource: a fresh download, or a failed If-Range (it changed)
+                length = response.headers.get('Content-Length')
+                total = int(length) if length else None
+                mode = 'wb'
+                self._save_state(part_path, url, _validators(response))
+            else:
+                raise DownloadError(f"HTTP {response.status_code}")
+
+            with open(part_path, mode, buffering=self.chunk_size) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+            return total
+        finally:
+            response.close()
+
+    def _fetch_range(self, url: str, headers: Dict[str, str], part_path: Path, start: int, end: int):
+        for attempt in range(1, self.retries + 1):
+            try:
+                # headers carry If-Range, so a resource that changes mid-download answers 200, not 206
+                response = self.session.get(url, headers=dict(headers, Range=f'bytes={start}-{end}'),
+                                            stream=True, timeout=self.timeout)
+                try:
+                    if response.status_code != 206:
+                        raise DownloadError(f"range {start}-{end}: HTTP {response.status_code}")
+                    position = start
+                    with open(part_path, 'r+b') as f:
+                        f.seek(start)
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            f.write(chunk)
+                            position += len(chunk)
+                    if position != end + 1:
+                        raise DownloadError(f"range {start}-{end}: got {position - start} bytes")
+                    return
+                finally:
+                    response.close()
+            except (requests.RequestException, DownloadError):
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _fetch_parallel(self, url: str, headers: Dict[str, str], part_path: Path, total: int):
+        with open(part_path, 'wb') as f:
+            f.truncate(total)
+
+        step = -(-total // self.parts)
+        ranges: List[Tuple[int, int]] = [(start, min(start + step, total) - 1) for start in range(0, total, step)]
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            for future in [pool.submit(self._fetch_range, url, headers, part_path, s, e) for s, e in ranges]:
+                future.result()
+
+    def download(self, url: str, output_path: Path, headers: Optional[Dict[str, str]] = None,
+                 expected_size: Optional[int] = None, sha256: Optional[str] = None) -> int:
+        """Download url to output_path, returning its size in bytes.
+
+        Raises DownloadError if the transfer keeps failing or the result does
+        not match the server-reported size, expected_size or sha256.
+        """
+        headers = headers or {}
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = output_path.with_name(f"{output_path.name}.part")
+
+        total = None
+        if self.parts > 1 and not part_path.exists():
+            # Ranges land out of order and leave holes, so they go to their own file
+            # and only become the resumable .part once every range is complete
+            ranges_path = output_path.with_name(f"{output_path.name}.ranges.part")
+            ranges_path.unlink(missing_ok=True)
+            total, ranged, validators = self._probe(url, headers)
+            validator = _if_range(validators)
+            if ranged and validator and total and total >= PARALLEL_MIN_BYTES:
+                try:
+                    self._fetch_parallel(url, dict(headers, **{'If-Range': validator}), ranges_path, total)
+                    self._save_state(part_path, url, validators)
+                    os.replace(ranges_path, part_path)
+                except (requests.RequestException, DownloadError):
+                    ranges_path.unlink(missing_ok=True)
+
+        if not part_path.exists() or part_path.stat().st_size != total:
+            for attempt in range(1, self.retries + 1):
+                try:
+                    total = self._fetch_sequential(url, headers, part_path)
+                    if total is None or part_path.stat().st_size >= total:
+                        break
+                    error = f"short read ({part_path.stat().st_size} of {total} bytes)"
+                except (requests.RequestException, DownloadError) as e:
+                    error = str(e)
+                if attempt == self.retries:
+                    raise DownloadError(f"{output_path.name}: {error}")
+                time.sleep(2 ** attempt)
+
+        size = part_path.stat().st_size
+        for label, expected in (('server size', total), ('expected size', expected_size)):
+            if expected is not None and size != expected:
+                self._discard(part_path)
+                raise DownloadError(f"{output_path.name}: {size} bytes, {label} is {expected}")
+        if sha256 and sha256_file(part_path, self.chunk_size) != sha256.lower():
+            self._discard(part_path)
+            raise DownloadError(f"{output_path.name}: checksum mismatch")
+
+        os.replace(part_path, output_path)
+        self._state_path(part_path).unlink(missing_ok=True)
+        return size
@@ -0,0 +1,46 @@
+"""
+Phazur Labs Academy - Generator Loader
+In-process VideoGenerator for the batch front-ends, created on first use
+
+batch-custom-videos.py, generate-phazur-videos.py and multi-instructor-generator.py
+all drive custom-video-generator.py's VideoGenerator in process. Its file name
+isn't a valid module name, and importing it loads Coqui TTS, so the front-ends
+declare a LazyVideoGenerator attribute instead: the module is imported and the
+generator built the first time the attribute is read, and commands that only
+list, extract or preview never import TTS.
+"""
+
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+
+GENERATOR_SCRIPT = Path(__file__).parent.parent / "custom-video-generator.py"
+
+
+@lru_cache(maxsize=None)
+def load_video_generator():
+    """Import custom-video-generator.py (once per process)"""
+    spec = importlib.util.spec_from_file_location("custom_video_generator", GENERATOR_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LazyVideoGenerator:
+    """Class attribute that builds a VideoGenerator from the owner's test_mode / force on first read.
+
+    The instance is kept in "_<attribute name>" (None until then), so callers can
+    check whether it was ever created without creating it.
+    """
+
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        generator = getattr(instance, self.slot, None)
+        if generator is None:
+            generator = load_video_generator().VideoGenerator(test_mode=instance.test_mode, force=instance.force)
+            setattr(instance, self.slot, generator)
+        return generator
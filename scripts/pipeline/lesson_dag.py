@@ -0,0 +1,286 @@
+"""
+Phazur Labs Academy - Lesson Pipeline Engine
+Runs a batch of lessons through a DAG of stages inside one process
+
+Each stage declares the artifacts it needs and the ones it makes, and starts for
+a lesson as soon as everything it needs exists. Stages run on named thread pools
+sized for their work: one slot each for the long-lived TTS model and SadTalker
+worker, a few for CPU-bound ffmpeg encodes, more for I/O and network calls. So
+lesson 3 is being narrated while lesson 2 renders and lesson 1 is branded, and
+the models are loaded once for the whole batch instead of once per lesson.
+
+An optional Throttle (see throttle.py) holds back new lessons while the machine
+is hot or loaded; stages already running are never interrupted. With a
+BatchJournal (see batch_journal.py), stages marked checkpoint=True are recorded
+as they finish and reused by the next run if the batch was interrupted. With a
+MetricsRecorder (see metrics.py), every stage run is measured - wall and CPU
+time, peak memory, and the size of the files it was handed and produced.
+
+Configuration (environment):
+    PHAZUR_PIPELINE_POOLS   Pool size overrides, e.g. "cpu=4,render=2"
+"""
+
+import os
+import time
+from pathlib import Path
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from throttle import Throttle
+from batch_journal import BatchJournal
+from metrics import MetricsRecorder
+
+DEFAULT_POOLS = {
+    'io': 4,
+    'cpu': max(1, (os.cpu_count() or 2) // 2),
+    'network': 8,
+    'tts': 1,
+    'render': 1,
+}
+
+
+class LessonSkipped(Exception):
+    """Raised by a stage when the lesson needs no more work (e.g. it is up to date)"""
+
+    metrics_status = 'skipped'
+
+
+class StageError(Exception):
+    """Raised by a stage that failed in an expected way; reported without a traceback"""
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    needs: Tuple[str, ...] = ()
+    makes: Tuple[str, ...] = ()
+    pool: str = 'cpu'
+    checkpoint: bool = False         # journal its outputs so an interrupted batch can resume after it
+
+
+@dataclass
+class LessonResult:
+    lesson_id: str
+    status: str = 'pending'          # built | skipped | failed
+    reason: Optional[str] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    resumed: List[str] = field(default_factory=list)   # stages reused from an interrupted run
+
+
+def pool_sizes(overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    sizes = dict(DEFAULT_POOLS)
+    for item in os.environ.get('PHAZUR_PIPELINE_POOLS', '').split(','):
+        name, _, value = item.partition('=')
+        if name.strip() and value.strip():
+            sizes[name.strip()] = max(1, int(value))
+    sizes.update(overrides or {})
+    return sizes
+
+
+def format_utilization(stats: Dict[str, Any]) -> str:
+    """One-line pool summary, e.g. 'tts 92% | render 97% | cpu 31%'"""
+    wall = stats.get('wall_seconds') or 1e-9
+    return " | ".join(f"{pool} {busy / (wall * stats['pool_sizes'][pool]):.0%}"
+                      for pool, busy in stats['busy_seconds'].items())
+
+
+class _LessonState:
+    def __init__(self, result: LessonResult, artifacts: Dict[str, Any], key: Optional[str] = None):
+        self.result = result
+        self.artifacts = artifacts
+        self.key = key
+        self.started = set()
+        self.done = set()
+        self.running = 0
+        self.finished = False
+
+
+class LessonPipeline:
+    def __init__(self, stages: List[Stage], pools: Optional[Dict[str, int]] = None,
+                 max_lessons: Optional[int] = None, throttle: Optional[Throttle] = None,
+                 journal: Optional[BatchJournal] = None, metrics: Optional[MetricsRecorder] = None,
+                 on_finish: Optional[Callable[[LessonResult], None]] = None):
+        self.stages = stages
+        self.upstream = self._dependencies(stages)
+        self.lesson_keys = sorted({need for stage in stages for need in stage.needs}
+                                  - {made for stage in stages for made in stage.makes})
+
+        sizes = pool_sizes(pools)
+        unknown = {stage.pool for stage in stages} - set(sizes)
+        if unknown:
+            raise ValueError(f"No pool size for: {', '.join(sorted(unknown))}")
+        self.pool_sizes = {stage.pool: sizes[stage.pool] for stage in stages}
+
+        # Enough lessons in flight to keep every pool busy, but not so many that
+        # half-finished intermediates pile up on disk
+        self.max_lessons = max_lessons or sum(self.pool_sizes.values()) + 1
+        self.throttle = throttle
+        self.journal = journal
+        self.metrics = metrics
+        self.on_finish = on_finish
+        self.stats = {}
+
+    @staticmethod
+    def _dependencies(stages: List[Stage]) -> Dict[str, set]:
+        producers = {}
+        for stage in stages:
+            for made in stage.makes:
+                if made in producers:
+                    raise ValueError(f"'{made}' is made by both {producers[made]} and {stage.name}")
+                producers[made] = stage.name
+        upstream = {stage.name: {producers[need] for need in stage.needs if need in producers}
+                    for stage in stages}
+
+        # Reject cycles up front rather than deadlocking mid-batch
+        resolved = set()
+        while len(resolved) < len(upstream):
+            ready = {name for name, deps in upstream.items() if name not in resolved and deps <= resolved}
+            if not ready:
+                raise ValueError(f"Stage cycle among: {', '.join(sorted(set(upstream) - resolved))}")
+            resolved |= ready
+        return upstream
+
+    def _execute(self, stage: Stage, lesson_id: str, artifacts: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        start = time.perf_counter()
+        given = {need: artifacts[need] for need in stage.needs}
+        if self.metrics:
+            with self.metrics.stage(lesson_id, stage.name,
+                                    inputs=[v for v in given.values() if isinstance(v, Path)]) as measured:
+                made = stage.run(given) or {}
+                measured.add_bytes(bytes_out=sum(v.stat().st_size for v in made.values()
+                                                 if isinstance(v, Path) and v.is_file()))
+        else:
+            made = stage.run(given) or {}
+        missing = set(stage.makes) - set(made)
+        if missing:
+            raise StageError(f"{stage.name} did not produce {', '.join(sorted(missing))}")
+        return made, time.perf_counter() - start
+
+    def _finish(self, state: _LessonState, status: str, reason: Optional[str] = None):
+        if state.finished:
+            return
+        state.finished = True
+        state.result.status = status
+        state.result.reason = reason
+        state.result.artifacts = state.artifacts
+        if self.journal:
+            self.journal.lesson_finished(state.result.lesson_id, status, reason)
+        if self.on_finish:
+            self.on_finish(state.result)
+
+    def _schedule(self, state: _LessonState, executors: dict, futures: dict):
+        """Start every stage whose upstream stages are done, reusing journaled ones"""
+        progress = True
+        while progress and not state.finished:
+            progress = False
+            for stage in self.stages:
+                if stage.name in state.started or not self.upstream[stage.name] <= state.done:
+                    continue
+                state.started.add(stage.name)
+
+                restored = None
+                if self.journal and stage.checkpoint:
+                    restored = self.journal.completed_stage(state.result.lesson_id, state.key, stage.name)
+                if restored is not None:
+                    print(f"♻️  {state.result.lesson_id}: reusing {stage.name} from the interrupted run")
+                    state.artifacts.update(restored)
+                    state.done.add(stage.name)
+                    state.result.resumed.append(stage.name)
+                    progress = True
+                    continue
+
+                state.running += 1
+                future = executors[stage.pool].submit(self._execute, stage, state.result.lesson_id, state.artifacts)
+                futures[future] = (state, stage)
+
+        if len(state.done) == len(self.stages):
+            self._finish(state, 'built')
+
+    def run(self, lessons: List[Dict[str, Any]]) -> List[LessonResult]:
+        """Run every lesson through the stages; returns one result per lesson, in order"""
+        results = [LessonResult(lesson['lesson_id']) for lesson in lessons]
+        queue = deque()
+        for result, lesson in zip(results, lessons):
+            missing = [key for key in self.lesson_keys if key not in lesson]
+            if missing:
+                result.status, result.reason = 'failed', f"missing {', '.join(missing)}"
+            else:
+                key = BatchJournal.lesson_key(lesson) if self.journal else None
+                queue.append(_LessonState(result, dict(lesson), key))
+
+        executors = {pool: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"lesson-{pool}")
+                     for pool, size in self.pool_sizes.items()}
+        busy = {pool: 0.0 for pool in self.pool_sizes}
+        active: List[_LessonState] = []
+        futures = {}
+        started_at = time.perf_counter()
+
+        try:
+            while queue or active:
+                # Admit lessons in order while the throttle allows it
+                wake_in = None
+                while queue and len(active) < self.max_lessons:
+                    pause = self.throttle.pause_seconds() if self.throttle else 0.0
+                    if pause:
+                        wake_in = pause
+                        break
+                    active.append(queue.popleft())
+
+                for state in active:
+                    self._schedule(state, executors, futures)
+
+                if not futures:
+                    active = [state for state in active if not state.finished]
+                    time.sleep(wake_in or 0)
+                    continue
+                done, _ = wait(futures, timeout=wake_in, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state, stage = futures.pop(future)
+                    state.running -= 1
+                    try:
+                        made, seconds = future.result()
+                    except LessonSkipped as e:
+                        print(f"⏭  {state.result.lesson_id}: {e}")
+                        self._finish(state, 'skipped', str(e))
+                    except StageError as e:
+                        print(f"❌ {state.result.lesson_id}: {stage.name} failed: {e}")
+                        self._finish(state, 'failed', f"{stage.name}: {e}")
+                    except Exception as e:
+                        print(f"❌ {state.result.lesson_id}: {stage.name} raised {type(e).__name__}: {e}")
+                        traceback.print_exception(type(e), e, e.__traceback__)
+                        self._finish(state, 'failed', f"{stage.name}: {type(e).__name__}: {e}")
+                    else:
+                        busy[stage.pool] += seconds
+                        state.result.stage_seconds[stage.name] = seconds
+                        state.artifacts.update(made)
+                        state.done.add(stage.name)
+                        if self.journal and stage.checkpoint:
+                            self.journal.stage_done(state.result.lesson_id, state.key, stage.name, made)
+                        if len(state.done) == len(self.stages):
+                            self._finish(state, 'built')
+
+                # A lesson leaves the window once it is finished and nothing of it is still running
+                active = [state for state in active if not (state.finished and state.running == 0)]
+
+        except BaseException:
+            # Queued stages are dropped; the journal lets the next run pick up from here
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        else:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+        finally:
+            self.stats = {
+                'wall_seconds': time.perf_counter() - started_at,
+                'busy_seconds': busy,
+                'pool_sizes': dict(self.pool_sizes),
+                'throttled_seconds': self.throttle.total_paused if self.throttle else 0.0,
+            }
+
+        return results
@@ -0,0 +1,603 @@
+"""
+Phazur Labs Academy - Media Info
+Probe each audio / video file once: duration, container, codecs, streams, bit rate
+
+WAV, MP3 and MP4/MOV headers are parsed natively, so the common cases never
+spawn a process; anything else (or a header the parsers don't understand) goes
+to ffprobe. Results are cached in a JSON file keyed by resolved path and
+checked against the file's size and mtime, so re-validating an unchanged tree
+costs one stat() per file. Codec and container names follow ffprobe's (h264,
+aac, mp4) whichever prober ran, and MP4 video streams also list their keyframe
+times, read from the sample tables.
+
+validate_media() is the output check for generators: a file passes only if it
+parses, is long enough, and has the streams it should - not merely if it is
+bigger than some number of bytes. A native parser that finds a file truncated
+or missing its index reports that directly rather than deferring to ffprobe,
+which only reads headers and would accept it.
+
+Validate a tree:
+    python scripts/pipeline/media_info.py                        # public/videos/lessons
+    python scripts/pipeline/media_info.py public/videos --require-audio
+
+Configuration (environment):
+    PHAZUR_MEDIA_INFO_CACHE   Cache location (default: temp/media-info-cache.json)
+"""
+
+import os
+import json
+import math
+import time
+import fcntl
+import atexit
+import struct
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE = PROJECT_ROOT / "temp" / "media-info-cache.json"
+DEFAULT_TREE = PROJECT_ROOT / "public" / "videos" / "lessons"
+MEDIA_SUFFIXES = {'.mp4', '.mov', '.m4a', '.mp3', '.wav', '.webm', '.mkv'}
+MIN_SECONDS = 1.0
+CACHE_VERSION = 3
+
+# MP4 sample entry fourccs / ffprobe format names -> the names ffprobe reports for
+# codecs and containers, so results don't depend on which prober ran
+CODEC_NAMES = {'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc', 'av01': 'av1',
+               'vp09': 'vp9', 'vp08': 'vp8', 'mp4v': 'mpeg4', 'mjpa': 'mjpeg', 'mjpb': 'mjpeg',
+               'jpeg': 'mjpeg', 'apch': 'prores', 'apcn': 'prores', 'apcs': 'prores', 'apco': 'prores',
+               'ap4h': 'prores', 's263': 'h263', 'mp4a': 'aac', 'Opus': 'opus', 'fLaC': 'flac',
+               'alac': 'alac', 'ac-3': 'ac3', 'ec-3': 'eac3', '.mp3': 'mp3', 'samr': 'amr_nb',
+               'sawb': 'amr_wb', 'sowt': 'pcm_s16le', 'twos': 'pcm_s16be', 'ulaw': 'pcm_mulaw',
+               'alaw': 'pcm_alaw'}
+CONTAINER_NAMES = {'mov,mp4,m4a,3gp,3g2,mj2': 'mp4'}
+
+# H.264 profile_idc -> (ffprobe profile name, pixel format when avcC doesn't say)
+H264_PROFILES = {66: ('Baseline', 'yuv420p'), 77: ('Main', 'yuv420p'), 88: ('Extended', 'yuv420p'),
+                 100: ('High', 'yuv420p'), 110: ('High 10', 'yuv420p10le'), 122: ('High 4:2:2', 'yuv422p'),
+                 244: ('High 4:4:4 Predictive', 'yuv444p')}
+
+
+class MediaError(Exception):
+    """The file is definitely broken (truncated, no index, no duration)"""
+
+
+class _Unsupported(Exception):
+    """A native parser can't read this file; ffprobe should"""
+
+
+# Stream keys: type, codec; video: width, height, profile, level, pix_fmt, time_base,
+# r_frame_rate and (MP4 only) keyframes - presentation times in seconds;
+# audio: sample_rate, channels.
+@dataclass
+class MediaInfo:
+    path: str
+    size: int
+    mtime_ns: int
+    duration: Optional[float] = None
+    container: Optional[str] = None
+    bit_rate: Optional[int] = None
+    streams: List[dict] = field(default_factory=list)   # {'type': 'video'|'audio', 'codec', ...} (see below)
+    probed_by: str = ''                                  # wav | mp3 | mp4 | ffprobe
+    error: Optional[str] = None
+
+    def stream(self, kind: str) -> Optional[dict]:
+        return next((s for s in self.streams if s.get('type') == kind), None)
+
+    @property
+    def has_video(self) -> bool:
+        return self.stream('video') is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.stream('audio') is not None
+
+
+# ============================================================================
+# NATIVE PARSERS
+# ============================================================================
+
+def _probe_wav(f, size: int) -> dict:
+    header = f.read(12)
+    if header[:4] not in (b'RIFF', b'RF64') or header[8:12] != b'WAVE':
+        raise _Unsupported("not a RIFF/WAVE file")
+
+    fmt, data_size = None, None
+    while data_size is None:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack('<HHIIHH', f.read(16))
+            f.seek(chunk_size - 16 + (chunk_size & 1), 1)
+        elif chunk_id == b'data':
+            # Streamed / RF64 files leave the size at 0xFFFFFFFF: the data runs to the end
+            data_size = min(chunk_size, size - f.tell())
+        else:
+            f.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None or data_size is None:
+        raise MediaError("WAV has no fmt or data chunk")
+    audio_format, channels, sample_rate, byte_rate, _, bits = fmt
+    if not byte_rate:
+        raise MediaError("WAV byte rate is 0")
+
+    if audio_format == 3:
+        codec = f"pcm_f{bits}le"
+    elif audio_format in (1, 0xFFFE):
+        codec = 'pcm_u8' if bits == 8 else f"pcm_s{bits}le"
+    else:
+        raise _Unsupported(f"WAV format 0x{audio_format:x}")
+    return {
+        'duration': data_size / byte_rate,
+        'container': 'wav',
+        'bit_rate': byte_rate * 8,
+        'streams': [{'type': 'audio', 'codec': codec, 'sample_rate': sample_rate, 'channels': channels}],
+    }
+
+
+_MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+_MP3_VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+
+
+def _mp3_frame(header: bytes) -> Optional[dict]:
+    """Fields of an MPEG audio Layer III frame header (None if it isn't one)"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = _MP3_VERSIONS.get((header[1] >> 3) & 0b11)
+    layer = (header[1] >> 1) & 0b11
+    bitrate_index, rate_index = header[2] >> 4, (header[2] >> 2) & 0b11
+    if version is None or layer != 0b01 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES[1 if version == 1 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 1
+    channels = 1 if header[3] >> 6 == 0b11 else 2
+    return {
+        'version': version,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'samples': 1152 if version == 1 else 576,
+        'length': (144 if version == 1 else 72) * bitrate // sample_rate + padding,
+    }
+
+
+def _probe_mp3(f, size: int) -> dict:
+    start = 0
+    tag = f.read(10)
+    if tag[:3] == b'ID3':
+        start = 10 + ((tag[6] << 21) | (tag[7] << 14) | (tag[8] << 7) | tag[9]) + (10 if tag[5] & 0x10 else 0)
+
+    # First frame whose successor also starts where it should
+    f.seek(start)
+    buffer = f.read(64 * 1024)
+    for offset in range(len(buffer) - 4):
+        frame = _mp3_frame(buffer[offset:offset + 4])
+        if not frame:
+            continue
+        following = offset + frame['length']
+        if following + 4 <= len(buffer) and not _mp3_frame(buffer[following:following + 4]):
+            continue
+        break
+    else:
+        raise _Unsupported("no MPEG Layer III frame found")
+
+    audio_start = start + offset
+    f.seek(max(size - 128, 0))
+    audio_end = size - 128 if f.read(3) == b'TAG' else size
+
+    # A Xing/Info or VBRI header gives the exact frame count (VBR files)
+    side_info = (17 if frame['channels'] == 1 else 32) if frame['version'] == 1 else \
+                (9 if frame['channels'] == 1 else 17)
+    frames = None
+    xing = buffer[offset + 4 + side_info:offset + 4 + side_info + 12]
+    if xing[:4] in (b'Xing', b'Info') and struct.unpack('>I', xing[4:8])[0] & 1:
+        frames = struct.unpack('>I', xing[8:12])[0]
+    vbri = buffer[offset + 36:offset + 36 + 18]
+    if frames is None and vbri[:4] == b'VBRI':
+        frames = struct.unpack('>I', vbri[14:18])[0]
+
+    if frames:
+        duration = frames * frame['samples'] / frame['sample_rate']
+    else:
+        duration = (audio_end - audio_start) * 8 / frame['bitrate']
+    return {
+        'duration': duration,
+        'container': 'mp3',
+        'bit_rate': int((audio_end - audio_start) * 8 / duration) if duration else frame['bitrate'],
+        'streams': [{'type': 'audio', 'codec': 'mp3', 'sample_rate': frame['sample_rate'],
+                     'channels': frame['channels']}],
+    }
+
+
+def _boxes(f, start: int, end: int):
+    """(type, payload start, box end) of each ISO-BMFF box in [start, end)"""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        box_size, box_type = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if box_size == 1:
+            box_size, header = struct.unpack('>Q', f.read(8))[0], 16
+        elif box_size == 0:
+            box_size = end - position
+        if box_size < header:
+            raise MediaError(f"corrupt '{box_type.decode('latin-1')}' box at byte {position}")
+        yield box_type, position + header, position + box_size
+        position += box_size
+
+
+def _child(f, start: int, end: int, box_type: bytes):
+    return next(((s, e) for t, s, e in _boxes(f, start, end) if t == box_type), None)
+
+
+def _full_box(f, start: int, fmt: str):
+    """(version, fields) of a full box whose payload starts at `start`"""
+    f.seek(start)
+    version = f.read(4)[0]
+    return version, struct.unpack(fmt, f.read(struct.calcsize(fmt)))
+
+
+def _table(f, box, entry_fmt: str) -> list:
+    """Entries of a sample table box (stts / ctts / stss)"""
+    if not box:
+        return []
+    f.seek(box[0] + 4)
+    count = struct.unpack('>I', f.read(4))[0]
+    entry_size = struct.calcsize(entry_fmt)
+    data = f.read(count * entry_size)
+    return [struct.unpack_from(entry_fmt, data, i * entry_size) for i in range(len(data) // entry_size)]
+
+
+def _avc_params(f, avcc) -> dict:
+    """Profile, level and pixel format from an avcC box"""
+    f.seek(avcc[0])
+    data = f.read(avcc[1] - avcc[0])
+    profile_idc, constraints, level = data[1], data[2], data[3]
+    name, pix_fmt = H264_PROFILES.get(profile_idc, (None, None))
+    if profile_idc == 66 and constraints & 0x40:
+        name = 'Constrained Baseline'
+
+    # High profiles may append chroma format and bit depth after the SPS / PPS lists
+    position = 6
+    for count_mask in (0x1F, 0xFF):
+        count = data[position - 1] & count_mask
+        for _ in range(count):
+            position += 2 + struct.unpack('>H', data[position:position + 2])[0]
+        position += 1
+    if profile_idc in (100, 110, 122, 244) and len(data) >= position + 2:
+        chroma = {1: 'yuv420p', 2: 'yuv422p', 3: 'yuv444p'}.get(data[position - 1] & 0x03, pix_fmt)
+        bits = (data[position] & 0x07) + 8
+        pix_fmt = chroma if bits == 8 else f"{chroma}{bits}le"
+    return {'profile': name, 'level': level, 'pix_fmt': pix_fmt}
+
+
+def _keyframe_times(f, stbl, edts, timescale: int, movie_timescale: int) -> Optional[List[float]]:
+    """Presentation time of each sync sample, as ffprobe reports pts_time (None: every frame is one)"""
+    sync = _table(f, _child(f, *stbl, b'stss'), '>I')
+    if not sync:
+        return None
+    targets = {number for number, in sync}
+
+    # Edit list: leading empty edits delay the track, the first real edit skips media_time
+    shift, delay = 0, 0
+    elst = edts and _child(f, *edts, b'elst')
+    if elst:
+        version, (count,) = _full_box(f, elst[0], '>I')
+        entry_fmt = '>Qq' if version == 1 else '>Ii'
+        for _ in range(count):
+            duration, media_time = struct.unpack(entry_fmt, f.read(struct.calcsize(entry_fmt)))
+            if media_time == -1:
+                delay += duration
+                continue
+            shift = media_time
+            break
+
+    ctts = iter(_table(f, _child(f, *stbl, b'ctts'), '>Ii'))
+    offset_count, offset = next(ctts, (math.inf, 0))
+    times, sample, dts = [], 1, 0
+    for count, delta in _table(f, _child(f, *stbl, b'stts'), '>II'):
+        for _ in range(count):
+            if sample in targets:
+                times.append(round((dts + offset - shift) / timescale + delay / movie_timescale, 6))
+            sample += 1
+            dts += delta
+            offset_count -= 1
+            if offset_count == 0:
+                offset_count, offset = next(ctts, (math.inf, 0))
+    return times
+
+
+def _probe_mp4(f, size: int) -> dict:
+    f.seek(4)
+    if f.read(4) not in (b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip'):
+        raise _Unsupported("not an ISO-BMFF file")
+
+    top = {}
+    for box_type, start, end in _boxes(f, 0, size):
+        if end > size:
+            raise MediaError(f"truncated: '{box_type.decode('latin-1')}' box needs {end - size} more bytes")
+        top.setdefault(box_type, (start, end))
+    if b'moov' not in top:
+        raise MediaError("no moov box (file was not finalized)")
+    if b'mdat' not in top and b'moof' not in top:
+        raise MediaError("no media data")
+
+    moov_start, moov_end = top[b'moov']
+    mvhd = _child(f, moov_start, moov_end, b'mvhd')
+    if not mvhd:
+        raise MediaError("no mvhd box")
+    version, _ = _full_box(f, mvhd[0], '')
+    movie_timescale, duration = _full_box(f, mvhd[0], '>QQIQ' if version == 1 else '>IIII')[1][2:]
+    duration = duration / movie_timescale if movie_timescale else None
+
+    streams = []
+    for box_type, trak_start, trak_end in _boxes(f, moov_start, moov_end):
+        if box_type != b'trak':
+            continue
+        mdia = _child(f, trak_start, trak_end, b'mdia')
+        hdlr = mdia and _child(f, *mdia, b'hdlr')
+        if not hdlr:
+            continue
+        f.seek(hdlr[0] + 8)
+        kind = {b'vide': 'video', b'soun': 'audio'}.get(f.read(4))
+        if not kind:
+            continue
+
+        stream = {'type': kind}
+        minf = _child(f, *mdia, b'minf')
+        stbl = minf and _child(f, *minf, b'stbl')
+        stsd = stbl and _child(f, *stbl, b'stsd')
+        if stsd:
+            entry_start = stsd[0] + 8   # version/flags, entry count
+            f.seek(entry_start)
+            entry = f.read(36)
+            if len(entry) == 36:
+                entry_end = entry_start + struct.unpack('>I', entry[:4])[0]
+                fourcc = entry[4:8].decode('latin-1')
+                stream['codec'] = CODEC_NAMES.get(fourcc, fourcc.strip())
+                if kind == 'video':
+                    stream['width'], stream['height'] = struct.unpack('>HH', entry[32:36])
+                    avcc = _child(f, entry_start + 86, entry_end, b'avcC')
+                    if avcc:
+                        stream.update(_avc_params(f, avcc))
+                else:
+                    stream['channels'] = struct.unpack('>H', entry[24:26])[0]
+                    stream['sample_rate'] = struct.unpack('>H', entry[32:34])[0]
+
+        mdhd = _child(f, *mdia, b'mdhd')
+        if kind == 'video' and mdhd and stbl:
+            version, _ = _full_box(f, mdhd[0], '')
+            timescale = _full_box(f, mdhd[0], '>QQI' if version == 1 else '>III')[1][2]
+            stream['time_base'] = f"1/{timescale}"
+            stts = _table(f, _child(f, *stbl, b'stts'), '>II')
+            if stts and stts[0][1]:
+                gcd = math.gcd(timescale, stts[0][1])
+                stream['r_frame_rate'] = f"{timescale // gcd}/{stts[0][1] // gcd}"
+            keyframes = _keyframe_times(f, stbl, _child(f, trak_start, trak_end, b'edts'), timescale,
+                                        movie_timescale)
+            if keyframes is not None:
+                stream['keyframes'] = keyframes
+        streams.append(stream)
+
+    return {
+        'duration': duration,
+        'container': 'mp4',
+        'bit_rate': int(size * 8 / duration) if duration else None,
+        'streams': streams,
+    }
+
+
+_NATIVE = {'.wav': _probe_wav, '.mp3': _probe_mp3, '.mp4': _probe_mp4, '.m4a': _probe_mp4, '.mov': _probe_mp4}
+
+
+def _probe_ffprobe(path: Path) -> dict:
+    cmd = ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", str(path)]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise MediaError(result.stderr.strip()[:300] or f"ffprobe exited with {result.returncode}")
+    data = json.loads(result.stdout or "{}")
+    fmt = data.get('format', {})
+
+    streams = []
+    for s in data.get('streams', []):
+        if s.get('codec_type') not in ('video', 'audio'):
+            continue
+        stream = {'type': s['codec_type'], 'codec': s.get('codec_name')}
+        for key in ('width', 'height', 'channels', 'pix_fmt', 'profile', 'level', 'time_base', 'r_frame_rate'):
+            if key in s:
+                stream[key] = s[key]
+        if 'sample_rate' in s:
+            stream['sample_rate'] = int(s['sample_rate'])
+        streams.append(stream)
+
+    duration = fmt.get('duration')
+    return {
+        'duration': float(duration) if duration not in (None, 'N/A') else None,
+        'container': CONTAINER_NAMES.get(fmt.get('format_name'), fmt.get('format_name')),
+        'bit_rate': int(fmt['bit_rate']) if fmt.get('bit_rate', 'N/A') != 'N/A' else None,
+        'streams': streams,
+    }
+
+
+def probe(path: Path, stat: Optional[os.stat_result] = None) -> MediaInfo:
+    """Probe one file, uncached"""
+    path = Path(path)
+    stat = stat or path.stat()
+    info = MediaInfo(str(path), stat.st_size, stat.st_mtime_ns)
+
+    native = _NATIVE.get(path.suffix.lower())
+    native_error = None
+    if native:
+        try:
+            with open(path, 'rb') as f:
+                fields = native(f, stat.st_size)
+            info.__dict__.update(fields, probed_by=path.suffix.lower().lstrip('.').replace('m4a', 'mp4')
+                                 .replace('mov', 'mp4'))
+            return info
+        except MediaError as e:
+            info.error, info.probed_by = str(e), 'native'
+            return info
+        except (_Unsupported, struct.error, IndexError, ValueError) as e:
+            native_error = str(e) or type(e).__name__
+
+    try:
+        info.__dict__.update(_probe_ffprobe(path), probed_by='ffprobe')
+    except FileNotFoundError:
+        info.error = f"ffprobe not installed ({native_error})" if native_error else "ffprobe not installed"
+    except (MediaError, ValueError) as e:
+        info.error, info.probed_by = str(e), 'ffprobe'
+    return info
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class MediaInfoCache:
+    _shared = None
+
+    @classmethod
+    def shared(cls) -> "MediaInfoCache":
+        """Process-wide cache (saved at exit)"""
+        if cls._shared is None:
+            cls._shared = cls()
+            atexit.register(cls._shared.save)
+        return cls._shared
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or os.environ.get('PHAZUR_MEDIA_INFO_CACHE', DEFAULT_CACHE))
+        self._entries: Optional[Dict[str, dict]] = None
+        self._changed: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.probes = 0
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return data.get('files', {}) if data.get('version') == CACHE_VERSION else {}
+
+    def info(self, path: Path) -> MediaInfo:
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return MediaInfo(str(path), 0, 0, error="missing")
+        key = str(path.resolve())
+
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            cached = self._entries.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            self.hits += 1
+            return MediaInfo(**dict(cached, path=str(path)))
+
+        info = probe(path, stat)
+        self.probes += 1
+        with self._lock:
+            self._entries[key] = self._changed[key] = asdict(info)
+        return info
+
+    def save(self):
+        """Merge this process's probes into the cache file (atomically, under a lock)"""
+        with self._lock:
+            if not self._changed:
+                return
+            changed, self._changed = self._changed, {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix('.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self._read()
+            entries.update(changed)
+            # Generators probe short-lived temp files too; don't keep entries for deleted ones
+            entries = {key: entry for key, entry in entries.items() if os.path.exists(key)}
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'files': entries}))
+            os.replace(tmp_path, self.path)
+
+
+def media_info(path: Path) -> MediaInfo:
+    return MediaInfoCache.shared().info(path)
+
+
+def media_duration(path: Path) -> float:
+    """Duration in seconds; raises MediaError if it can't be determined"""
+    info = media_info(path)
+    if info.duration is None:
+        raise MediaError(f"{Path(path).name}: {info.error or 'no duration'}")
+    return info.duration
+
+
+def validate_media(path: Path, min_seconds: float = MIN_SECONDS, video: bool = True,
+                   audio: bool = False) -> Optional[str]:
+    """What is wrong with a rendered file, or None if it is a usable video/audio file"""
+    info = media_info(path)
+    if info.error:
+        return info.error
+    if info.duration is None or info.duration < min_seconds:
+        return f"too short ({info.duration or 0:.1f}s)"
+    if video and not info.has_video:
+        return "no video stream"
+    if audio and not info.has_audio:
+        return "no audio stream"
+    return None
+
+
+def validate_tree(paths: Iterable[Path], workers: int = 8, **checks) -> Dict[Path, Optional[str]]:
+    """validate_media() for every media file under the given files / directories"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob('*') if p.suffix.lower() in MEDIA_SUFFIXES))
+        else:
+            files.append(path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        problems = dict(zip(files, pool.map(lambda p: validate_media(p, **checks), files)))
+    MediaInfoCache.shared().save()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate rendered lesson media')
+    parser.add_argument('paths', nargs='*', type=Path, default=[DEFAULT_TREE],
+                        help='Files or directories (default: public/videos/lessons)')
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS, help='Shortest acceptable duration')
+    parser.add_argument('--require-audio', action='store_true', help='Fail files without an audio stream')
+    parser.add_argument('--audio-only', action='store_true', help="Don't require a video stream")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = validate_tree(args.paths, min_seconds=args.min_seconds, video=not args.audio_only,
+                            audio=args.require_audio)
+    cache = MediaInfoCache.shared()
+    probed, cached = cache.probes, cache.hits
+    problems = {path: reason for path, reason in results.items() if reason}
+    seconds = sum(media_info(path).duration or 0 for path in results if path not in problems)
+
+    for path, reason in problems.items():
+        print(f"❌ {path}: {reason}")
+    print(f"\n✅ {len(results) - len(problems)} OK | ❌ {len(problems)} problems | "
+          f"{seconds / 60:.1f} min of media")
+    print(f"⏱  {time.perf_counter() - start:.2f}s ({probed} probed, {cached} cached)")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
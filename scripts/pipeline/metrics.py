@@ -0,0 +1,392 @@
+"""
+Phazur Labs Academy - Pipeline Metrics
+Per-lesson, per-stage measurements written as JSONL, and a report over them
+
+Every measured stage appends one line to the metrics file:
+    run, generator, lesson, stage, status
+    wall          seconds the stage took
+    cpu           CPU seconds of the stage's own thread plus processes it tracks
+                  (e.g. the SadTalker worker)
+    process_cpu   CPU seconds of this whole process over the stage (includes model
+                  thread pools, but also any stage running alongside it)
+    child_cpu     CPU seconds of subprocesses (ffmpeg) reaped during the stage
+    peak_rss_mb   peak resident memory of this process plus tracked processes,
+                  sampled while the stage runs
+    bytes_in/out  sizes of the files the stage read and wrote
+    ffmpeg        fps / speed / frames from each ffmpeg step's progress output
+    api           per endpoint: calls, total and max latency, errors
+
+Code deep inside a stage reports through current_stage(), which is a no-op
+outside a measured stage, so helpers don't need a metrics parameter.
+
+Report (stage totals, shares of wall time, and regressions against a baseline run):
+    python scripts/pipeline/metrics.py
+    python scripts/pipeline/metrics.py --run all --generator custom-video
+    python scripts/pipeline/metrics.py --baseline 20260101-120000-4242
+
+Configuration (environment):
+    PHAZUR_METRICS_FILE   Metrics location (default: temp/metrics/pipeline-metrics.jsonl)
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_METRICS_FILE = PROJECT_ROOT / "temp" / "metrics" / "pipeline-metrics.jsonl"
+SAMPLE_INTERVAL = 0.5
+
+_FFMPEG_PROGRESS = re.compile(r'frame=\s*(\d+)\s+fps=\s*([\d.]+).*?speed=\s*([\d.]+)x')
+_local = threading.local()
+
+
+def parse_ffmpeg_progress(stderr) -> Optional[dict]:
+    """frames / fps / speed from the last progress line ffmpeg printed"""
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode('utf-8', errors='replace')
+    matches = _FFMPEG_PROGRESS.findall(stderr or '')
+    if not matches:
+        return None
+    frames, fps, speed = matches[-1]
+    return {'frames': int(frames), 'fps': float(fps), 'speed': float(speed)}
+
+
+def rss_bytes(pid='self') -> Optional[int]:
+    try:
+        pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_cpu_seconds(pid) -> Optional[float]:
+    """utime + stime of another process, from /proc (None where unavailable)"""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_fallback() -> Optional[int]:
+    """Lifetime peak of this process, where /proc isn't available (ru_maxrss is KB on Linux, bytes on macOS)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class StageMetrics:
+    def __init__(self, lesson_id: str, stage: str):
+        self.lesson_id = lesson_id
+        self.stage = stage
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.ffmpeg_steps: List[dict] = []
+        self.api: Dict[str, dict] = {}
+        self.peak_rss = 0
+        self._tracked = {}
+        self._lock = threading.Lock()
+
+    def add_bytes(self, bytes_in: int = 0, bytes_out: int = 0):
+        with self._lock:
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def api_call(self, name: str, seconds: float, ok: bool = True):
+        with self._lock:
+            entry = self.api.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max': 0.0, 'errors': 0})
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            entry['errors'] += not ok
+
+    def ffmpeg(self, step: str, stderr):
+        progress = parse_ffmpeg_progress(stderr)
+        if progress:
+            with self._lock:
+                self.ffmpeg_steps.append(dict(progress, step=step))
+
+    def track_process(self, pid: int):
+        """Count another process's CPU time and memory toward this stage"""
+        if pid is None:
+            return
+        self._tracked.setdefault(pid, process_cpu_seconds(pid))
+
+    def tracked_cpu(self) -> float:
+        total = 0.0
+        for pid, start in self._tracked.items():
+            now = process_cpu_seconds(pid)
+            if start is not None and now is not None:
+                total += now - start
+        return total
+
+    def sample(self):
+        rss = rss_bytes()
+        if rss is None:
+            rss = _peak_rss_fallback() or 0
+        rss += sum(rss_bytes(pid) or 0 for pid in list(self._tracked))
+        self.peak_rss = max(self.peak_rss, rss)
+
+
+class _NullStage(StageMetrics):
+    """Stand-in returned by current_stage() outside a measured stage"""
+
+    def __init__(self):
+        super().__init__('', '')
+
+    def add_bytes(self, bytes_in: int = 0, bytes_out: int = 0):
+        pass
+
+    def api_call(self, name: str, seconds: float, ok: bool = True):
+        pass
+
+    def ffmpeg(self, step: str, stderr):
+        pass
+
+    def track_process(self, pid: int):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def current_stage() -> StageMetrics:
+    """Metrics of the stage running on this thread (a no-op stand-in if none)"""
+    return getattr(_local, 'stage', None) or _NULL_STAGE
+
+
+def _file_size(value) -> int:
+    try:
+        return value.stat().st_size if isinstance(value, Path) and value.is_file() else 0
+    except OSError:
+        return 0
+
+
+class MetricsRecorder:
+    def __init__(self, generator: str, path: Optional[Path] = None, run_id: Optional[str] = None,
+                 sample_interval: float = SAMPLE_INTERVAL):
+        self.generator = generator
+        self.path = Path(path or os.environ.get('PHAZUR_METRICS_FILE', DEFAULT_METRICS_FILE))
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.sample_interval = sample_interval
+        self.records: List[dict] = []
+        self._active = set()
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.sample_interval)
+            for metrics in list(self._active):
+                metrics.sample()
+
+    @contextmanager
+    def stage(self, lesson_id: str, stage: str, inputs=(), outputs=()) -> Iterator[StageMetrics]:
+        """Measure the enclosed block as one stage of one lesson.
+
+        inputs / outputs are paths whose sizes count as bytes in / out (outputs are
+        sized after the block, so they may not exist yet when it starts).
+        """
+        metrics = StageMetrics(lesson_id, stage)
+        metrics.add_bytes(bytes_in=sum(_file_size(Path(p)) for p in inputs))
+        previous, _local.stage = getattr(_local, 'stage', None), metrics
+        with self._lock:
+            self._active.add(metrics)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, daemon=True, name="metrics-sampler")
+                self._sampler.start()
+
+        metrics.sample()
+        wall, cpu, process_cpu, child_cpu = time.perf_counter(), time.thread_time(), time.process_time(), _children_cpu()
+        error = None
+        try:
+            yield metrics
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            metrics.sample()
+            with self._lock:
+                self._active.discard(metrics)
+            _local.stage = previous
+            metrics.add_bytes(bytes_out=sum(_file_size(Path(p)) for p in outputs))
+            self._write({
+                'lesson': lesson_id,
+                'stage': stage,
+                # Exceptions that aren't failures (e.g. LessonSkipped) carry their own metrics_status
+                'status': getattr(error, 'metrics_status', 'failed') if error else 'ok',
+                'error': type(error).__name__ if error else None,
+                'wall': time.perf_counter() - wall,
+                'cpu': time.thread_time() - cpu + metrics.tracked_cpu(),
+                'process_cpu': time.process_time() - process_cpu,
+                'child_cpu': _children_cpu() - child_cpu,
+                'peak_rss_mb': metrics.peak_rss / (1024 * 1024),
+                'bytes_in': metrics.bytes_in,
+                'bytes_out': metrics.bytes_out,
+                'ffmpeg': metrics.ffmpeg_steps,
+                'api': metrics.api,
+            })
+
+    def record(self, lesson_id: str, stage: str, wall: float, status: str = 'ok', **fields):
+        """Record a stage measured elsewhere (e.g. time spent waiting on a provider)"""
+        self._write(dict({'lesson': lesson_id, 'stage': stage, 'status': status, 'wall': wall}, **fields))
+
+    def _write(self, record: dict):
+        record = dict({'run': self.run_id, 'generator': self.generator, 'at': time.time()}, **record)
+        with self._lock:
+            self.records.append(record)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def summary(self) -> str:
+        """Share of measured stage time per stage this run, e.g. 'narrate 21% | render 68% | brand 9%'"""
+        totals = {}
+        for record in self.records:
+            totals[record['stage']] = totals.get(record['stage'], 0.0) + record['wall']
+        overall = sum(totals.values()) or 1e-9
+        return " | ".join(f"{stage} {seconds / overall:.0%}" for stage, seconds in totals.items())
+
+
+def load_records(path: Optional[Path] = None) -> List[dict]:
+    path = Path(path or os.environ.get('PHAZUR_METRICS_FILE', DEFAULT_METRICS_FILE))
+    records = []
+    try:
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return records
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def aggregate(records: List[dict]) -> Dict[tuple, dict]:
+    """Totals per (generator, stage)"""
+    groups = {}
+    for record in records:
+        groups.setdefault((record['generator'], record['stage']), []).append(record)
+
+    stages = {}
+    for key, group in groups.items():
+        walls = [r['wall'] for r in group]
+        ffmpeg = [step for r in group for step in r.get('ffmpeg') or []]
+        api = {}
+        for r in group:
+            for name, entry in (r.get('api') or {}).items():
+                total = api.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max': 0.0, 'errors': 0})
+                total['calls'] += entry['calls']
+                total['seconds'] += entry['seconds']
+                total['max'] = max(total['max'], entry['max'])
+                total['errors'] += entry['errors']
+        stages[key] = {
+            'count': len(group),
+            'failed': sum(r['status'] == 'failed' for r in group),
+            'wall': sum(walls),
+            'mean': sum(walls) / len(walls),
+            'p95': _percentile(walls, 0.95),
+            'cpu': sum(r.get('cpu', 0.0) for r in group),
+            'peak_rss_mb': max((r.get('peak_rss_mb', 0.0) for r in group), default=0.0),
+            'bytes_in': sum(r.get('bytes_in', 0) for r in group),
+            'bytes_out': sum(r.get('bytes_out', 0) for r in group),
+            'fps': sum(s['fps'] for s in ffmpeg) / len(ffmpeg) if ffmpeg else None,
+            'speed': sum(s['speed'] for s in ffmpeg) / len(ffmpeg) if ffmpeg else None,
+            'api': api,
+        }
+    return stages
+
+
+def format_report(records: List[dict], baseline: Optional[List[dict]] = None) -> str:
+    stages = aggregate(records)
+    base = aggregate(baseline) if baseline else {}
+    overall = sum(s['wall'] for s in stages.values()) or 1e-9
+    lines = [f"{'generator / stage':<28}{'n':>4}{'fail':>5}{'wall':>9}{'share':>7}{'mean':>8}{'p95':>8}"
+             f"{'cpu':>8}{'rss MB':>8}{'MB in':>8}{'MB out':>8}  notes"]
+
+    for (generator, stage), s in sorted(stages.items(), key=lambda item: -item[1]['wall']):
+        notes = []
+        if s['fps'] is not None:
+            notes.append(f"ffmpeg {s['fps']:.0f} fps {s['speed']:.1f}x")
+        for name, api in s['api'].items():
+            errors = f", {api['errors']} failed" if api['errors'] else ""
+            notes.append(f"{name} {api['calls']}x {api['seconds'] / api['calls'] * 1000:.0f}ms avg "
+                         f"(max {api['max'] * 1000:.0f}ms{errors})")
+        previous = base.get((generator, stage))
+        if previous:
+            change = (s['mean'] - previous['mean']) / (previous['mean'] or 1e-9)
+            notes.append(f"mean {change:+.0%} vs baseline")
+        lines.append(f"{generator + ' / ' + stage:<28}{s['count']:>4}{s['failed']:>5}{s['wall']:>8.1f}s"
+                     f"{s['wall'] / overall:>7.0%}{s['mean']:>7.1f}s{s['p95']:>7.1f}s{s['cpu']:>7.1f}s"
+                     f"{s['peak_rss_mb']:>8.0f}{s['bytes_in'] / 1e6:>8.1f}{s['bytes_out'] / 1e6:>8.1f}"
+                     f"  {'; '.join(notes)}")
+    return "\n".join(lines)
+
+
+def _select(records: List[dict], run: str, generator: Optional[str]) -> List[dict]:
+    if generator:
+        records = [r for r in records if r['generator'] == generator]
+    if run == 'last' and records:
+        run = records[-1]['run']
+    if run != 'all':
+        records = [r for r in records if r['run'] == run]
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report per-stage pipeline metrics')
+    parser.add_argument('--file', type=Path, help='Metrics file (default: PHAZUR_METRICS_FILE or temp/metrics)')
+    parser.add_argument('--run', default='last', help="Run ID, 'last' (default) or 'all'")
+    parser.add_argument('--generator', help='Only this generator (e.g. custom-video, veo, realistic-videos)')
+    parser.add_argument('--baseline', help='Run ID to compare mean stage times against')
+    parser.add_argument('--runs', action='store_true', help='List recorded runs')
+    args = parser.parse_args()
+
+    records = load_records(args.file)
+    if not records:
+        print("No metrics recorded yet")
+        return
+
+    if args.runs:
+        runs = {}
+        for r in records:
+            runs.setdefault(r['run'], set()).add(r['generator'])
+        for run, generators in runs.items():
+            print(f"  {run}  {', '.join(sorted(generators))}")
+        return
+
+    selected = _select(records, args.run, args.generator)
+    baseline = _select(records, args.baseline, args.generator) if args.baseline else None
+    print(f"📈 Run: {args.run if args.run != 'last' else selected[0]['run']} "
+          f"({len({r['lesson'] for r in selected})} lessons, {len(selected)} stage records)")
+    print(format_report(selected, baseline))
+
+
+if __name__ == "__main__":
+    main()
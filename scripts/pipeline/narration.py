@@ -0,0 +1,148 @@
+"""
+Phazur Labs Academy - Chunked Narration
+Splits lesson scripts on paragraph/sentence boundaries and synthesizes them per chunk
+
+Each chunk is synthesized (and cached) independently, so a failed request only
+retries that chunk and editing one paragraph only re-synthesizes that paragraph.
+Chunks are stitched with FFmpeg's concat demuxer and loudness-normalized in the
+single final encode.
+"""
+
+import re
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tts_cache import AudioCache, coqui_engine_id, file_digest
+from tts_batch import EdgeTTSBatch, TTSJob
+
+DEFAULT_MAX_CHARS = 400
+XTTS_MAX_CHARS = 250     # XTTS truncates English input past this
+LOUDNORM_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_script(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[str]:
+    """Split narration into chunks of whole sentences, never crossing a paragraph"""
+    chunks = []
+    for paragraph in re.split(r'\n\s*\n', text.strip()):
+        paragraph = ' '.join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            chunks.append(paragraph)
+            continue
+
+        current = ''
+        for sentence in _SENTENCE_END.split(paragraph):
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class ChunkedNarration:
+    def __init__(self, work_dir: Path, audio_cache: Optional[AudioCache] = None,
+                 ffmpeg: str = "ffmpeg", max_chars: int = DEFAULT_MAX_CHARS):
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.audio_cache = audio_cache
+        self.ffmpeg = ffmpeg
+        self.max_chars = max_chars
+
+    def _chunk_path(self, text: str, voice: str, suffix: str) -> Path:
+        digest = hashlib.sha256(f"{voice}\n{text}".encode('utf-8')).hexdigest()[:20]
+        return self.work_dir / f"chunk-{digest}{suffix}"
+
+    def stitch(self, chunk_paths: List[Path], output_path: Path) -> bool:
+        """Concatenate chunks in order with one loudness-normalizing encode"""
+        list_file = output_path.with_name(f"{output_path.stem}.concat.txt")
+        list_file.write_text(''.join(f"file '{p.resolve()}'\n" for p in chunk_paths))
+
+        cmd = [
+            self.ffmpeg, "-y",
+            "-f", "concat", "-safe", "0",
+            "-i", str(list_file),
+            "-af", LOUDNORM_FILTER,
+            "-ar", "24000",
+            str(output_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        list_file.unlink(missing_ok=True)
+
+        if result.returncode != 0 or not output_path.exists():
+            print(f"  ❌ Audio stitching failed: {result.stderr[-300:]}")
+            return False
+        return True
+
+    async def synthesize_edge(self, items: List[Tuple[str, str, str, Path]],
+                              concurrency: int = 4) -> Dict[str, bool]:
+        """Synthesize (job_id, text, voice, output_path) items with Edge TTS.
+
+        Chunks from every item are fanned out in a single batch, then each
+        item's chunks are stitched into its output file.
+        """
+        plans = {}
+        chunk_jobs = {}
+        for job_id, text, voice, output_path in items:
+            paths = []
+            for chunk in split_script(text, self.max_chars):
+                path = self._chunk_path(chunk, voice, '.mp3')
+                chunk_jobs.setdefault(path, TTSJob(f"{job_id}#{len(paths) + 1}", chunk, voice, path))
+                paths.append(path)
+            plans[job_id] = (paths, output_path)
+
+        batch = EdgeTTSBatch(concurrency=concurrency, audio_cache=self.audio_cache)
+        try:
+            chunk_results = await batch.run(list(chunk_jobs.values()))
+            chunk_ok = {job.output_path: chunk_results[job.job_id] for job in chunk_jobs.values()}
+
+            results = {}
+            for job_id, (paths, output_path) in plans.items():
+                results[job_id] = bool(paths) and all(chunk_ok[p] for p in paths) and self.stitch(paths, output_path)
+        finally:
+            for path in chunk_jobs:
+                path.unlink(missing_ok=True)
+        return results
+
+    def synthesize_xtts(self, engine, text: str, output_path: Path, speaker_wav: Path,
+                        language: str = "en") -> Optional[Dict[str, float]]:
+        """Synthesize text chunk by chunk through one loaded XTTS engine.
+
+        Returns the summed timing breakdown, or None if stitching failed.
+        """
+        voice = f"clone:{file_digest(speaker_wav)}"
+        engine_id = coqui_engine_id(engine.model_name)
+        totals = {'load': 0.0, 'speaker': 0.0, 'synthesis': 0.0}
+        cached = 0
+
+        # A single sentence longer than the limit stays one chunk; the engine splits it further
+        paths = []
+        try:
+            for chunk in split_script(text, min(self.max_chars, XTTS_MAX_CHARS)):
+                path = self._chunk_path(chunk, voice, '.wav')
+                paths.append(path)   # before synthesizing, so a partial file is cleaned up too
+                cache_key = self.audio_cache.key(chunk, voice, engine_id) if self.audio_cache else None
+                if cache_key and self.audio_cache.fetch(cache_key, path):
+                    cached += 1
+                else:
+                    timings = engine.synthesize(chunk, path, speaker_wav=speaker_wav, language=language)
+                    for stage, seconds in timings.items():
+                        totals[stage] += seconds
+                    if cache_key:
+                        self.audio_cache.put(cache_key, path)
+
+            if cached:
+                print(f"  ♻️  {cached}/{len(paths)} chunks reused from cache")
+
+            ok = bool(paths) and self.stitch(paths, output_path)
+        finally:
+            for path in paths:
+                path.unlink(missing_ok=True)
+        return totals if ok else None
@@ -0,0 +1,93 @@
+"""
+Phazur Labs Academy - Prompt Store
+Content-addressed record of every Veo prompt a video was built from
+
+Prompts are keyed by the same hash the build manifest stores for a lesson's
+'prompt' input, so when the manifest reports "prompt changed" the old and new
+text can both be looked up and compared. The store is an append-only JSON-lines
+file; a prompt is written once no matter how many lessons or runs use it.
+
+Look up / compare:
+    python scripts/pipeline/prompt_store.py 3f2a9c0d1e4b5a67
+    python scripts/pipeline/prompt_store.py 3f2a9c0d1e4b5a67 9bc1d2e3f4a5b6c7
+
+Configuration (environment):
+    PHAZUR_PROMPT_STORE   Store location (default: temp/veo-prompt-store.jsonl)
+"""
+
+import os
+import sys
+import json
+import difflib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from build_manifest import input_hash
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_PROMPT_STORE = PROJECT_ROOT / "temp" / "veo-prompt-store.jsonl"
+
+
+class PromptStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or os.environ.get('PHAZUR_PROMPT_STORE', DEFAULT_PROMPT_STORE))
+        self._prompts: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        """Hash of a prompt, as recorded in the build manifest"""
+        return input_hash(prompt)
+
+    def _load(self) -> Dict[str, str]:
+        if self._prompts is None:
+            self._prompts = {}
+            try:
+                lines = self.path.read_text().splitlines()
+            except FileNotFoundError:
+                lines = []
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write
+                self._prompts[record['key']] = record['prompt']
+        return self._prompts
+
+    def put(self, prompt: str) -> str:
+        """Store a prompt (once) and return its key"""
+        key = self.key(prompt)
+        with self._lock:
+            prompts = self._load()
+            if key not in prompts:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps({'key': key, 'prompt': prompt}, ensure_ascii=False) + '\n')
+                prompts[key] = prompt
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key)
+
+    def diff(self, old_key: str, new_key: str) -> Optional[str]:
+        """Unified diff between two stored prompts (None if either is unknown)"""
+        old, new = self.get(old_key), self.get(new_key)
+        if old is None or new is None:
+            return None
+        return "\n".join(difflib.unified_diff(old.splitlines(), new.splitlines(), old_key, new_key, lineterm=''))
+
+
+def main():
+    store = PromptStore()
+    keys = sys.argv[1:]
+    if len(keys) not in (1, 2):
+        print(__doc__)
+        return
+    result = store.get(keys[0]) if len(keys) == 1 else store.diff(*keys)
+    print(result if result is not None else f"Unknown prompt key in {store.path}")
+
+
+if __name__ == "__main__":
+    main()
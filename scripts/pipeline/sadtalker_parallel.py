@@ -0,0 +1,150 @@
+"""
+Phazur Labs Academy - Parallel SadTalker Rendering
+Splits lesson audio at silences and renders the segments on a pool of SadTalker workers
+
+A CPU-only SadTalker run uses a fraction of a multi-core machine. This splits the
+narration at pauses near evenly spaced points, renders each segment on its own
+worker process (each capped to a share of the cores so they don't oversubscribe),
+then joins the clips and lays the original, unsplit audio back over them.
+
+Segments are rendered in still mode from the same source image and pose style,
+so every clip starts and ends on the source image's head pose and the seams match.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from sadtalker_worker import SadTalkerWorker, SadTalkerWorkerError
+from media_info import media_duration
+
+MIN_SEGMENT_SECONDS = 20.0
+SILENCE_FILTER = "silencedetect=noise=-35dB:d=0.3"
+
+
+def probe_duration(media_path: Path) -> float:
+    return media_duration(media_path)
+
+
+def find_silences(audio_path: Path, ffmpeg: str = "ffmpeg") -> List[Tuple[float, float]]:
+    """(start, end) of each pause detected in the audio"""
+    cmd = [ffmpeg, "-hide_banner", "-i", str(audio_path), "-af", SILENCE_FILTER, "-f", "null", "-"]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    starts = [float(v) for v in re.findall(r"silence_start: ([\d.]+)", result.stderr)]
+    ends = [float(v) for v in re.findall(r"silence_end: ([\d.]+)", result.stderr)]
+    return list(zip(starts, ends))
+
+
+def plan_segments(duration: float, silences: List[Tuple[float, float]], segments: int,
+                  min_seconds: float = MIN_SEGMENT_SECONDS) -> List[Tuple[float, float]]:
+    """Cut points at the pause nearest each even division of the audio"""
+    segments = max(1, min(segments, int(duration // min_seconds)))
+    midpoints = [(start + end) / 2 for start, end in silences]
+
+    cuts = []
+    for i in range(1, segments):
+        target = duration * i / segments
+        previous = cuts[-1] if cuts else 0.0
+        candidates = [m for m in midpoints if m - previous >= min_seconds / 2 and duration - m >= min_seconds / 2]
+        if candidates:
+            cut = min(candidates, key=lambda m: abs(m - target))
+            if cut > previous:
+                cuts.append(cut)
+
+    bounds = [0.0] + cuts + [duration]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class ParallelSadTalker:
+    def __init__(self, sadtalker_dir: Path, work_dir: Path, workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, ffmpeg: str = "ffmpeg", cpu: bool = True):
+        cores = os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or max(1, min(4, cores // 2))
+        self.workers = workers or max(1, cores // self.threads_per_worker)
+        self.sadtalker_dir = Path(sadtalker_dir)
+        self.work_dir = Path(work_dir)
+        self.ffmpeg = ffmpeg
+        self.cpu = cpu
+        self._pool = []
+
+    def _worker(self, index: int) -> SadTalkerWorker:
+        while len(self._pool) <= index:
+            threads = str(self.threads_per_worker)
+            env = dict(os.environ, OMP_NUM_THREADS=threads, MKL_NUM_THREADS=threads,
+                       OPENBLAS_NUM_THREADS=threads, NUMEXPR_NUM_THREADS=threads)
+            log_path = self.work_dir / f"sadtalker-worker-{len(self._pool)}.log"
+            self._pool.append(SadTalkerWorker(self.sadtalker_dir, cpu=self.cpu, log_path=log_path, env=env))
+        return self._pool[index]
+
+    def _split(self, audio_path: Path, bounds: List[Tuple[float, float]], segment_dir: Path) -> List[Path]:
+        paths = []
+        for i, (start, end) in enumerate(bounds):
+            path = segment_dir / f"segment-{i:03d}.wav"
+            cmd = [
+                self.ffmpeg, "-y", "-i", str(audio_path),
+                "-ss", f"{start:.3f}", "-to", f"{end:.3f}",
+                "-ar", "16000", "-ac", "1",
+                str(path)
+            ]
+            subprocess.run(cmd, check=True, capture_output=True)
+            paths.append(path)
+        return paths
+
+    def _join(self, clips: List[Path], audio_path: Path, output_path: Path, segment_dir: Path):
+        concat_list = segment_dir / "concat.txt"
+        concat_list.write_text(''.join(f"file '{clip.resolve()}'\n" for clip in clips))
+        cmd = [
+            self.ffmpeg, "-y",
+            "-f", "concat", "-safe", "0", "-i", str(concat_list),
+            "-i", str(audio_path),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy",
+            "-c:a", "aac", "-b:a", "192k",
+            "-shortest",
+            str(output_path)
+        ]
+        subprocess.run(cmd, check=True, capture_output=True)
+
+    def render(self, audio_path: Path, source_image: Path, output_path: Path, size: int = 256,
+               preprocess: str = "full", enhancer: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Render audio_path as one talking head video using every worker in the pool"""
+        duration = probe_duration(audio_path)
+        bounds = plan_segments(duration, find_silences(audio_path, self.ffmpeg), self.workers)
+
+        segment_dir = self.work_dir / f"{output_path.stem}_segments"
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        segment_dir.mkdir(parents=True)
+
+        print(f"  🧩 {len(bounds)} segments on {min(len(bounds), self.workers)} workers "
+              f"x {self.threads_per_worker} threads ({duration:.0f}s audio)")
+
+        try:
+            segments = self._split(audio_path, bounds, segment_dir)
+            workers = [self._worker(i) for i in range(min(len(segments), self.workers))]
+
+            def render_segment(index: int) -> Path:
+                worker = workers[index % len(workers)]
+                return worker.render(segments[index], source_image, segment_dir, size=size,
+                                     preprocess=preprocess, still=True, enhancer=enhancer, timeout=timeout)
+
+            # Each thread drives its own worker process, so the rendering itself runs in parallel
+            with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+                clips = list(pool.map(render_segment, range(len(segments))))
+
+            self._join(clips, audio_path, output_path, segment_dir)
+            return output_path.exists()
+
+        except (SadTalkerWorkerError, subprocess.CalledProcessError) as e:
+            print(f"  ❌ Parallel render failed: {e}")
+            return False
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+
+    def close(self):
+        for worker in self._pool:
+            worker.close()
+        self._pool = []
@@ -0,0 +1,346 @@
+"""
+Phazur Labs Academy - SadTalker Inference Worker
+Long-running SadTalker process that loads the checkpoints once and renders many jobs
+
+The worker speaks a JSON-lines protocol over stdin/stdout: one request object
+per line in, one response object per line out. Models are loaded on the first
+job for each (size, preprocess) combination and kept for the life of the
+process, so each lesson only pays for the actual inference.
+
+Face preprocessing (detection, crop, landmarks, 3DMM coefficients) is cached on
+disk per avatar content hash, preprocess mode and size, so it runs once per
+instructor photo rather than once per lesson. Changing the photo changes the
+hash, which invalidates the entry.
+
+Server (started automatically by SadTalkerWorker):
+    python scripts/pipeline/sadtalker_worker.py --serve --sadtalker-dir tools/SadTalker [--cpu]
+
+Client:
+    worker = SadTalkerWorker.shared(sadtalker_dir, cpu=True)
+    video = worker.render(audio_path, avatar_path, result_dir, size=256, preprocess="crop")
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import shutil
+import argparse
+import selectors
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_SADTALKER_DIR = PROJECT_ROOT / "tools" / "SadTalker"
+DEFAULT_LOG = PROJECT_ROOT / "temp" / "video-gen" / "sadtalker-worker.log"
+DEFAULT_PREPROCESS_CACHE = PROJECT_ROOT / "temp" / "sadtalker-preprocess"
+
+
+class SadTalkerWorkerError(Exception):
+    pass
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class SadTalkerWorker:
+    _shared = {}
+
+    @classmethod
+    def shared(cls, sadtalker_dir: Path = DEFAULT_SADTALKER_DIR, cpu: bool = False) -> "SadTalkerWorker":
+        """Process-wide worker for a SadTalker checkout (started on first render)"""
+        key = (str(Path(sadtalker_dir).resolve()), cpu)
+        if key not in cls._shared:
+            cls._shared[key] = cls(sadtalker_dir, cpu=cpu)
+        return cls._shared[key]
+
+    def __init__(self, sadtalker_dir: Path = DEFAULT_SADTALKER_DIR, cpu: bool = False,
+                 log_path: Path = DEFAULT_LOG, env: Optional[dict] = None,
+                 preprocess_cache: Optional[Path] = DEFAULT_PREPROCESS_CACHE):
+        self.sadtalker_dir = Path(sadtalker_dir).resolve()
+        self.cpu = cpu
+        self.log_path = Path(log_path)
+        self.preprocess_cache = preprocess_cache
+        self.env = env
+        self._proc = None
+        self._log = None
+        self._next_id = 1
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._proc.pid if self.running else None
+
+    def start(self, timeout: int = 120):
+        """Spawn the worker process and wait for its ready message"""
+        if self.running:
+            return
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.log_path, 'a')
+
+        env = dict(self.env or os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(self.sadtalker_dir), env.get("PYTHONPATH")]))
+
+        cmd = [sys.executable, str(Path(__file__).resolve()), "--serve",
+               "--sadtalker-dir", str(self.sadtalker_dir)]
+        if self.cpu:
+            cmd.append("--cpu")
+        if self.preprocess_cache:
+            cmd.extend(["--preprocess-cache", str(Path(self.preprocess_cache).resolve())])
+
+        self._proc = subprocess.Popen(
+            cmd,
+            cwd=str(self.sadtalker_dir),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._log,
+            text=True,
+            bufsize=1,
+            env=env
+        )
+        atexit.register(self.close)
+
+        message = self._read(timeout)
+        if not message.get("ready"):
+            raise SadTalkerWorkerError(f"Worker failed to start: {message.get('error', message)}")
+
+    def _read(self, timeout: Optional[float]) -> dict:
+        selector = selectors.DefaultSelector()
+        selector.register(self._proc.stdout, selectors.EVENT_READ)
+        try:
+            if not selector.select(timeout):
+                self.close(kill=True)
+                raise SadTalkerWorkerError(f"Worker timed out after {timeout}s (log: {self.log_path})")
+        finally:
+            selector.close()
+
+        line = self._proc.stdout.readline()
+        if not line:
+            code = self._proc.poll()
+            self._proc = None
+            raise SadTalkerWorkerError(f"Worker exited (code {code}), see {self.log_path}")
+        return json.loads(line)
+
+    def request(self, op: str, timeout: Optional[float] = None, **params) -> dict:
+        """Send one request and wait for its response"""
+        self.start()
+        request_id = self._next_id
+        self._next_id += 1
+
+        self._proc.stdin.write(json.dumps({"id": request_id, "op": op, **params}) + "\n")
+        self._proc.stdin.flush()
+
+        response = self._read(timeout)
+        if response.get("id") != request_id:
+            raise SadTalkerWorkerError(f"Out-of-order response: {response}")
+        if not response.get("ok"):
+            raise SadTalkerWorkerError(response.get("error", "Unknown worker error"))
+        return response
+
+    def render(self, audio_path: Path, source_image: Path, result_dir: Path, size: int = 256,
+               preprocess: str = "crop", still: bool = False, enhancer: Optional[str] = None,
+               batch_size: int = 2, timeout: Optional[float] = None) -> Path:
+        """Render a talking head video and return the path of the produced mp4"""
+        response = self.request(
+            "render",
+            timeout=timeout,
+            driven_audio=str(Path(audio_path).resolve()),
+            source_image=str(Path(source_image).resolve()),
+            result_dir=str(Path(result_dir).resolve()),
+            size=size,
+            preprocess=preprocess,
+            still=still,
+            enhancer=enhancer,
+            batch_size=batch_size,
+        )
+        return Path(response["video"])
+
+    def close(self, kill: bool = False):
+        if self._proc is not None:
+            if kill:
+                self._proc.kill()
+            else:
+                try:
+                    self._proc.stdin.close()
+                    self._proc.wait(timeout=30)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._proc.kill()
+            self._proc = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+# ============================================================================
+# SERVER (runs inside the SadTalker checkout)
+# ============================================================================
+
+class _InferenceServer:
+    def __init__(self, sadtalker_dir: Path, cpu: bool, preprocess_cache: Optional[Path] = None):
+        import torch
+
+        self.sadtalker_dir = sadtalker_dir
+        self.checkpoint_dir = sadtalker_dir / "checkpoints"
+        self.device = "cuda" if torch.cuda.is_available() and not cpu else "cpu"
+        self.preprocess_cache = preprocess_cache
+        self._models = {}
+
+    def models(self, size: int, preprocess: str):
+        """(preprocess, audio2coeff, animate) models for size/preprocess, loaded once"""
+        key = (size, preprocess)
+        if key not in self._models:
+            from src.utils.init_path import init_path
+            from src.utils.preprocess import CropAndExtract
+            from src.test_audio2coeff import Audio2Coeff
+            from src.facerender.animate import AnimateFromCoeff
+
+            start = time.perf_counter()
+            paths = init_path(str(self.checkpoint_dir), str(self.sadtalker_dir / "src" / "config"),
+                              size, False, preprocess)
+            self._models[key] = (
+                CropAndExtract(paths, self.device),
+                Audio2Coeff(paths, self.device),
+                AnimateFromCoeff(paths, self.device),
+            )
+            print(f"[worker] loaded models size={size} preprocess={preprocess} "
+                  f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        return self._models[key]
+
+    def preprocess(self, preprocess_model, source_image: str, first_frame_dir: str, preprocess: str, size: int):
+        """Crop + 3DMM extraction for the source image, reused from the on-disk cache when possible"""
+        if not self.preprocess_cache:
+            return preprocess_model.generate(source_image, first_frame_dir, preprocess,
+                                             source_image_flag=True, pic_size=size)
+
+        from tts_cache import file_digest
+
+        entry = self.preprocess_cache / f"{file_digest(Path(source_image))[:24]}-{preprocess}-{size}"
+        manifest = entry / "preprocess.json"
+        if manifest.exists():
+            cached = json.loads(manifest.read_text())
+            print(f"[worker] preprocess cache hit: {entry.name}", file=sys.stderr)
+            return str(entry / cached["coeff"]), str(entry / cached["crop_pic"]), cached["crop_info"]
+
+        first_coeff_path, crop_pic_path, crop_info = preprocess_model.generate(
+            source_image, first_frame_dir, preprocess, source_image_flag=True, pic_size=size
+        )
+        if first_coeff_path is None:
+            return first_coeff_path, crop_pic_path, crop_info
+
+        # Stage the entry next to its final location, then publish it with one rename
+        staging = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(first_frame_dir, staging)
+        (staging / "preprocess.json").write_text(json.dumps({
+            "source_image": source_image,
+            "coeff": os.path.relpath(first_coeff_path, first_frame_dir),
+            "crop_pic": os.path.relpath(crop_pic_path, first_frame_dir),
+            "crop_info": crop_info,
+        }, default=lambda value: value.tolist() if hasattr(value, "tolist") else float(value)))
+        try:
+            staging.rename(entry)
+        except OSError:
+            # Another worker published the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return first_coeff_path, crop_pic_path, crop_info
+
+    def render(self, job: dict) -> str:
+        from src.generate_batch import get_data
+        from src.generate_facerender_batch import get_facerender_data
+
+        size = int(job.get("size", 256))
+        preprocess = job.get("preprocess", "crop")
+        still = bool(job.get("still", False))
+        batch_size = int(job.get("batch_size", 2))
+        audio_path = job["driven_audio"]
+        source_image = job["source_image"]
+
+        preprocess_model, audio_to_coeff, animate_from_coeff = self.models(size, preprocess)
+
+        save_dir = os.path.join(job["result_dir"], f"{time.strftime('%Y_%m_%d_%H.%M.%S')}_{job['id']}")
+        first_frame_dir = os.path.join(save_dir, "first_frame_dir")
+        os.makedirs(first_frame_dir, exist_ok=True)
+
+        first_coeff_path, crop_pic_path, crop_info = self.preprocess(
+            preprocess_model, source_image, first_frame_dir, preprocess, size
+        )
+        if first_coeff_path is None:
+            raise ValueError("Can't get the coeffs of the input image")
+
+        batch = get_data(first_coeff_path, audio_path, self.device, None, still=still)
+        coeff_path = audio_to_coeff.generate(batch, save_dir, 0, None)
+
+        data = get_facerender_data(coeff_path, crop_pic_path, first_coeff_path, audio_path, batch_size,
+                                   None, None, None, expression_scale=1.0, still_mode=still,
+                                   preprocess=preprocess, size=size)
+        result = animate_from_coeff.generate(data, save_dir, source_image, crop_info,
+                                             enhancer=job.get("enhancer"), background_enhancer=None,
+                                             preprocess=preprocess, img_size=size)
+
+        video_path = save_dir + ".mp4"
+        shutil.move(result, video_path)
+        shutil.rmtree(save_dir, ignore_errors=True)
+        return video_path
+
+
+def serve(sadtalker_dir: Path, cpu: bool, preprocess_cache: Optional[Path] = None):
+    """JSON-lines loop on stdin/stdout. Everything else printed goes to stderr."""
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def reply(message: dict):
+        protocol_out.write(json.dumps(message) + "\n")
+        protocol_out.flush()
+
+    sys.path.insert(0, str(sadtalker_dir))
+    try:
+        if preprocess_cache:
+            preprocess_cache.mkdir(parents=True, exist_ok=True)
+        server = _InferenceServer(sadtalker_dir, cpu, preprocess_cache)
+    except Exception as e:
+        reply({"ready": False, "error": str(e)})
+        return
+    reply({"ready": True, "device": server.device})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        try:
+            if job.get("op") == "ping":
+                reply({"id": job.get("id"), "ok": True})
+            elif job.get("op") == "render":
+                start = time.perf_counter()
+                video = server.render(job)
+                reply({"id": job["id"], "ok": True, "video": video,
+                       "seconds": round(time.perf_counter() - start, 2)})
+            else:
+                reply({"id": job.get("id"), "ok": False, "error": f"Unknown op: {job.get('op')}"})
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            reply({"id": job.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SadTalker inference worker (JSON lines on stdin/stdout)")
+    parser.add_argument("--serve", action="store_true", help="Run the worker loop")
+    parser.add_argument("--sadtalker-dir", default=str(DEFAULT_SADTALKER_DIR), help="SadTalker checkout")
+    parser.add_argument("--cpu", action="store_true", help="Force CPU inference")
+    parser.add_argument("--preprocess-cache", help="Directory for cached face preprocessing (omit to disable)")
+    args = parser.parse_args()
+
+    if not args.serve:
+        parser.print_help()
+        sys.exit(1)
+
+    serve(Path(args.sadtalker_dir).resolve(), args.cpu,
+          Path(args.preprocess_cache) if args.preprocess_cache else None)
@@ -0,0 +1,165 @@
+"""
+Phazur Labs Academy - Load-Based Throttling
+Decides when a batch should pause, from what the machine and the provider report
+
+Instead of a fixed cool-down between videos, work starts as soon as the box is
+cool and idle enough, and only waits while:
+    - a thermal zone (/sys/class/thermal) is at or above the max temperature
+      (and until it has dropped a few degrees, so it doesn't flap)
+    - the 1-minute load average per core is above the max load
+    - a provider answered 429 (honouring Retry-After, doubling on repeats)
+
+Every pause is accounted by reason so run summaries can show what it cost.
+Hosts without thermal zones or getloadavg (e.g. macOS thermals) skip that signal.
+
+Configuration (environment):
+    PHAZUR_THROTTLE_MAX_TEMP    Pause at or above this many °C (default: 85)
+    PHAZUR_THROTTLE_MAX_LOAD    Pause above this 1-minute load per core (default: 1.5)
+    PHAZUR_THROTTLE_CHECK       Seconds between re-checks while paused (default: 5)
+    PHAZUR_THROTTLE_MAX_WAIT    Longest single pause for heat or load (default: 600)
+"""
+
+import os
+import time
+import asyncio
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+THERMAL_ROOT = Path("/sys/class/thermal")
+DEFAULT_MAX_TEMP = 85.0
+DEFAULT_MAX_LOAD = 1.5
+DEFAULT_CHECK_SECONDS = 5.0
+DEFAULT_MAX_WAIT = 600.0
+RESUME_BELOW_DEGREES = 5.0
+RATE_LIMIT_BASE_SECONDS = 5.0
+RATE_LIMIT_MAX_SECONDS = 300.0
+
+
+def cpu_temperature(thermal_root: Path = THERMAL_ROOT) -> Optional[float]:
+    """Hottest thermal zone in °C, or None where the kernel doesn't expose any"""
+    readings = []
+    for zone in thermal_root.glob("thermal_zone*/temp"):
+        try:
+            readings.append(int(zone.read_text().strip()) / 1000)
+        except (OSError, ValueError):
+            continue
+    return max(readings) if readings else None
+
+
+def load_per_core() -> Optional[float]:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class Throttle:
+    def __init__(self, watch_host: bool = True, max_temp: Optional[float] = None,
+                 max_load: Optional[float] = None, check_seconds: Optional[float] = None,
+                 max_wait: Optional[float] = None):
+        self.watch_host = watch_host
+        self.max_temp = max_temp or float(os.environ.get('PHAZUR_THROTTLE_MAX_TEMP', DEFAULT_MAX_TEMP))
+        self.max_load = max_load or float(os.environ.get('PHAZUR_THROTTLE_MAX_LOAD', DEFAULT_MAX_LOAD))
+        self.check_seconds = check_seconds or float(os.environ.get('PHAZUR_THROTTLE_CHECK', DEFAULT_CHECK_SECONDS))
+        self.max_wait = max_wait or float(os.environ.get('PHAZUR_THROTTLE_MAX_WAIT', DEFAULT_MAX_WAIT))
+
+        self.paused_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._hot = False
+        self._rate_limits = 0
+        self._resume_at = 0.0
+        self._held_since = None
+        self._held_reason = None
+        self._hold_started = None
+
+    def rate_limited(self, retry_after: Optional[float] = None):
+        """Record a 429: hold new work for Retry-After, or an exponential backoff without one"""
+        with self._lock:
+            self._rate_limits += 1
+            delay = retry_after or min(RATE_LIMIT_BASE_SECONDS * 2 ** (self._rate_limits - 1),
+                                       RATE_LIMIT_MAX_SECONDS)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def succeeded(self):
+        """A request went through, so the next 429 starts the backoff over"""
+        with self._lock:
+            self._rate_limits = 0
+
+    def _check(self, now: float) -> Tuple[Optional[str], float, str]:
+        """(reason, seconds to pause, detail) for the current signals"""
+        if now < self._resume_at:
+            return 'rate limit', self._resume_at - now, "provider returned 429"
+        if not self.watch_host:
+            return None, 0.0, ""
+
+        temperature = cpu_temperature()
+        if temperature is not None:
+            resume_below = self.max_temp - RESUME_BELOW_DEGREES
+            self._hot = temperature >= (resume_below if self._hot else self.max_temp)
+            if self._hot:
+                return 'thermal', self.check_seconds, f"{temperature:.0f}°C (resuming below {resume_below:.0f}°C)"
+
+        load = load_per_core()
+        if load is not None and load > self.max_load:
+            return 'load', self.check_seconds, f"load {load:.2f}/core (max {self.max_load:g})"
+        return None, 0.0, ""
+
+    def pause_seconds(self) -> float:
+        """Seconds new work should wait right now (0 = go). Non-blocking.
+
+        Time between a call that returned a pause and the next call is
+        accounted as paused, so schedulers that keep polling this while they
+        do other work get an accurate total.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._held_since is not None:
+                self.paused_seconds[self._held_reason] = (
+                    self.paused_seconds.get(self._held_reason, 0.0) + now - self._held_since)
+                self._held_since = None
+
+            reason, pause, detail = self._check(now)
+            if reason and reason != 'rate limit' and self._hold_started is not None \
+                    and now - self._hold_started >= self.max_wait:
+                # Don't stall a batch forever on a box that never cools down
+                print(f"⚠️  Still throttled ({detail}) after {self.max_wait:.0f}s, continuing anyway")
+                reason, pause = None, 0.0
+
+            if not reason:
+                self._held_reason = self._hold_started = None
+                return 0.0
+
+            if reason != self._held_reason:
+                print(f"⏸  Throttling ({reason}): {detail}")
+                self._hold_started = now
+            self._held_since, self._held_reason = now, reason
+            return pause
+
+    def wait(self) -> float:
+        """Block until work may start; returns seconds waited"""
+        start = time.monotonic()
+        while True:
+            pause = self.pause_seconds()
+            if not pause:
+                return time.monotonic() - start
+            time.sleep(pause)
+
+    async def wait_async(self) -> float:
+        start = time.monotonic()
+        while True:
+            pause = self.pause_seconds()
+            if not pause:
+                return time.monotonic() - start
+            await asyncio.sleep(pause)
+
+    @property
+    def total_paused(self) -> float:
+        return sum(self.paused_seconds.values())
+
+    def summary(self) -> str:
+        """e.g. 'throttled 95s (thermal 80s, rate limit 15s)' or 'never throttled'"""
+        if not self.total_paused:
+            return "never throttled"
+        parts = ", ".join(f"{reason} {seconds:.0f}s" for reason, seconds in self.paused_seconds.items())
+        return f"throttled {self.total_paused:.0f}s ({parts})"
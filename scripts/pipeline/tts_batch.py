@@ -0,0 +1,113 @@
+"""
+Phazur Labs Academy - Batch TTS Stage
+Synthesizes all narration for a batch up front with bounded edge-tts concurrency
+
+Runs N concurrent edge_tts.Communicate sessions behind a semaphore, with an
+optional per-voice concurrency cap (by default a single voice may use all N
+sessions) and minimum spacing between requests, and retries
+with exponential backoff. Results go through the shared AudioCache when given,
+so the video stage only ever reads local files.
+"""
+
+import time
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tts_cache import AudioCache, edge_tts_engine_id
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+
+
+@dataclass
+class TTSJob:
+    job_id: str
+    text: str
+    voice: str
+    output_path: Path
+
+
+class EdgeTTSBatch:
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, per_voice: Optional[int] = None,
+                 min_interval: float = 0.25, retries: int = DEFAULT_RETRIES,
+                 audio_cache: Optional[AudioCache] = None):
+        self.concurrency = concurrency
+        self.per_voice = per_voice or concurrency
+        self.min_interval = min_interval
+        self.retries = retries
+        self.audio_cache = audio_cache
+
+        self._semaphore = None
+        self._voice_semaphores = {}
+        self._voice_locks = {}
+        self._voice_last_start = {}
+
+    def _voice_slot(self, voice: str) -> asyncio.Semaphore:
+        if voice not in self._voice_semaphores:
+            self._voice_semaphores[voice] = asyncio.Semaphore(self.per_voice)
+            self._voice_locks[voice] = asyncio.Lock()
+        return self._voice_semaphores[voice]
+
+    async def _pace(self, voice: str):
+        """Space request starts for a voice at least min_interval apart"""
+        async with self._voice_locks[voice]:
+            wait = self._voice_last_start.get(voice, 0.0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._voice_last_start[voice] = time.monotonic()
+
+    async def _synthesize(self, job: TTSJob) -> bool:
+        import edge_tts
+
+        tmp_path = job.output_path.with_name(f"{job.output_path.name}.part")
+        for attempt in range(1, self.retries + 1):
+            async with self._semaphore, self._voice_slot(job.voice):
+                await self._pace(job.voice)
+                try:
+                    communicate = edge_tts.Communicate(job.text, job.voice)
+                    await communicate.save(str(tmp_path))
+                    if tmp_path.exists() and tmp_path.stat().st_size > 0:
+                        tmp_path.replace(job.output_path)
+                        return True
+                    error = "empty audio"
+                except Exception as e:
+                    error = str(e)
+
+            tmp_path.unlink(missing_ok=True)
+            if attempt < self.retries:
+                delay = 2 ** attempt
+                print(f"  ⚠️  TTS {job.job_id} failed ({error}), retry {attempt}/{self.retries - 1} in {delay}s")
+                await asyncio.sleep(delay)
+            else:
+                print(f"  ❌ TTS {job.job_id} failed after {self.retries} attempts: {error}")
+        return False
+
+    async def run_job(self, job: TTSJob) -> bool:
+        """Produce audio for one job, from the cache when possible"""
+        job.output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        cache_key = None
+        if self.audio_cache:
+            cache_key = self.audio_cache.key(job.text, job.voice, edge_tts_engine_id())
+            if self.audio_cache.fetch(cache_key, job.output_path):
+                return True
+
+        ok = await self._synthesize(job)
+        if ok and cache_key:
+            self.audio_cache.put(cache_key, job.output_path)
+        return ok
+
+    async def run(self, jobs: List[TTSJob]) -> Dict[str, bool]:
+        """Synthesize every job concurrently. Returns {job_id: success}."""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(self.run_job(job) for job in jobs))
+        elapsed = time.monotonic() - start
+
+        done = sum(1 for ok in results if ok)
+        print(f"  🎤 Narration ready for {done}/{len(jobs)} lessons in {elapsed:.1f}s "
+              f"(concurrency {self.concurrency}, {self.per_voice}/voice)")
+        return {job.job_id: ok for job, ok in zip(jobs, results)}
@@ -0,0 +1,121 @@
+"""
+Phazur Labs Academy - TTS Audio Cache
+Content-addressed on-disk cache for synthesized narration, shared by the video generators
+
+Entries are keyed by a SHA-256 of (engine, voice, text), so an unchanged script
+never hits the TTS engine twice. The cache is bounded in size and evicts the
+least recently used entries first (a hit refreshes the entry's mtime).
+
+Configuration (environment):
+    PHAZUR_TTS_CACHE_DIR      Cache location (default: temp/tts-cache)
+    PHAZUR_TTS_CACHE_MAX_MB   Size bound in MB (default: 2048)
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE_DIR = PROJECT_ROOT / "temp" / "tts-cache"
+DEFAULT_MAX_MB = 2048
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents (used to key voice samples and avatars)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def edge_tts_engine_id() -> str:
+    """Engine identifier for edge-tts, including the installed package version"""
+    try:
+        import edge_tts
+        version = getattr(edge_tts, '__version__', 'unknown')
+    except ImportError:
+        version = 'missing'
+    return f"edge-tts/{version}"
+
+
+def coqui_engine_id(model_name: str) -> str:
+    """Engine identifier for a Coqui TTS model, including the installed package version"""
+    try:
+        import TTS
+        version = getattr(TTS, '__version__', 'unknown')
+    except ImportError:
+        version = 'missing'
+    return f"coqui/{version}/{model_name}"
+
+
+class AudioCache:
+    def __init__(self, cache_dir: Optional[Path] = None, max_mb: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or os.environ.get('PHAZUR_TTS_CACHE_DIR', DEFAULT_CACHE_DIR))
+        if max_mb is None:
+            max_mb = int(os.environ.get('PHAZUR_TTS_CACHE_MAX_MB', DEFAULT_MAX_MB))
+        self.max_bytes = max_mb * 1024 * 1024
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(text: str, voice: str, engine: str) -> str:
+        """Content address for a piece of narration"""
+        payload = json.dumps([engine, voice, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, suffix: str = '.mp3') -> Path:
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = '.mp3') -> Optional[Path]:
+        """Return the cached file for key, marking it as recently used"""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """Copy a cached entry to output_path. Returns False on a miss."""
+        cached = self.get(key, output_path.suffix)
+        if not cached:
+            return False
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, output_path)
+        return True
+
+    def put(self, key: str, source_path: Path) -> Path:
+        """Store source_path under key (atomic rename) and enforce the size bound"""
+        path = self.path_for(key, source_path.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
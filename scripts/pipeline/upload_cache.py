@@ -0,0 +1,65 @@
+"""
+Phazur Labs Academy - Upload Cache
+Remembers the URL a provider returned for an uploaded file, keyed by its content hash
+
+An avatar that hasn't changed only needs uploading once; later lessons reuse the
+returned URL until the entry's TTL runs out (provider-hosted uploads expire, so
+entries are not kept forever).
+
+Configuration (environment):
+    PHAZUR_UPLOAD_CACHE_FILE       Cache location (default: temp/upload-cache.json)
+    PHAZUR_UPLOAD_CACHE_TTL_HOURS  Entry lifetime in hours (default: 24)
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Optional
+
+from tts_cache import file_digest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE_FILE = PROJECT_ROOT / "temp" / "upload-cache.json"
+DEFAULT_TTL_HOURS = 24
+
+
+class UploadCache:
+    def __init__(self, namespace: str, cache_file: Optional[Path] = None, ttl_hours: Optional[float] = None):
+        self.namespace = namespace
+        self.cache_file = Path(cache_file or os.environ.get('PHAZUR_UPLOAD_CACHE_FILE', DEFAULT_CACHE_FILE))
+        if ttl_hours is None:
+            ttl_hours = float(os.environ.get('PHAZUR_UPLOAD_CACHE_TTL_HOURS', DEFAULT_TTL_HOURS))
+        self.ttl_seconds = ttl_hours * 3600
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.cache_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, data: dict):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2))
+        os.replace(tmp_path, self.cache_file)
+
+    def _key(self, path: Path) -> str:
+        return f"{self.namespace}:{file_digest(path)}"
+
+    def get(self, path: Path) -> Optional[str]:
+        """URL of a live upload of this file's contents, or None"""
+        entry = self._load().get(self._key(path))
+        if entry and time.time() - entry['uploaded_at'] < self.ttl_seconds:
+            return entry['url']
+        return None
+
+    def put(self, path: Path, url: str):
+        with self._lock:
+            data = self._load()
+            now = time.time()
+            data = {k: v for k, v in data.items() if now - v['uploaded_at'] < self.ttl_seconds}
+            data[self._key(path)] = {'url': url, 'uploaded_at': now, 'name': Path(path).name}
+            self._save(data)
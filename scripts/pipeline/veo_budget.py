@@ -0,0 +1,109 @@
+"""
+Phazur Labs Academy - Veo Budget Ledger
+Persistent per-day record of Veo credits spent, per model
+
+The ledger survives between runs so a daily cron can spend exactly the credits
+left for today, and remembers when a model's quota was exhausted so later runs
+on the same day don't waste calls on 429s.
+"""
+
+import os
+import json
+import fcntl
+from datetime import date
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_LEDGER = PROJECT_ROOT / "temp" / "veo-ledger.json"
+
+# Credits per generated second of video, per VEO_MODELS key.
+# 80 lessons x 8s clips on 'fast' = ~320 credits, matching the curriculum's ~315 budget.
+VEO_CREDITS_PER_SECOND = {
+    'fast': 0.5,
+    'quality': 1.25,
+}
+VEO_CLIP_SECONDS = 8
+
+# Lesson types in the order they should be generated when the budget is tight
+LESSON_TYPE_PRIORITY = ['welcome', 'concept', 'practical', 'advanced']
+
+
+def estimate_credits(model: str, seconds: int = VEO_CLIP_SECONDS) -> float:
+    """Estimated credits for one generated clip"""
+    return VEO_CREDITS_PER_SECOND.get(model, max(VEO_CREDITS_PER_SECOND.values())) * seconds
+
+
+def lesson_priority(job: dict, course_index: int = 0) -> tuple:
+    """Sort key: explicit 'priority', then lesson type, then curriculum order"""
+    lesson = job['lesson']
+    lesson_type = lesson.get('type', 'concept')
+    type_rank = LESSON_TYPE_PRIORITY.index(lesson_type) if lesson_type in LESSON_TYPE_PRIORITY else len(LESSON_TYPE_PRIORITY)
+    return (lesson.get('priority', 100), type_rank, course_index, job['module'].get('order', 0))
+
+
+class BudgetLedger:
+    """JSON file of {day: {model: {credits, videos, failures, exhausted}}}"""
+
+    def __init__(self, path: Path = DEFAULT_LEDGER, today: Optional[str] = None):
+        self.path = Path(path)
+        self._today = today   # pinned day, else the current one on every access
+
+    @property
+    def today(self) -> str:
+        """The ledger day spends are booked to (a run that crosses midnight moves on)"""
+        return self._today or date.today().isoformat()
+
+    @contextmanager
+    def _update(self):
+        """Read-modify-write under an exclusive lock, replacing the file atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self.path.with_suffix('.lock')
+        with open(lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = self._load()
+            yield data
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(data, indent=2))
+            os.replace(tmp_path, self.path)
+
+    def _load(self) -> dict:
+        if self.path.exists():
+            return json.loads(self.path.read_text())
+        return {'days': {}}
+
+    def _entry(self, data: dict, model: str) -> dict:
+        day = data['days'].setdefault(self.today, {})
+        return day.setdefault(model, {'credits': 0.0, 'videos': 0, 'failures': 0, 'exhausted': False})
+
+    def spent_today(self, model: Optional[str] = None) -> float:
+        day = self._load()['days'].get(self.today, {})
+        if model:
+            return day.get(model, {}).get('credits', 0.0)
+        return sum(entry.get('credits', 0.0) for entry in day.values())
+
+    def remaining_today(self, daily_credits: float) -> float:
+        return max(0.0, daily_credits - self.spent_today())
+
+    def is_exhausted(self, model: str) -> bool:
+        return self._load()['days'].get(self.today, {}).get(model, {}).get('exhausted', False)
+
+    def record_spend(self, model: str, credits: float):
+        with self._update() as data:
+            entry = self._entry(data, model)
+            entry['credits'] = round(entry['credits'] + credits, 2)
+            entry['videos'] += 1
+
+    def record_failure(self, model: str):
+        with self._update() as data:
+            self._entry(data, model)['failures'] += 1
+
+    def mark_exhausted(self, model: str):
+        with self._update() as data:
+            self._entry(data, model)['exhausted'] = True
+
+    def total_spent(self) -> float:
+        return sum(entry.get('credits', 0.0)
+                   for day in self._load()['days'].values()
+                   for entry in day.values())
@@ -0,0 +1,230 @@
+"""
+Phazur Labs Academy - Local Veo API Stand-in
+Serves the predictLongRunning / operations / file download endpoints locally
+
+Lets the Veo client and batch pipeline be exercised without spending credits.
+Render time, request latency, generation failures and 429s are configurable,
+and the server counts every call so a benchmark can compare what the client
+did against what it was given.
+
+Run standalone and point the generators at it:
+    python scripts/pipeline/veo_mock.py --port 8090 --render-seconds 20 --rate-429 0.1
+    VEO_API_BASE=http://127.0.0.1:8090/v1beta GOOGLE_GEMINI_API_KEY=mock \\
+        python scripts/generate-all-course-videos.py --all
+"""
+
+import os
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+
+API_PREFIX = "/v1beta"
+
+_SUBMIT = re.compile(rf'^{API_PREFIX}/models/([^/:]+):predictLongRunning$')
+_OPERATION = re.compile(rf'^{API_PREFIX}/(models/[^/]+/operations/[\w-]+)$')
+_FILE = re.compile(rf'^{API_PREFIX}/files/([\w-]+):download$')
+
+
+@dataclass
+class MockConfig:
+    render_seconds: float = 5.0      # mean time an operation takes to finish
+    render_jitter: float = 0.2       # +/- fraction of render_seconds
+    latency: float = 0.02            # added to every request
+    failure_rate: float = 0.0        # operations that finish with an error
+    rate_429: float = 0.0            # submissions rejected with 429
+    retry_after: Optional[int] = None
+    video_bytes: int = 2 * 1024 * 1024
+    seed: Optional[int] = None
+
+
+@dataclass
+class MockStats:
+    submits: int = 0
+    rejected_429: int = 0
+    polls: int = 0
+    failed: int = 0
+    downloads: int = 0
+    bytes_sent: int = 0
+    max_concurrent: int = 0
+
+
+class VeoMockServer:
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._operations = {}
+        self._rendering = set()
+        self._video = os.urandom(1024) * (self.config.video_bytes // 1024)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "VeoMockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _submit(self, model: str) -> tuple:
+        with self._lock:
+            self.stats.submits += 1
+            if self._random.random() < self.config.rate_429:
+                self.stats.rejected_429 += 1
+                return 429, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                                       'message': 'Quota exceeded (mock)'}}
+
+            op_id = f"{self.stats.submits:06d}{self._random.randrange(16 ** 6):06x}"
+            jitter = self._random.uniform(-self.config.render_jitter, self.config.render_jitter)
+            name = f"models/{model}/operations/{op_id}"
+            self._operations[name] = {
+                'id': op_id,
+                'done_at': time.time() + self.config.render_seconds * (1 + jitter),
+                'fails': self._random.random() < self.config.failure_rate,
+            }
+            self._rendering.add(name)
+            self.stats.max_concurrent = max(self.stats.max_concurrent, len(self._rendering))
+        return 200, {'name': name}
+
+    def _poll(self, name: str) -> tuple:
+        with self._lock:
+            self.stats.polls += 1
+            operation = self._operations.get(name)
+            if not operation:
+                return 404, {'error': {'code': 404, 'message': f'{name} not found'}}
+            if time.time() < operation['done_at']:
+                return 200, {'name': name, 'done': False}
+
+            if name in self._rendering:
+                self._rendering.discard(name)
+                self.stats.failed += operation['fails']
+
+        if operation['fails']:
+            return 200, {'name': name, 'done': True,
+                         'error': {'code': 13, 'message': 'Video generation failed (mock)'}}
+        uri = f"{self.base_url}/files/{operation['id']}:download?alt=media"
+        return 200, {'name': name, 'done': True, 'response': {'generateVideoResponse': {
+            'generatedSamples': [{'video': {'uri': uri}}]}}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, status: int, body: dict, headers: Optional[dict] = None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                time.sleep(server.config.latency)
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                match = _SUBMIT.match(self.path)
+                if not match:
+                    return self._json(404, {'error': {'code': 404, 'message': self.path}})
+                status, body = server._submit(match.group(1))
+                headers = {}
+                if status == 429 and server.config.retry_after is not None:
+                    headers['Retry-After'] = str(server.config.retry_after)
+                self._json(status, body, headers)
+
+            def do_GET(self):
+                time.sleep(server.config.latency)
+                path = self.path.split('?', 1)[0]
+                match = _OPERATION.match(path)
+                if match:
+                    return self._json(*server._poll(match.group(1)))
+                if _FILE.match(path):
+                    return self._send_video()
+                self._json(404, {'error': {'code': 404, 'message': self.path}})
+
+            def _send_video(self):
+                video = server._video
+                start, end = 0, len(video) - 1
+                range_header = self.headers.get('Range')
+                if range_header:
+                    first, _, last = range_header.replace('bytes=', '').partition('-')
+                    start = int(first)
+                    end = min(int(last), end) if last else end
+                    if start > end:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{len(video)}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(video)}')
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+                self.wfile.write(video[start:end + 1])
+                with server._lock:
+                    server.stats.downloads += 1
+                    server.stats.bytes_sent += end - start + 1
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Veo API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--render-seconds', type=float, default=MockConfig.render_seconds)
+    parser.add_argument('--latency', type=float, default=MockConfig.latency, help='Seconds added to every request')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of operations that fail')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of submissions rejected with 429')
+    parser.add_argument('--retry-after', type=int, help='Retry-After header sent with 429s')
+    parser.add_argument('--video-mb', type=float, default=2, help='Size of the served video')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(render_seconds=args.render_seconds, latency=args.latency, failure_rate=args.failure_rate,
+                        rate_429=args.rate_429, retry_after=args.retry_after,
+                        video_bytes=int(args.video_mb * 1024 * 1024), seed=args.seed)
+    server = VeoMockServer(config, host=args.host, port=args.port)
+    print(f"🎬 Mock Veo API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"\n📊 {server.stats.submits} submits ({server.stats.rejected_429} x 429), "
+              f"{server.stats.polls} polls, {server.stats.failed} failed, {server.stats.downloads} downloads")
+
+
+if __name__ == "__main__":
+    main()
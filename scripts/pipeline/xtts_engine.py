@@ -0,0 +1,91 @@
+"""
+Phazur Labs Academy - XTTS Engine
+Long-lived Coqui XTTS v2 model shared by every lesson synthesized in a process
+
+The model is loaded lazily on first use and the speaker conditioning latents for
+each voice sample are computed once, then reused for every subsequent lesson.
+Each synthesis returns a timing breakdown so batch runs can see load vs. synthesis.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+XTTS_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+
+class XTTSEngine:
+    _shared: Dict[str, "XTTSEngine"] = {}
+
+    @classmethod
+    def shared(cls, model_name: str = XTTS_MODEL) -> "XTTSEngine":
+        """Process-wide engine for model_name (created on first call, loaded on first use)"""
+        if model_name not in cls._shared:
+            cls._shared[model_name] = cls(model_name)
+        return cls._shared[model_name]
+
+    def __init__(self, model_name: str = XTTS_MODEL):
+        self.model_name = model_name
+        self.load_seconds = 0.0
+        self._tts = None
+        self._latents = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._tts is not None
+
+    def load(self) -> float:
+        """Load the model if needed. Returns the seconds spent loading (0 when already loaded)."""
+        if self._tts is not None:
+            return 0.0
+
+        from TTS.api import TTS
+
+        start = time.perf_counter()
+        self._tts = TTS(self.model_name)
+        self.load_seconds = time.perf_counter() - start
+        return self.load_seconds
+
+    def _model(self):
+        synthesizer = getattr(self._tts, 'synthesizer', None)
+        return getattr(synthesizer, 'tts_model', None)
+
+    def speaker_latents(self, speaker_wav: Path):
+        """Conditioning latents for a voice sample, cached by path and mtime"""
+        stat = speaker_wav.stat()
+        cache_key = (str(speaker_wav.resolve()), stat.st_mtime_ns, stat.st_size)
+        if cache_key not in self._latents:
+            model = self._model()
+            self._latents[cache_key] = model.get_conditioning_latents(audio_path=[str(speaker_wav)])
+        return self._latents[cache_key]
+
+    def synthesize(self, text: str, output_path: Path, speaker_wav: Optional[Path] = None,
+                   language: str = "en") -> Dict[str, float]:
+        """Synthesize text to output_path and return a timing breakdown in seconds"""
+        timings = {'load': self.load(), 'speaker': 0.0, 'synthesis': 0.0}
+        model = self._model()
+
+        if speaker_wav and hasattr(model, 'get_conditioning_latents'):
+            start = time.perf_counter()
+            gpt_cond_latent, speaker_embedding = self.speaker_latents(speaker_wav)
+            timings['speaker'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            # Like tts_to_file, split long text into sentences: XTTS truncates
+            # English input past 250 characters and rejects more than 400 tokens
+            out = model.inference(text, language, gpt_cond_latent, speaker_embedding,
+                                  enable_text_splitting=True)
+            self._tts.synthesizer.save_wav(wav=out['wav'], path=str(output_path))
+            timings['synthesis'] = time.perf_counter() - start
+        else:
+            start = time.perf_counter()
+            kwargs = {'speaker_wav': str(speaker_wav)} if speaker_wav else {}
+            self._tts.tts_to_file(text=text, file_path=str(output_path), language=language, **kwargs)
+            timings['synthesis'] = time.perf_counter() - start
+
+        return timings
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """One-line summary, e.g. 'load 14.2s | speaker 0.0s | synthesis 9.8s'"""
+    return " | ".join(f"{stage} {seconds:.1f}s" for stage, seconds in timings.items())
@@ -0,0 +1,91 @@
+# Tests for scripts/pipeline/media_info.py - native WAV / MP3 / MP4 parsers
+# Fixtures are the sample media checked in under public/ (durations and keyframe
+# times as ffprobe reports them); run with: python -m pytest tests/pipeline
+import sys
+import wave
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "pipeline"))
+
+import media_info  # noqa: E402
+from media_info import probe  # noqa: E402
+
+LESSONS = PROJECT_ROOT / "public" / "videos" / "lessons"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    # validate_media() goes through the shared cache; keep it out of temp/
+    monkeypatch.setenv("PHAZUR_MEDIA_INFO_CACHE", str(tmp_path / "media-info-cache.json"))
+    monkeypatch.setattr(media_info.MediaInfoCache, "_shared", None)
+
+
+@pytest.mark.parametrize("name, duration, keyframes", [
+    ("lesson-react-1-1.mp4", 39.616, [0.0, 10.0, 20.0, 30.0]),
+    ("lesson-react-2-2.mp4", 26.411, [0.0, 10.0, 20.0]),
+    ("lesson-react-3-1.mp4", 58.64, [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]),
+    ("lesson-react-1-1-veo.mp4", 8.0, [0.0]),
+])
+def test_mp4_duration_and_keyframes(name, duration, keyframes):
+    info = probe(LESSONS / name)
+
+    assert info.probed_by == "mp4"
+    assert info.error is None
+    assert info.duration == pytest.approx(duration, abs=1e-3)
+    assert info.stream("video")["keyframes"] == pytest.approx(keyframes, abs=1e-3)
+
+
+def test_mp4_stream_params_match_ffprobe():
+    info = probe(LESSONS / "lesson-react-1-1.mp4")
+
+    assert info.container == "mp4"
+    assert info.stream("video") == {
+        "type": "video", "codec": "h264", "width": 1920, "height": 1080, "profile": "High",
+        "level": 40, "pix_fmt": "yuv420p", "time_base": "1/12800", "r_frame_rate": "25/1",
+        "keyframes": [0.0, 10.0, 20.0, 30.0],
+    }
+    assert info.stream("audio") == {"type": "audio", "codec": "aac", "channels": 1, "sample_rate": 16000}
+
+
+def test_mp4_part2_video_uses_ffprobe_codec_name():
+    info = probe(PROJECT_ROOT / "public" / "courses" / "test-welcome.mp4")
+
+    assert info.duration == pytest.approx(6.28, abs=1e-3)
+    assert info.stream("video")["codec"] == "mpeg4"
+
+
+def test_truncated_mp4_is_an_error(tmp_path):
+    source = (LESSONS / "lesson-react-2-2.mp4").read_bytes()
+    truncated = tmp_path / "truncated.mp4"
+    truncated.write_bytes(source[:len(source) // 2])
+
+    assert probe(truncated).error
+    assert media_info.validate_media(truncated)
+
+
+def test_mp3_duration():
+    info = probe(PROJECT_ROOT / "public" / "demo-audio.mp3")
+
+    assert info.probed_by == "mp3"
+    assert info.duration == pytest.approx(15.456, abs=1e-3)
+    assert info.stream("audio") == {"type": "audio", "codec": "mp3", "channels": 1, "sample_rate": 24000}
+
+
+def test_wav_duration(tmp_path):
+    path = tmp_path / "tone.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(22050)
+        w.writeframes(b"\0\0\0\0" * 22050 * 3)
+
+    info = probe(path)
+
+    assert info.probed_by == "wav"
+    assert info.duration == pytest.approx(3.0)
+    assert info.stream("audio")["sample_rate"] == 22050
+    assert info.stream("audio")["channels"] == 2
+    assert media_info.validate_media(path, video=False, audio=True) is None